@@ -0,0 +1,56 @@
+# DjangoTs/gunicorn.conf.py
+"""
+生产环境的 gunicorn 配置，参数与 python manage.py serve 共用 settings.SERVER
+
+    pip install gunicorn
+    gunicorn -c DjangoTs/gunicorn.conf.py DjangoTs.wsgi
+
+- 预加载：主进程加载应用并执行与 serve 相同的预热（goods/management/commands/serve.py warm_up），worker 继承
+- worker 回收：MAX_REQUESTS（加 MAX_REQUESTS_JITTER 抖动）个请求后重启；
+  MAX_WORKER_RSS_MB 大于 0 时，请求结束后常驻内存超过该值的 worker 处理完当前请求后退出，由主进程重新拉起
+- 超时和限制：REQUEST_TIMEOUT 秒无响应的 worker 被重启，keep-alive 连接空闲 KEEPALIVE 秒后关闭，
+  请求行和请求头大小使用 gunicorn 的默认上限
+- 信号与 serve 相同：kill -HUP 平滑重载，kill -TERM 处理完进行中的请求后退出
+"""
+import gc
+import os
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'DjangoTs.settings')
+django.setup()
+
+from django.db import connections  # noqa: E402
+
+from api.memory import current_rss  # noqa: E402
+from goods.management.commands.serve import get_server_setting, warm_up  # noqa: E402
+
+bind = get_server_setting('BIND')
+workers = get_server_setting('WORKERS')
+threads = get_server_setting('THREADS')
+worker_class = 'gthread'
+max_requests = get_server_setting('MAX_REQUESTS')
+max_requests_jitter = get_server_setting('MAX_REQUESTS_JITTER')
+graceful_timeout = get_server_setting('GRACEFUL_TIMEOUT')
+timeout = get_server_setting('REQUEST_TIMEOUT')
+keepalive = get_server_setting('KEEPALIVE')
+preload_app = get_server_setting('PRELOAD')
+
+MAX_WORKER_RSS = get_server_setting('MAX_WORKER_RSS_MB') * 1024 * 1024
+
+
+def on_starting(server):
+    """fork 之前（预加载模式下应用已经加载）：预热，然后关闭数据库连接并冻结 GC 对象（减少写时复制）"""
+    if not preload_app or not get_server_setting('WARMUP'):
+        return
+    timings = warm_up(server.app.wsgi())
+    server.log.info('预热: ' + '，'.join(f'{step} {ms:.0f} ms' for step, ms in timings.items()))
+    connections.close_all()
+    gc.collect()
+    gc.freeze()
+
+
+def post_request(worker, req, environ, resp):
+    if MAX_WORKER_RSS and (current_rss() or 0) > MAX_WORKER_RSS:
+        worker.log.warning('worker %s 常驻内存 %.0f MB 超过上限，重启', worker.pid, current_rss() / 1048576)
+        worker.alive = False  # 处理完进行中的请求后退出
@@ -0,0 +1,261 @@
+# DjangoTs/prefork.py
+"""
+预派生（pre-fork）多进程 WSGI 服务器，只依赖标准库，由 python manage.py serve 启动
+
+用于开发、压测和预热效果对比，不用于生产：请求处理基于 wsgiref（标准库文档注明不适合生产），
+每个连接只处理一个请求（没有 keep-alive），除 REQUEST_TIMEOUT 的读超时和 http.server 自带的
+请求行/请求头上限外没有其他保护。生产环境使用 gunicorn，配置见 DjangoTs/gunicorn.conf.py。
+
+- 主进程监听端口后 fork 出 N 个 worker，worker 共享同一个监听 socket（非阻塞 accept，不会互相卡住）
+- 预加载（preload）：主进程在 fork 之前加载 WSGI 应用并执行预热，worker 通过写时复制共享
+  已导入的模块、URL 解析器和进程内缓存，不再各自冷启动
+- worker 内部用线程处理请求（THREADS），处理 MAX_REQUESTS（加随机抖动）个请求后退出，由主进程重新拉起，
+  防止内存碎片和泄漏无限增长；设置 MAX_WORKER_RSS_MB 时常驻内存超过该值也会退出重启
+- 慢客户端：连接的读写超过 REQUEST_TIMEOUT 秒没有进展即断开，不会一直占用请求线程
+- 信号：
+    SIGTERM / SIGINT  平滑退出：worker 停止接受新连接，处理完进行中的请求后退出，超过 GRACEFUL_TIMEOUT 强制结束
+    SIGHUP            平滑重载：主进程重新执行预热，逐个用新 worker 替换旧 worker
+                      （预加载模式下代码改动需要完整重启主进程）
+"""
+import gc
+import logging
+import os
+import random
+import signal
+import socket
+import threading
+import time
+from socketserver import ThreadingMixIn
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer
+
+from django.db import connections
+
+from api.memory import current_rss
+
+logger = logging.getLogger('DjangoTs.prefork')
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    """默认不输出访问日志（PerformanceMiddleware 已经记录耗时）"""
+    access_log = False
+    timeout = None  # 连接的 socket 超时（秒），由 Arbiter 按 request_timeout 设置
+
+    def log_message(self, format, *args):
+        if self.access_log:
+            super().log_message(format, *args)
+
+
+class WorkerServer(ThreadingMixIn, WSGIServer):
+    """worker 进程内的 HTTP 服务：使用主进程传入的监听 socket，每个请求一个线程"""
+    daemon_threads = False
+    block_on_close = True  # server_close() 等待进行中的请求处理完
+    max_requests = None
+    max_rss = None  # 字节
+
+    def __init__(self, listener, handler_class):
+        super().__init__(listener.getsockname()[:2], handler_class, bind_and_activate=False)
+        self.socket.close()
+        self.socket = listener
+        host, port = listener.getsockname()[:2]
+        self.server_name = socket.getfqdn(host)
+        self.server_port = port
+        self.setup_environ()
+        self.handled = 0
+        self._stopping = threading.Event()
+
+    def process_request(self, request, client_address):
+        self.handled += 1
+        super().process_request(request, client_address)
+        if self.max_requests and self.handled >= self.max_requests:
+            self.stop()
+        elif self.max_rss and (current_rss() or 0) > self.max_rss:
+            logger.warning('worker %s 常驻内存 %.0f MB 超过上限，重启', os.getpid(), current_rss() / 1048576)
+            self.stop()
+
+    def stop(self):
+        """可以在信号处理函数和请求线程中调用；shutdown() 会等待 serve_forever 退出，所以放到新线程"""
+        if not self._stopping.is_set():
+            self._stopping.set()
+            threading.Thread(target=self.shutdown, daemon=True).start()
+
+
+class Arbiter:
+    """主进程：监听端口、派生并监控 worker、处理信号"""
+
+    def __init__(self, load_application, bind=('127.0.0.1', 8000), workers=2, threads=4,
+                 max_requests=0, max_requests_jitter=0, max_rss=0, graceful_timeout=30,
+                 request_timeout=30, preload=True, warm_up=None, access_log=False, stdout=None):
+        self.load_application = load_application
+        self.bind = bind
+        self.workers = workers
+        self.threads = threads
+        self.max_requests = max_requests
+        self.max_requests_jitter = max_requests_jitter
+        self.max_rss = max_rss
+        self.graceful_timeout = graceful_timeout
+        self.request_timeout = request_timeout
+        self.preload = preload
+        self.warm_up = warm_up
+        self.access_log = access_log
+        self.stdout = stdout
+        self.application = None
+        self.listener = None
+        self.children = {}  # pid -> 启动时间
+        self._stopping = False
+        self._reload = False
+
+    def log(self, message):
+        if self.stdout is not None:
+            self.stdout.write(message)
+        logger.info(message)
+
+    # ---------------------------------------------------------------- 主进程
+    def run(self):
+        if self.preload:
+            self.prepare()  # 预热完成后才开始监听，负载均衡的健康检查不会把流量导到未就绪的实例
+
+        self.listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.listener.bind(self.bind)
+        self.listener.listen(max(128, self.workers * self.threads * 4))
+        self.listener.setblocking(False)  # 多个 worker 同时被唤醒时，没抢到连接的不会阻塞在 accept 上
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        signal.signal(signal.SIGHUP, self._handle_reload)
+
+        for _ in range(self.workers):
+            self.spawn()
+        self.log(f'监听 http://{self.bind[0]}:{self.bind[1]}/ ，{self.workers} 个 worker × {self.threads} 线程'
+                 f'（主进程 {os.getpid()}，{"预加载" if self.preload else "不预加载"}）')
+
+        while not self._stopping:
+            if self._reload:
+                self._reload = False
+                self.reload()
+            self.reap(respawn=True)
+            time.sleep(0.2)
+        self.shutdown()
+
+    def prepare(self):
+        """fork 之前：加载应用、预热，然后关闭数据库连接并冻结 GC 对象（减少写时复制）"""
+        started = time.perf_counter()
+        if self.application is None:
+            self.application = self.load_application()
+        if self.warm_up is not None:
+            self.warm_up(self.application)
+        connections.close_all()
+        gc.collect()
+        gc.freeze()
+        self.log(f'应用加载和预热用时 {(time.perf_counter() - started) * 1000:.0f} ms')
+
+    def spawn(self):
+        pid = os.fork()
+        if pid:
+            self.children[pid] = time.monotonic()
+            return pid
+        try:
+            self.run_worker()
+        except Exception:
+            logger.exception('worker %s 异常退出', os.getpid())
+            os._exit(1)
+        os._exit(0)
+
+    def reap(self, respawn):
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if not pid:
+                return
+            if self.children.pop(pid, None) is not None and respawn and not self._stopping:
+                code = os.waitstatus_to_exitcode(status)
+                if code != 0:
+                    self.log(f'worker {pid} 异常退出（{code}），重新拉起')
+                self.spawn()
+
+    def reload(self):
+        """平滑重载：重新预热，逐个拉起新 worker 并通知旧 worker 处理完当前请求后退出"""
+        self.log('收到 SIGHUP，重载 worker')
+        if self.preload:
+            gc.unfreeze()
+            self.prepare()
+        old = list(self.children)
+        for pid in old:
+            self.spawn()
+            self._signal(pid, signal.SIGTERM)
+        # 旧 worker 退出时不再补拉（数量已由新 worker 补足）
+        deadline = time.monotonic() + self.graceful_timeout
+        while any(pid in self.children for pid in old) and time.monotonic() < deadline:
+            self._reap_pids(old)
+            time.sleep(0.1)
+        for pid in old:
+            if pid in self.children:
+                self._signal(pid, signal.SIGKILL)
+        self._reap_pids(old, block=True)
+
+    def shutdown(self):
+        self.log('正在停止，等待进行中的请求完成')
+        for pid in list(self.children):
+            self._signal(pid, signal.SIGTERM)
+        deadline = time.monotonic() + self.graceful_timeout
+        while self.children and time.monotonic() < deadline:
+            self.reap(respawn=False)
+            time.sleep(0.1)
+        for pid in list(self.children):
+            self._signal(pid, signal.SIGKILL)
+        self._reap_pids(list(self.children), block=True)
+        self.listener.close()
+        self.log('已停止')
+
+    def _reap_pids(self, pids, block=False):
+        for pid in pids:
+            if pid not in self.children:
+                continue
+            try:
+                done, _ = os.waitpid(pid, 0 if block else os.WNOHANG)
+            except ChildProcessError:
+                done = pid
+            if done:
+                self.children.pop(pid, None)
+
+    @staticmethod
+    def _signal(pid, signum):
+        try:
+            os.kill(pid, signum)
+        except ProcessLookupError:
+            pass
+
+    def _handle_stop(self, signum, frame):
+        self._stopping = True
+
+    def _handle_reload(self, signum, frame):
+        self._reload = True
+
+    # ---------------------------------------------------------------- worker
+    def run_worker(self):
+        self.children = {}
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)  # 服务启动前收到 SIGTERM 直接退出
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl+C 由主进程统一处理
+
+        application = self.application
+        if application is None:
+            # 不预加载：每个 worker 自己加载应用（第一个请求承担导入和初始化开销）
+            application = self.load_application()
+            if self.warm_up is not None:
+                self.warm_up(application)
+
+        handler = type('RequestHandler', (QuietRequestHandler,), {
+            'access_log': self.access_log, 'timeout': self.request_timeout or None,
+        })
+        server = WorkerServer(self.listener, handler)
+        server.set_app(application)
+        if self.max_requests:
+            server.max_requests = self.max_requests + random.randint(0, self.max_requests_jitter)
+        server.max_rss = self.max_rss
+        signal.signal(signal.SIGTERM, lambda signum, frame: server.stop())
+
+        server.serve_forever(poll_interval=0.5)
+        server.server_close()  # 等待请求线程结束；关闭的是本进程中的监听 socket 副本
+        connections.close_all()
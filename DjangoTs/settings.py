@@ -22,11 +22,15 @@ INSTALLED_APPS = [
     "django.contrib.messages",
     "django.contrib.staticfiles",
     "goods",
+    "taskqueue",  # 🔥 新增：后台任务队列
 ]
 
 # Middleware
 MIDDLEWARE = [
+    "api.middleware.PerformanceMiddleware",  # 🔥 新增：性能监控（放在最外层统计完整耗时）
+    "api.middleware.QueryInspectionMiddleware",  # 🔥 新增：慢查询日志 + N+1 检测
     "corsheaders.middleware.CorsMiddleware",
+    "api.middleware.ConcurrencyLimitMiddleware",  # 🔥 新增：写请求并发限制，过载时返回 503（放在 CORS 之后，503 也带跨域头）
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -53,6 +57,14 @@ TEMPLATES = [
     },
 ]
 
+# 🔥 可选应用：只提供 API 的进程（如 serve 启动的 worker）可以设置环境变量 DJANGOTS_ADMIN=0，
+# 不加载 admin 及其依赖的 messages，减少启动时间和内存（python manage.py import_profile 查看）
+ADMIN_ENABLED = os.environ.get("DJANGOTS_ADMIN", "1") != "0"
+if not ADMIN_ENABLED:
+    INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in ("django.contrib.admin", "django.contrib.messages")]
+    MIDDLEWARE = [item for item in MIDDLEWARE if item != "django.contrib.messages.middleware.MessageMiddleware"]
+    TEMPLATES[0]["OPTIONS"]["context_processors"].remove("django.contrib.messages.context_processors.messages")
+
 WSGI_APPLICATION = "DjangoTs.wsgi.application"
 
 # Database
@@ -60,6 +72,9 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        "OPTIONS": {
+            "timeout": 20,  # 🔥 等待写锁的秒数（默认5秒，写入高峰时容易报 database is locked）
+        },
     }
 }
 
@@ -94,6 +109,182 @@ FILE_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# 🔥 缓存：默认进程内存；多进程/多机部署时换成 Redis/Memcached 共享（推荐候选列表、限流等使用）
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'djangots-default',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    }
+}
+
+# 🔥 性能监控配置（api.middleware.PerformanceMiddleware）
+PERF_METRICS = {
+    'ENABLED': True,
+    'SERVER_TIMING': True,  # 是否输出 Server-Timing 响应头
+    'ALLOWED_IPS': ['127.0.0.1', '::1'],  # 允许访问 /api/metrics/ 的地址（管理员不受限制）
+}
+
+# 🔥 慢查询日志和 N+1 检测（api.middleware.QueryInspectionMiddleware）
+QUERY_INSPECTION = {
+    'ENABLED': DEBUG,  # 生产环境可通过改为 True 单独开启
+    'SLOW_QUERY_MS': 100,  # 超过该耗时的SQL记录为慢查询
+    'N_PLUS_ONE_THRESHOLD': 5,  # 同一请求内同一SQL模板执行次数达到该值视为 N+1
+    'STACK_DEPTH': 8,  # 日志中保留的项目内调用栈层数
+    'RAISE_ON_BUDGET': False,  # 测试时设为 True，超出 @query_budget 直接抛出 QueryBudgetExceeded
+}
+
+# 🔥 限流配置（api.throttling 令牌桶 + api.middleware.ConcurrencyLimitMiddleware）
+API_THROTTLE = {
+    'ENABLED': True,
+    # 默认进程内存；多进程部署时改为 'api.throttling.CacheBucketBackend'（配合共享缓存）
+    'BACKEND': 'api.throttling.LocalMemoryBucketBackend',
+    'CACHE_ALIAS': 'default',
+    # rate: 令牌补充速率（/s /m /h /d），burst: 桶容量（允许的突发请求数）
+    # xxx 为按用户的桶，xxx_ip 为按 IP 的桶
+    'RATES': {
+        'like': {'rate': '2/s', 'burst': 10},
+        'like_ip': {'rate': '20/s', 'burst': 60},
+        'favorite': {'rate': '2/s', 'burst': 10},
+        'favorite_ip': {'rate': '20/s', 'burst': 60},
+        'comment': {'rate': '6/m', 'burst': 3},
+        'comment_ip': {'rate': '60/m', 'burst': 20},
+        'message': {'rate': '20/m', 'burst': 5},
+        'message_ip': {'rate': '120/m', 'burst': 30},
+        'login': {'rate': '10/m', 'burst': 5},
+    },
+    'MAX_CONCURRENT_WRITES': 8,  # 单进程内同时处理的写请求上限，None 表示不限制
+    'QUEUE_TIMEOUT': 0.5,  # 等待写入名额的最长秒数，超时返回 503
+}
+
+# 🔥 点赞/收藏写合并（goods.write_buffer）
+# 开启后点赞/收藏接口返回 202，事件在内存中合并后批量写入；
+# 进程崩溃会丢失最多 FLUSH_INTERVAL 秒内的事件，正常退出时会先写入
+WRITE_BUFFER = {
+    'ENABLED': False,
+    'FLUSH_INTERVAL': 1.0,  # 最长刷新间隔（秒），即写入延迟上限
+    'MAX_BATCH': 500,  # 缓冲区达到该数量时立即刷新
+}
+
+# 🔥 商品热度计算（goods/ranking.py，python manage.py recompute_rankings --schedule 启动定期重算）
+RANKING = {
+    'WINDOWS': [(1, 1.0), (7, 0.5), (30, 0.15)],  # (窗口天数, 衰减系数)
+    'WEIGHTS': {'like': 1.0, 'favorite': 3.0, 'comment': 2.0},
+    'RATING_WEIGHT': 0.5,  # 评论评分相对 3 分的加减分权重
+    'BATCH_SIZE': 2000,
+    'REFRESH_INTERVAL': 300,  # 定期增量重算间隔（秒）
+}
+
+# 🔥 相似商品（物品协同过滤，需要 numpy/scipy，python manage.py build_similarity 构建）
+SIMILARITY = {
+    'TOP_K': 20,  # 每个商品保留的相似商品数
+    'MIN_SCORE': 0.01,  # 余弦相似度低于该值不保存
+    'LIKE_WEIGHT': 1.0,
+    'FAVORITE_WEIGHT': 2.0,
+    'BLOCK_SIZE': 2000,  # 每次矩阵乘法计算的商品数，越大越快但内存越高
+}
+
+# 🔥 个性化推荐（goods.feed，候选列表缓存在 CACHES[CACHE_ALIAS] 中）
+FEED = {
+    'CACHE_ALIAS': 'default',
+    'AFFINITY_WEIGHTS': {'like': 1.0, 'favorite': 2.0, 'purchase': 4.0},
+    'SEGMENT_WEIGHTS': [1.0, 0.6],  # 用户分群取偏好最高的前 2 个分类，按名次加权
+    'EXPLORE_WEIGHT': 0.2,  # 其他分类的权重
+    'HALF_LIFE_HOURS': 72,  # 发布时间衰减的半衰期
+    'CANDIDATES_PER_CATEGORY': 200,
+    'FEED_SIZE': 300,  # 每个分群缓存的候选商品数
+    'AFFINITY_TTL': 600,
+    'CANDIDATE_TTL': 300,
+    'REFRESH_INTERVAL': 120,  # 后台预热间隔（秒）
+}
+
+# 🔥 收藏列表（goods.favorites，收藏/取消收藏时自动失效）
+FAVORITES = {
+    'CACHE_ALIAS': 'default',
+    'TTL': 600,
+    'MAX_IDS': 5000,  # 每个用户缓存的收藏数上限
+}
+
+# 🔥 卖家统计（goods.stats，发生购买时自动失效）
+SELLER_STATS = {
+    'CACHE_ALIAS': 'default',
+    'TTL': 300,  # 点赞、收藏、评论等变化最多延迟这么久反映到统计中
+    'MAX_DAYS': 366,
+}
+
+# 🔥 分面统计（goods.facets，商品增删改时自动失效）
+FACETS = {
+    'CACHE_ALIAS': 'default',
+    'TTL': 600,  # 无过滤条件的结果
+    'FILTERED_TTL': 60,  # 带过滤条件的结果
+    'PRICE_BUCKETS': [0, 50, 100, 200, 500, 1000, 5000],  # 价格区间边界
+}
+
+# 🔥 数据归档（goods.archive，python manage.py archive_data --schedule 启动定期归档）
+ARCHIVE = {
+    'SOLD_GOODS_DAYS': 90,  # 售出超过该天数的商品移到归档表
+    'MESSAGE_DAYS': 180,  # 超过该天数的留言移到归档表
+    'BATCH_SIZE': 1000,
+    'INTERVAL': 86400,  # 定期归档间隔（秒）
+    'PURGE_DELAY': 60,  # 商品删除后多久开始清理关联数据（秒）
+    'PURGE_BATCH_SIZE': 200,
+}
+
+# 🔥 内存（api.memory、api.streaming；/api/debug/memory/ 查看，python manage.py memory_profile 离线测量）
+MEMORY = {
+    'STREAM_BATCH_SIZE': 500,  # 流式列表接口每次从数据库读取、每次输出的条数
+    'TRACK_RSS': True,  # 按接口记录请求期间进程 RSS 峰值的增长
+    'TRACEMALLOC_FRAMES': 0,  # >0 时进程启动即开启 tracemalloc 并保留该层数的调用栈（开销明显，排查时开启）
+    'TOP_ALLOCATIONS': 20,  # 快照中显示的分配位置数
+}
+
+# 🔥 应用服务器参数：生产环境 gunicorn -c DjangoTs/gunicorn.conf.py DjangoTs.wsgi，
+# 开发/压测可用 python manage.py serve（标准库实现，预派生多进程；kill -HUP 平滑重载）
+SERVER = {
+    'BIND': '127.0.0.1:8000',
+    'WORKERS': 2,
+    'THREADS': 4,  # 每个 worker 的线程数
+    'MAX_REQUESTS': 1000,  # worker 处理该数量（加随机抖动）的请求后重启，0 不重启
+    'MAX_REQUESTS_JITTER': 100,
+    'MAX_WORKER_RSS_MB': 0,  # worker 常驻内存超过该值时处理完当前请求后重启，0 不限制
+    'GRACEFUL_TIMEOUT': 30,  # 停止/重载时等待进行中请求的秒数
+    'REQUEST_TIMEOUT': 30,  # gunicorn：worker 超过该秒数无响应即重启；serve：连接读写超时
+    'KEEPALIVE': 5,  # gunicorn keep-alive 连接的空闲秒数（serve 不支持 keep-alive）
+    'PRELOAD': True,  # fork 前在主进程加载应用并预热，worker 共享
+    'WARMUP': True,
+    'WARMUP_PATHS': ['/api/', '/api/goods/facets/', '/api/goods/trending/', '/api/feed/'],
+}
+
+# 🔥 后台任务队列（taskqueue，worker 通过 python manage.py run_task_workers 启动）
+TASK_QUEUE = {
+    'ALWAYS_EAGER': False,  # True 时任务在调用处同步执行，不需要启动 worker
+    'POLL_INTERVAL': 1.0,  # 队列为空时的轮询间隔（秒）
+    'BATCH_SIZE': 20,
+    'RETRY_BACKOFF': 5,  # 失败重试的退避基数（秒），按 2 的指数增长
+    'HEARTBEAT_INTERVAL': 30,  # 执行任务期间 worker 刷新心跳的间隔（秒）
+    'STALE_AFTER': 120,  # 超过该秒数没有心跳视为 worker 崩溃，重新排队；已达最大尝试次数则标记失败
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'api.queries': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+        'taskqueue': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
 # -------------------------- CORS配置 --------------------------
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:5173",
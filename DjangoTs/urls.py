@@ -1,9 +1,8 @@
 from django.http import JsonResponse, HttpResponse
+from django.apps import apps
 from django.urls import path, include
-from django.contrib import admin
 from django.conf import settings
 from django.conf.urls.static import static
-from api.views import api_root  # 仅导入API根视图
 
 
 def api_home(request):
@@ -59,10 +58,15 @@ def api_home(request):
 # 项目全局路由
 urlpatterns = [
     path('', api_home, name='home'),  # 项目首页
-    path('admin/', admin.site.urls),  # Django admin
     path('api/', include('api.urls')),  # API入口（关联api/urls.py）
 ]
 
+# 🔥 admin 是可选应用（settings.ADMIN_ENABLED），只提供 API 的部署不导入
+if apps.is_installed('django.contrib.admin'):
+    from django.contrib import admin
+
+    urlpatterns.append(path('admin/', admin.site.urls))  # Django admin
+
 # 开发环境：媒体文件（图片）路由
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
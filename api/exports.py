@@ -0,0 +1,150 @@
+# api/exports.py
+"""
+流式导出：商品、已完成订单、留言记录
+
+所有导出都基于 values_list(...).iterator(chunk_size=...)，只取需要的列并分块读取，
+再逐行编码为 CSV 或 JSONL，内存占用与表大小无关。
+已完成订单和留言记录同时读取归档表（ArchivedGoods、ArchivedMessage），两张表按相同顺序读取后归并输出。
+接口（StreamingHttpResponse）和管理命令 export_data 共用这里的实现。
+"""
+import csv
+import heapq
+import json
+from datetime import datetime
+
+from django.db.models import F, Q
+
+from goods.models import ArchivedGoods, ArchivedMessage, Goods, Message
+
+DEFAULT_CHUNK_SIZE = 2000
+FORMATS = ('csv', 'jsonl')
+ID_PARAMS = ('seller', 'buyer', 'user', 'goods')
+CATEGORIES = {value for value, _ in Goods.CATEGORY_CHOICES}
+
+
+def clean_params(params):
+    """校验过滤参数（id 必须是正整数，分类必须有效），返回 {参数名: 值}；不合法时抛出 ValueError"""
+    cleaned = {}
+    for name in ID_PARAMS:
+        value = params.get(name)
+        if value in (None, ''):
+            continue
+        try:
+            cleaned[name] = int(value)
+        except (TypeError, ValueError):
+            raise ValueError(f'{name} 必须是整数')
+        if cleaned[name] <= 0:
+            raise ValueError(f'{name} 必须是正整数')
+    category = params.get('category')
+    if category:
+        if category not in CATEGORIES:
+            raise ValueError(f'无效的 category: {category}')
+        cleaned['category'] = category
+    return cleaned
+
+
+def _goods_queryset(params):
+    queryset = Goods.objects.order_by('id')
+    if params.get('category'):
+        queryset = queryset.filter(category=params['category'])
+    if params.get('seller'):
+        queryset = queryset.filter(seller_id=params['seller'])
+    return queryset
+
+
+def _purchases_queryset(params):
+    """在售表和归档表中的订单（与 user_goods_list('my-purchases')、seller_stats 一样合并两张表）"""
+    querysets = []
+    for queryset in (Goods.objects.filter(is_sold=True), ArchivedGoods.objects.all()):
+        queryset = queryset.filter(buyer__isnull=False).order_by('sold_at', 'id')
+        if params.get('buyer'):
+            queryset = queryset.filter(buyer_id=params['buyer'])
+        if params.get('seller'):
+            queryset = queryset.filter(seller_id=params['seller'])
+        querysets.append(queryset)
+    return querysets
+
+
+def _messages_queryset(params):
+    """留言表和归档表中的留言（归档时保留原 id，两张表都按 id 排序后归并）"""
+    querysets = []
+    for queryset in (Message.objects.annotate(goods_name=F('goods__name')), ArchivedMessage.objects.all()):
+        queryset = queryset.order_by('id')
+        if params.get('user'):
+            queryset = queryset.filter(Q(sender_id=params['user']) | Q(receiver_id=params['user']))
+        if params.get('goods'):
+            queryset = queryset.filter(goods_id=params['goods'])
+        querysets.append(queryset)
+    return querysets
+
+
+# 导出名称 -> (查询集构造函数, 导出列)；列名直接作为 values_list 的字段，跨表字段在 SQL 中 JOIN
+# 构造函数返回多个查询集时（字段相同、排序相同），按排序列归并
+EXPORTS = {
+    'goods': (_goods_queryset, [
+        'id', 'name', 'price_cents', 'category', 'condition', 'location', 'contact', 'image',
+        'seller__username', 'is_sold', 'created_at', 'updated_at',
+    ]),
+    'purchases': (_purchases_queryset, [
+        'id', 'name', 'price_cents', 'category', 'seller__username', 'buyer__username', 'sold_at',
+    ]),
+    'messages': (_messages_queryset, [
+        'id', 'goods_id', 'goods_name', 'sender__username', 'receiver__username',
+        'content', 'is_read', 'created_at',
+    ]),
+}
+
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+class _Echo:
+    """csv.writer 需要一个文件对象，这里直接把写入的行返回"""
+
+    def write(self, value):
+        return value
+
+
+def _merge_key(columns, ordering):
+    """归并用的排序键：与 SQL 的升序一致，NULL 排在最前"""
+    indexes = [columns.index(field) for field in ordering]
+
+    def key(row):
+        return tuple(part for index in indexes for part in (row[index] is not None, row[index] or 0))
+    return key
+
+
+def iter_rows(name, params=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """按块迭代导出行，返回 (列名, 行迭代器)"""
+    build_queryset, columns = EXPORTS[name]
+    querysets = build_queryset(params or {})
+    if not isinstance(querysets, list):
+        return columns, querysets.values_list(*columns).iterator(chunk_size=chunk_size)
+    key = _merge_key(columns, querysets[0].query.order_by)
+    return columns, heapq.merge(
+        *(queryset.values_list(*columns).iterator(chunk_size=chunk_size) for queryset in querysets), key=key
+    )
+
+
+def stream_csv(columns, rows):
+    writer = csv.writer(_Echo())
+    yield '\ufeff' + writer.writerow(columns)  # BOM，方便 Excel 识别 UTF-8
+    for row in rows:
+        yield writer.writerow([_encode(value) for value in row])
+
+
+def stream_jsonl(columns, rows):
+    for row in rows:
+        record = {column: _encode(value) for column, value in zip(columns, row)}
+        yield json.dumps(record, ensure_ascii=False) + '\n'
+
+
+def stream_export(name, fmt, params=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """返回导出内容的字符串生成器"""
+    columns, rows = iter_rows(name, params, chunk_size)
+    if fmt == 'csv':
+        return stream_csv(columns, rows)
+    return stream_jsonl(columns, rows)
@@ -0,0 +1,112 @@
+# api/filters.py
+"""
+商品列表的查询参数过滤（goods_list、分面统计共用）
+
+    category=books,sports   分类（可多选，逗号分隔）
+    condition=new           成色（可多选）
+    min_price / max_price   价格区间（闭区间）
+    q=关键字                 名称包含
+    region=110000 或 北京     地区（行政区划代码或城市名）
+    lat, lng, radius        附近搜索（radius 单位 km，默认 10）
+
+parse_goods_filters 返回 {参数名: Q}，用 goods.facets.combine_filters 合并；
+分面统计计算某个维度时会去掉该维度自身的条件，facet_params 生成它的缓存键参数。
+"""
+from django.db.models import Q
+
+from goods import geo
+from goods.models import Goods
+from goods.money import to_cents
+
+CATEGORIES = {value for value, _ in Goods.CATEGORY_CHOICES}
+CONDITIONS = {value for value, _ in Goods.CONDITION_CHOICES}
+DEFAULT_RADIUS_KM = 10
+MAX_RADIUS_KM = 200
+NEAR_KEY_DIGITS = 3  # 分面缓存键中坐标保留的小数位（约 100m）
+
+
+class FilterError(ValueError):
+    """查询参数不合法"""
+
+
+def _choices(params, name, allowed):
+    values = [value for value in params.get(name, '').split(',') if value]
+    invalid = [value for value in values if value not in allowed]
+    if invalid:
+        raise FilterError(f'无效的 {name}: {", ".join(invalid)}')
+    return values
+
+
+def _price(params, name):
+    value = params.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        cents = to_cents(value)
+    except ValueError:
+        raise FilterError(f'{name} 必须是数字')
+    if cents < 0:
+        raise FilterError(f'{name} 不能为负数')
+    return cents
+
+
+def parse_near(params):
+    """附近搜索参数 -> (纬度, 经度, 半径km)，没有传 lat/lng 时返回 None"""
+    if params.get('lat') in (None, '') and params.get('lng') in (None, ''):
+        return None
+    try:
+        latitude = float(params.get('lat'))
+        longitude = float(params.get('lng'))
+        radius = float(params.get('radius') or DEFAULT_RADIUS_KM)
+    except (TypeError, ValueError):
+        raise FilterError('lat、lng、radius 必须是数字')
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        raise FilterError('坐标超出范围')
+    if not 0 < radius <= MAX_RADIUS_KM:
+        raise FilterError(f'radius 必须在 0~{MAX_RADIUS_KM} km 之间')
+    return latitude, longitude, radius
+
+
+def parse_goods_filters(params):
+    """把查询参数解析为 {参数名: Q}，参数不合法时抛出 FilterError"""
+    filters = {}
+    categories = _choices(params, 'category', CATEGORIES)
+    if categories:
+        filters['category'] = Q(category__in=categories)
+    conditions = _choices(params, 'condition', CONDITIONS)
+    if conditions:
+        filters['condition'] = Q(condition__in=conditions)
+    min_price = _price(params, 'min_price')
+    if min_price is not None:
+        filters['min_price'] = Q(price_cents__gte=min_price)
+    max_price = _price(params, 'max_price')
+    if max_price is not None:
+        filters['max_price'] = Q(price_cents__lte=max_price)
+    keyword = params.get('q', '').strip()
+    if keyword:
+        filters['q'] = Q(name__icontains=keyword)
+    region = params.get('region', '').strip()
+    if region:
+        place = geo.resolve_region(region)
+        if place is None:
+            raise FilterError(f'无法识别的地区: {region}')
+        filters['region'] = Q(region_code=place.code)
+    near = parse_near(params)
+    if near is not None:
+        # 索引区间 + 矩形缩小扫描范围，再按球面距离精确过滤（列表接口另用 geo.within_radius 计算距离）
+        filters['near'] = geo.near_filter(*near) & geo.radius_condition(*near)
+    return filters
+
+
+def facet_params(params):
+    """
+    分面统计缓存键用的规范化参数（参数已经过 parse_goods_filters 校验）
+    附近搜索按实际坐标和半径生成键，坐标保留 NEAR_KEY_DIGITS 位小数，相距很近的请求共用同一份缓存
+    """
+    normalized = {name: params.get(name) for name in ('category', 'condition', 'min_price', 'max_price', 'q', 'region')}
+    near = parse_near(params)
+    if near is not None:
+        latitude, longitude, radius = near
+        normalized['near'] = f'{latitude:.{NEAR_KEY_DIGITS}f},{longitude:.{NEAR_KEY_DIGITS}f},{radius:g}'
+    return normalized
+
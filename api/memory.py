@@ -0,0 +1,112 @@
+# api/memory.py
+"""
+进程内存监控
+
+- RSS：当前常驻内存读取 /proc/self/statm（非 Linux 为 None），峰值读取 ru_maxrss
+- 按接口统计：PerformanceMiddleware 记录每个请求期间进程 RSS 峰值的增长（peak_rss_growth_bytes），
+  找出把 worker 内存撑大的接口；同一进程内并发处理的请求会互相影响，只作定位参考
+- tracemalloc：MEMORY['TRACEMALLOC_FRAMES'] > 0 时进程启动即开始追踪（有明显的 CPU 和内存开销，排查时开启），
+  快照按代码行汇总，可以和上一次快照对比找出增长最多的位置
+- /api/debug/memory/ 查看以上数据，python manage.py memory_profile 离线测量各接口的内存峰值
+"""
+import os
+import resource
+import sys
+import threading
+import tracemalloc
+
+from django.conf import settings
+
+from api.metrics import METRIC_PREFIX
+
+DEFAULTS = {
+    'STREAM_BATCH_SIZE': 500,
+    'TRACK_RSS': True,
+    'TRACEMALLOC_FRAMES': 0,
+    'TOP_ALLOCATIONS': 20,
+}
+
+SNAPSHOT_GROUPS = ('lineno', 'filename', 'traceback')
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+_snapshot_lock = threading.Lock()
+_last_snapshot = None
+
+
+def get_memory_setting(key):
+    return getattr(settings, 'MEMORY', {}).get(key, DEFAULTS[key])
+
+
+def current_rss():
+    """当前常驻内存（字节），无法读取时返回 None"""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def peak_rss():
+    """进程启动以来的常驻内存峰值（字节）；Linux 上 ru_maxrss 单位是 KB，macOS 上是字节"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def start_tracing():
+    """按 MEMORY['TRACEMALLOC_FRAMES'] 开启 tracemalloc（已开启或配置为 0 时不做任何事）"""
+    frames = get_memory_setting('TRACEMALLOC_FRAMES')
+    if frames and not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+
+
+def _format_stat(stat):
+    frames = [f'{frame.filename}:{frame.lineno}' for frame in stat.traceback]
+    return {'location': frames[0] if frames else '?', 'traceback': frames, 'size': stat.size, 'count': stat.count}
+
+
+def _format_diff(stat):
+    data = _format_stat(stat)
+    data.update(size_diff=stat.size_diff, count_diff=stat.count_diff)
+    return data
+
+
+def take_snapshot(group_by='lineno', top=None, compare=False):
+    """
+    tracemalloc 快照（只统计 Python 分配的内存，不含 C 扩展自行分配的部分）
+    compare=True 时同时返回与上一次快照相比增长最多的位置；未开启追踪时返回 None
+    """
+    global _last_snapshot
+    if not tracemalloc.is_tracing():
+        return None
+    top = top or get_memory_setting('TOP_ALLOCATIONS')
+    snapshot = tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap*>'),
+    ])
+    traced_current, traced_peak = tracemalloc.get_traced_memory()
+    data = {
+        'traced_current': traced_current,
+        'traced_peak': traced_peak,
+        'top': [_format_stat(stat) for stat in snapshot.statistics(group_by)[:top]],
+    }
+    with _snapshot_lock:
+        if compare and _last_snapshot is not None:
+            data['growth'] = [_format_diff(stat) for stat in snapshot.compare_to(_last_snapshot, group_by)[:top]]
+        _last_snapshot = snapshot
+    return data
+
+
+def render_prometheus():
+    """进程级内存指标（gauge），附加在 /api/metrics/ 的输出后面"""
+    lines = []
+    for name, help_text, value in (
+        ('process_resident_memory_bytes', '当前常驻内存（字节）', current_rss()),
+        ('process_peak_resident_memory_bytes', '常驻内存峰值（字节）', peak_rss()),
+    ):
+        if value is None:
+            continue
+        metric = f'{METRIC_PREFIX}_{name}'
+        lines.append(f'# HELP {metric} {help_text}')
+        lines.append(f'# TYPE {metric} gauge')
+        lines.append(f'{metric} {value}')
+    return '\n'.join(lines) + '\n' if lines else ''
@@ -0,0 +1,123 @@
+# api/metrics.py
+"""
+进程内性能指标聚合
+
+按 URL 名称（goods-list、good-detail 等）和请求方法聚合直方图，
+并导出为 Prometheus 文本格式。数据只保存在当前进程内存中，
+多进程部署时每个 worker 各自统计。
+"""
+import bisect
+import threading
+
+# 直方图分桶
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+MEMORY_BUCKETS = (0, 65536, 262144, 1048576, 4194304, 16777216, 67108864, 268435456)
+
+METRIC_PREFIX = 'djangots'
+
+# 指标名 -> (说明, 分桶)
+METRICS = {
+    'request_duration_seconds': ('请求总耗时（秒）', DURATION_BUCKETS),
+    'db_queries': ('每个请求的SQL查询次数', QUERY_COUNT_BUCKETS),
+    'db_duration_seconds': ('每个请求的SQL总耗时（秒）', DURATION_BUCKETS),
+    'serialize_duration_seconds': ('序列化器 to_representation 耗时（秒），含其间触发的查询', DURATION_BUCKETS),
+    'render_duration_seconds': ('DRF 响应渲染（JSON 编码）耗时（秒），不含序列化', DURATION_BUCKETS),
+    'response_size_bytes': ('响应体大小（字节）', SIZE_BUCKETS),
+    'peak_rss_growth_bytes': ('请求期间进程 RSS 峰值的增长（字节，见 api/memory.py）', MEMORY_BUCKETS),
+}
+
+
+class Histogram:
+    """累积分桶直方图（与 Prometheus histogram 语义一致）"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.bucket_counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.max = None
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            self.bucket_counts[index] += 1
+        self.count += 1
+        self.sum += value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def cumulative(self):
+        """返回 [(上界, 累计次数), ...]，最后一项为 +Inf"""
+        result = []
+        running = 0
+        for bound, count in zip(self.buckets, self.bucket_counts):
+            running += count
+            result.append((bound, running))
+        result.append(('+Inf', self.count))
+        return result
+
+
+class MetricsRegistry:
+    """线程安全的指标注册表"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}  # (指标名, view, method) -> Histogram
+
+    def observe(self, view, method, values):
+        """记录一次请求的各项指标，values 为 {指标名: 数值}"""
+        with self._lock:
+            for name, value in values.items():
+                if value is None or name not in METRICS:
+                    continue
+                key = (name, view, method)
+                histogram = self._histograms.get(key)
+                if histogram is None:
+                    histogram = self._histograms[key] = Histogram(METRICS[name][1])
+                histogram.observe(value)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def snapshot(self):
+        """返回 {(指标名, view, method): (count, sum)}，便于调试和基准对比"""
+        with self._lock:
+            return {key: (h.count, h.sum) for key, h in self._histograms.items()}
+
+    def summary(self, name):
+        """某个指标按接口汇总：{(view, method): {'count', 'sum', 'max'}}"""
+        with self._lock:
+            return {
+                (view, method): {'count': h.count, 'sum': h.sum, 'max': h.max}
+                for (metric_name, view, method), h in self._histograms.items() if metric_name == name
+            }
+
+    def render_prometheus(self):
+        """导出为 Prometheus 文本格式（text/plain; version=0.0.4）"""
+        with self._lock:
+            items = sorted(self._histograms.items())
+            lines = []
+            for name, (help_text, _buckets) in METRICS.items():
+                metric = f'{METRIC_PREFIX}_{name}'
+                lines.append(f'# HELP {metric} {help_text}')
+                lines.append(f'# TYPE {metric} histogram')
+                for (metric_name, view, method), histogram in items:
+                    if metric_name != name:
+                        continue
+                    labels = f'view="{_escape(view)}",method="{_escape(method)}"'
+                    for bound, count in histogram.cumulative():
+                        lines.append(f'{metric}_bucket{{{labels},le="{bound}"}} {count}')
+                    lines.append(f'{metric}_sum{{{labels}}} {histogram.sum:.6f}')
+                    lines.append(f'{metric}_count{{{labels}}} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+# 全局注册表（每个进程一个）
+registry = MetricsRegistry()
@@ -0,0 +1,248 @@
+# api/middleware.py
+import threading
+import time
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from django.http import JsonResponse
+
+from api.memory import get_memory_setting, peak_rss, start_tracing
+from api.metrics import registry
+from api.querylog import QueryInspector, get_inspection_setting
+from api.throttling import get_throttle_setting
+
+
+def get_perf_setting(key, default=None):
+    """读取 settings.PERF_METRICS 中的配置项"""
+    return getattr(settings, 'PERF_METRICS', {}).get(key, default)
+
+
+# 当前请求的 RequestStats，供序列化器记录耗时（见 api/serializers.py TimedModelSerializer）
+_current_stats = ContextVar('perf_stats', default=None)
+
+
+def current_stats():
+    return _current_stats.get()
+
+
+class RequestStats:
+    """单个请求的性能数据"""
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.render_time = None
+        self._render_start = None
+        self.serialize_time = None
+        self.serializing = False  # 正在执行最外层的 to_representation，嵌套的序列化器不重复计时
+
+    def db_wrapper(self, execute, sql, params, many, context):
+        """数据库 execute wrapper：统计查询次数和耗时"""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.db_queries += 1
+
+    def add_serialize_time(self, seconds):
+        self.serialize_time = (self.serialize_time or 0.0) + seconds
+
+    def start_render(self):
+        self._render_start = time.perf_counter()
+
+    def stop_render(self, response=None):
+        if self._render_start is not None:
+            self.render_time = time.perf_counter() - self._render_start
+
+
+def is_generator_stream(response):
+    """StreamingHttpResponse（FileResponse 可能由服务器直接发送文件，不经过 streaming_content）"""
+    return response.streaming and not response.is_async and getattr(response, 'file_to_stream', None) is None
+
+
+class ObservedStream:
+    """
+    包装流式响应的内容：输出完毕、中途出错或 response.close() 时调用一次 on_finish(已输出字节数)
+    赋给 response.streaming_content 后 close 会登记到响应的资源清理列表，未开始输出就关闭时也会调用
+    """
+
+    def __init__(self, content, on_finish):
+        self.content = content
+        self.on_finish = on_finish
+        self.size = 0
+        self.finished = False
+
+    def __iter__(self):
+        try:
+            for chunk in self.content:
+                self.size += len(chunk)
+                yield chunk
+        finally:
+            self.close()
+
+    def close(self):
+        if not self.finished:
+            self.finished = True
+            self.on_finish(self.size)
+
+
+class PerformanceMiddleware:
+    """
+    请求级性能监控中间件
+    记录总耗时、SQL次数和耗时、渲染耗时、响应大小、进程 RSS 峰值的增长，
+    写入 Server-Timing 响应头并按 URL 名称聚合到 api.metrics.registry
+    流式响应在内容输出完毕后才记录（包括输出期间执行的查询），不加 Server-Timing
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = get_perf_setting('ENABLED', True)
+        self.server_timing = get_perf_setting('SERVER_TIMING', True)
+        self.track_rss = get_memory_setting('TRACK_RSS')  # 🔥 新增：按接口统计内存
+        start_tracing()
+
+    def __call__(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+
+        stats = RequestStats()
+        request.perf_stats = stats
+        start = time.perf_counter()
+        peak_before = peak_rss() if self.track_rss else None
+
+        stack = ExitStack()
+        try:
+            _current_stats.set(stats)
+            stack.callback(_current_stats.set, None)
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(stats.db_wrapper))
+            response = self.get_response(request)
+        except BaseException:
+            stack.close()
+            raise
+
+        if is_generator_stream(response):
+            # 🔥 流式响应的内容（和其中的查询、序列化）在中间件返回之后才生成：wrapper 保持到输出完毕再关闭，
+            # 届时记录指标。Server-Timing 必须在输出前发送，无法包含这部分，因此流式响应不加该响应头
+            def finish(size):
+                stack.close()
+                self._observe(request, start, stats, size, peak_before)
+            response.streaming_content = ObservedStream(response.streaming_content, finish)
+            return response
+
+        stack.close()
+        size = None if response.streaming else len(response.content)
+        total = self._observe(request, start, stats, size, peak_before)
+        if self.server_timing:
+            response['Server-Timing'] = self._server_timing(total, stats)
+        return response
+
+    @staticmethod
+    def _observe(request, start, stats, size, peak_before):
+        """按 URL 名称聚合到 registry，返回总耗时"""
+        total = time.perf_counter() - start
+        match = getattr(request, 'resolver_match', None)
+        view_name = (match.url_name or match.view_name) if match else 'unmatched'
+        values = {
+            'request_duration_seconds': total,
+            'db_queries': stats.db_queries,
+            'db_duration_seconds': stats.db_time,
+            'serialize_duration_seconds': stats.serialize_time,
+            'render_duration_seconds': stats.render_time,
+            'response_size_bytes': size,
+        }
+        if peak_before is not None:
+            values['peak_rss_growth_bytes'] = peak_rss() - peak_before
+        registry.observe(view_name or 'unnamed', request.method, values)
+        return total
+
+    def process_template_response(self, request, response):
+        """DRF 的 Response 在所有中间件之后才渲染，通过回调统计渲染耗时"""
+        stats = getattr(request, 'perf_stats', None)
+        if stats is not None:
+            stats.start_render()
+            response.add_post_render_callback(stats.stop_render)
+        return response
+
+    @staticmethod
+    def _server_timing(total, stats):
+        parts = [
+            f'total;dur={total * 1000:.2f}',
+            f'db;dur={stats.db_time * 1000:.2f};desc="{stats.db_queries} queries"',
+        ]
+        if stats.serialize_time is not None:
+            parts.append(f'serialize;dur={stats.serialize_time * 1000:.2f}')
+        if stats.render_time is not None:
+            parts.append(f'render;dur={stats.render_time * 1000:.2f}')
+        return ', '.join(parts)
+
+
+class QueryInspectionMiddleware:
+    """
+    慢查询日志和 N+1 检测中间件
+    由 settings.QUERY_INSPECTION['ENABLED'] 控制，开发和生产环境可分别开关
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = get_inspection_setting('ENABLED')
+
+    def __call__(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+
+        inspector = QueryInspector(request)
+        stack = ExitStack()
+        try:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(inspector))
+            response = self.get_response(request)
+        except BaseException:
+            stack.close()
+            raise
+
+        if is_generator_stream(response):
+            # 🔥 流式响应输出期间执行的查询也要检查，输出完毕后再关闭 wrapper 并报告
+            def finish(size):
+                stack.close()
+                inspector.report()
+            response.streaming_content = ObservedStream(response.streaming_content, finish)
+            return response
+
+        stack.close()
+        inspector.report()
+        return response
+
+
+class ConcurrencyLimitMiddleware:
+    """
+    写请求并发限制（准入控制）
+    SQLite 同一时刻只允许一个写事务，写请求排队过长时直接返回 503，
+    而不是让请求堆积在数据库锁上。限制作用于单个进程内的线程。
+    """
+    LIMIT_METHODS = ('POST', 'PUT', 'PATCH', 'DELETE')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        limit = get_throttle_setting('MAX_CONCURRENT_WRITES')
+        self.semaphore = threading.BoundedSemaphore(limit) if limit else None
+        self.queue_timeout = get_throttle_setting('QUEUE_TIMEOUT')
+
+    def __call__(self, request):
+        if self.semaphore is None or request.method not in self.LIMIT_METHODS:
+            return self.get_response(request)
+
+        if not self.semaphore.acquire(timeout=self.queue_timeout):
+            response = JsonResponse({
+                'success': False,
+                'message': '服务繁忙，请稍后重试'
+            }, status=503)
+            response['Retry-After'] = '1'
+            return response
+        try:
+            return self.get_response(request)
+        finally:
+            self.semaphore.release()
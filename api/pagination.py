@@ -0,0 +1,88 @@
+# api/pagination.py
+"""
+游标分页：按 (created_at, id) 定位，翻页成本与页码无关，数据新增时不会重复或漏掉
+
+    ?cursor=<上一页返回的 next>&page_size=20
+
+CreatedCursorPagination 用于单个查询集（DRF CursorPagination）；
+MergedCursorPagination 用于热表 + 归档表合并的列表
+"""
+import binascii
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+from rest_framework.utils.urls import replace_query_param
+
+
+class CreatedCursorPagination(CursorPagination):
+    ordering = ('-created_at', '-id')
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def page_links(self):
+        return {'next': self.get_next_link(), 'previous': self.get_previous_link()}
+
+
+class CommentCursorPagination(CreatedCursorPagination):
+    """商品评论"""
+
+
+class MergedCursorPagination:
+    """
+    多个查询集（如留言热表 + 归档表）按 (-created_at, -id) 合并的游标分页，只支持向后翻页
+    每个查询集各取 page_size + 1 行再合并，内存占用只与页大小有关；各表的 id 不能重复
+    """
+    cursor_query_param = 'cursor'
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    invalid_cursor_message = '无效的游标'
+
+    def paginate(self, querysets, request):
+        self.request = request
+        size = self.get_page_size(request)
+        position = self.decode_cursor(request)
+        rows = []
+        for queryset in querysets:
+            if position is not None:
+                created_at, row_id = position
+                queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=row_id))
+            rows.extend(queryset.order_by('-created_at', '-id')[:size + 1])
+        rows.sort(key=lambda row: (row.created_at, row.id), reverse=True)
+        self.has_next = len(rows) > size
+        page = rows[:size]
+        self.last = page[-1] if page else None
+        return page
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            created_at, row_id = urlsafe_b64decode(encoded.encode('ascii')).decode('ascii').rsplit('|', 1)
+            return datetime.fromisoformat(created_at), int(row_id)
+        except (TypeError, ValueError, UnicodeError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, row):
+        return urlsafe_b64encode(f'{row.created_at.isoformat()}|{row.id}'.encode('ascii')).decode('ascii')
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.last))
+
+    def page_links(self):
+        return {'next': self.get_next_link()}
@@ -0,0 +1,132 @@
+# api/querylog.py
+"""
+慢查询日志 + N+1 检测
+
+通过 connection.execute_wrapper 挂到每个请求上（见 api.middleware.QueryInspectionMiddleware）：
+- 单条 SQL 超过阈值时记录 SQL、来源视图和项目内调用栈
+- 同一请求内相同 SQL 模板重复执行超过阈值时判定为 N+1
+- 视图可以用 @query_budget(n) 声明查询预算，超出时记录日志，测试环境下可直接抛异常
+"""
+import functools
+import logging
+import re
+import time
+import traceback
+from collections import Counter
+
+from django.conf import settings
+
+logger = logging.getLogger('api.queries')
+
+# IN (%s, %s, ...) 长度不同也视为同一个模板
+_IN_CLAUSE_RE = re.compile(r'\(\s*%s(?:\s*,\s*%s)*\s*\)')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+DEFAULTS = {
+    'ENABLED': False,
+    'SLOW_QUERY_MS': 100,
+    'N_PLUS_ONE_THRESHOLD': 5,
+    'STACK_DEPTH': 8,
+    'RAISE_ON_BUDGET': False,
+}
+
+
+class QueryBudgetExceeded(Exception):
+    """视图执行的查询数超出 @query_budget 声明的预算"""
+
+
+def get_inspection_setting(key):
+    return getattr(settings, 'QUERY_INSPECTION', {}).get(key, DEFAULTS[key])
+
+
+def normalize_sql(sql):
+    """把 SQL 归一化为模板（参数已经是 %s 占位符，只需折叠 IN 列表和空白）"""
+    sql = _IN_CLAUSE_RE.sub('(%s...)', sql)
+    return _WHITESPACE_RE.sub(' ', sql).strip()
+
+
+def query_budget(max_queries):
+    """
+    声明视图的查询预算，需放在 @api_view 外层：
+
+        @query_budget(5)
+        @api_view(['GET'])
+        def goods_list(request): ...
+    """
+    def decorator(view_func):
+        @functools.wraps(view_func)
+        def wrapped(*args, **kwargs):
+            return view_func(*args, **kwargs)
+        wrapped.query_budget = max_queries
+        return wrapped
+    return decorator
+
+
+def project_stack(depth):
+    """返回项目代码内的调用栈（排除第三方库和本模块）"""
+    base_dir = str(settings.BASE_DIR)
+    frames = [
+        frame for frame in traceback.extract_stack()[:-2]
+        if frame.filename.startswith(base_dir)
+        and 'site-packages' not in frame.filename
+        and not frame.filename.endswith(('querylog.py', 'middleware.py'))
+    ]
+    return ''.join(traceback.format_list(frames[-depth:]))
+
+
+class QueryInspector:
+    """单个请求的查询检查器（execute wrapper）"""
+
+    def __init__(self, request):
+        self.request = request
+        self.slow_seconds = get_inspection_setting('SLOW_QUERY_MS') / 1000
+        self.stack_depth = get_inspection_setting('STACK_DEPTH')
+        self.templates = Counter()
+        self.first_stack = {}
+        self.query_count = 0
+
+    @property
+    def view_name(self):
+        match = getattr(self.request, 'resolver_match', None)
+        if match is None:
+            return self.request.path
+        return match.view_name or match.url_name or self.request.path
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.query_count += 1
+            template = normalize_sql(sql)
+            self.templates[template] += 1
+            if self.templates[template] == 2:
+                # 第二次出现时才记录调用栈，避免每条查询都抓栈
+                self.first_stack[template] = project_stack(self.stack_depth)
+            if elapsed >= self.slow_seconds:
+                logger.warning(
+                    '慢查询 %.1fms [%s %s]\n%s\n参数: %r\n调用栈:\n%s',
+                    elapsed * 1000, self.request.method, self.view_name,
+                    sql, params, project_stack(self.stack_depth)
+                )
+
+    def repeated_templates(self):
+        threshold = get_inspection_setting('N_PLUS_ONE_THRESHOLD')
+        return [(sql, count) for sql, count in self.templates.most_common() if count >= threshold]
+
+    def report(self):
+        """请求结束时检查 N+1 和查询预算"""
+        for sql, count in self.repeated_templates():
+            logger.warning(
+                '疑似 N+1 查询 [%s %s]：同一模板执行了 %d 次\n%s\n调用栈:\n%s',
+                self.request.method, self.view_name, count, sql, self.first_stack.get(sql, '')
+            )
+
+        match = getattr(self.request, 'resolver_match', None)
+        budget = getattr(match.func, 'query_budget', None) if match else None
+        if budget is not None and self.query_count > budget:
+            message = f'{self.request.method} {self.view_name} 执行了 {self.query_count} 条查询，超出预算 {budget}'
+            if get_inspection_setting('RAISE_ON_BUDGET'):
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
@@ -1,10 +1,42 @@
 # api/serializers.py
+import time
+
 from rest_framework import serializers
-from goods.models import Goods, Comment, Like, Favorite, Message
+from django.core.files.storage import default_storage
+from goods.models import Goods, Comment, Like, Favorite, Message, ArchivedGoods, ArchivedMessage
+from goods import geo
+from goods.archive import merge_by
+from goods.facets import invalidate_facets
+from goods.money import to_cents
+from goods.tasks import delete_files
 from django.contrib.auth.models import User
+from django.db.models import Exists, OuterRef
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from api.middleware import current_stats
+
+
+class VersionConflict(Exception):
+    """🔥 新增：条件更新时商品版本号已变化（期间有其他写入）"""
+
 
+class TimedModelSerializer(serializers.ModelSerializer):
+    """🔥 新增：序列化耗时计入当前请求的性能指标（serialize_duration_seconds），只计最外层的 to_representation"""
 
-class UserSimpleSerializer(serializers.ModelSerializer):
+    def to_representation(self, instance):
+        stats = current_stats()
+        if stats is None or stats.serializing:
+            return super().to_representation(instance)
+        stats.serializing = True
+        start = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            stats.serializing = False
+            stats.add_serialize_time(time.perf_counter() - start)
+
+
+class UserSimpleSerializer(TimedModelSerializer):
     """简化用户序列化器"""
 
     class Meta:
@@ -12,7 +44,7 @@ class UserSimpleSerializer(serializers.ModelSerializer):
         fields = ['id', 'username', 'email']
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(TimedModelSerializer):
     """评论序列化器"""
     user = UserSimpleSerializer(read_only=True)
 
@@ -22,7 +54,7 @@ class CommentSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'goods', 'user', 'created_at', 'updated_at']  # 🔥 修复：添加 goods 和 user
 
 
-class LikeSerializer(serializers.ModelSerializer):
+class LikeSerializer(TimedModelSerializer):
     """点赞序列化器"""
     user = UserSimpleSerializer(read_only=True)
 
@@ -32,7 +64,7 @@ class LikeSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'goods', 'user', 'created_at']  # 🔥 修复：添加 goods 和 user
 
 
-class FavoriteSerializer(serializers.ModelSerializer):
+class FavoriteSerializer(TimedModelSerializer):
     """收藏序列化器"""
     user = UserSimpleSerializer(read_only=True)
 
@@ -42,7 +74,7 @@ class FavoriteSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'goods', 'user', 'created_at']  # 🔥 修复：添加 goods 和 user
 
 
-class MessageSerializer(serializers.ModelSerializer):
+class MessageSerializer(TimedModelSerializer):
     """留言序列化器"""
     sender = UserSimpleSerializer(read_only=True)
     receiver = UserSimpleSerializer(read_only=True)
@@ -54,8 +86,10 @@ class MessageSerializer(serializers.ModelSerializer):
 
 
 # 更新商品序列化器
-class GoodsSerializer(serializers.ModelSerializer):
+class GoodsSerializer(TimedModelSerializer):
     seller = UserSimpleSerializer(read_only=True)
+    # 🔥 修改：价格以分存储，接口按两位小数的元读写（JSON 中仍是数字）
+    price = serializers.DecimalField(max_digits=14, decimal_places=2, min_value=0, coerce_to_string=False)
     comments_count = serializers.SerializerMethodField()
     likes_count = serializers.SerializerMethodField()
     favorites_count = serializers.SerializerMethodField()
@@ -68,31 +102,146 @@ class GoodsSerializer(serializers.ModelSerializer):
             "id", "name", "price", "description", "category", "condition",
             "location", "contact", "image", "seller", "is_sold", "created_at",
             "updated_at", "get_image_url", "comments_count", "likes_count",
-            "favorites_count", "is_liked", "is_favorited"
+            "favorites_count", "is_liked", "is_favorited",
+            "region_code", "latitude", "longitude", "version"
         ]
-        read_only_fields = ["seller", "is_sold", "created_at", "updated_at"]
+        read_only_fields = ["seller", "is_sold", "created_at", "updated_at", "region_code", "version"]
+        extra_kwargs = {
+            "latitude": {"min_value": -90, "max_value": 90},
+            "longitude": {"min_value": -180, "max_value": 180},
+        }
 
     def create(self, validated_data):
         validated_data["seller"] = self.context["request"].user
         return super().create(validated_data)
 
+    def update(self, instance, validated_data):
+        """
+        🔥 修改：条件更新，只写入有变化的列，并且要求版本号未变（save(expected_version=...) 传入，
+        默认为读取实例时的版本号），版本号不一致时抛出 VersionConflict
+        """
+        expected_version = validated_data.pop("expected_version", instance.version)
+        changes = {}
+        for field, value in validated_data.items():
+            if field == "price":
+                field, value = "price_cents", to_cents(value)
+            if field == "image" or getattr(instance, field) != value:
+                changes[field] = value
+
+        if changes.keys() & {"location", "latitude", "longitude"}:
+            latitude = changes.get("latitude", instance.latitude)
+            longitude = changes.get("longitude", instance.longitude)
+            # 修改了位置但没有提交坐标时，丢弃旧坐标，按新位置重新取城市中心坐标
+            if "location" in changes and "latitude" not in validated_data and "longitude" not in validated_data:
+                latitude = longitude = None
+            region_code, latitude, longitude, geohash = geo.normalize(
+                changes.get("location", instance.location), latitude, longitude,
+            )
+            changes.update(region_code=region_code, latitude=latitude, longitude=longitude, geohash=geohash)
+
+        if "image" in changes:
+            image = changes["image"]
+            if image:
+                # 条件更新不经过 FileField.pre_save，先把上传的文件写入存储
+                instance.image.save(image.name, image, save=False)
+                changes["image"] = instance.image.name
+            else:
+                changes["image"] = None
+
+        if not changes:
+            return instance
+        if not instance.conditional_update(expected_version, **changes):
+            if changes.get("image"):
+                delete_files.delay([changes["image"]])  # 没有写入，删除刚上传的文件
+            raise VersionConflict()
+        invalidate_facets()
+        return instance
+
     def get_comments_count(self, obj):
+        if hasattr(obj, 'comments_total'):
+            return obj.comments_total  # 🔥 with_list_annotations 注解的值
         return obj.comments.count()
 
     def get_likes_count(self, obj):
-        return obj.likes.count()
+        return obj.likes_count  # 🔥 使用计数器字段，不再每行 COUNT
 
     def get_favorites_count(self, obj):
-        return obj.favorites.count()
+        return obj.favorites_count
 
     def get_is_liked(self, obj):
         request = self.context.get('request')
         if request and request.user.is_authenticated:
+            if hasattr(obj, 'viewer_liked'):
+                return obj.viewer_liked
             return obj.likes.filter(user=request.user).exists()
         return False
 
     def get_is_favorited(self, obj):
         request = self.context.get('request')
         if request and request.user.is_authenticated:
+            if hasattr(obj, 'viewer_favorited'):
+                return obj.viewer_favorited
             return obj.favorites.filter(user=request.user).exists()
-        return False
\ No newline at end of file
+        return False
+
+
+def with_list_annotations(queryset, request):
+    """
+    🔥 列表接口使用：卖家、评论数（GoodsRating）、当前用户是否点赞/收藏随商品一条查询取出，
+    GoodsSerializer 序列化时不再每行查询
+    """
+    queryset = queryset.select_related('seller').annotate(comments_total=Coalesce('rating__count', 0))
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        queryset = queryset.annotate(
+            viewer_liked=Exists(Like.objects.filter(goods_id=OuterRef('pk'), user_id=user.pk)),
+            viewer_favorited=Exists(Favorite.objects.filter(goods_id=OuterRef('pk'), user_id=user.pk)),
+        )
+    return queryset
+
+
+# 🔥 新增：归档数据序列化器（字段与热表的序列化器保持一致，额外带 archived 标记）
+class ArchivedGoodsSerializer(TimedModelSerializer):
+    seller = UserSimpleSerializer(read_only=True)
+    price = serializers.DecimalField(max_digits=14, decimal_places=2, coerce_to_string=False, read_only=True)
+    image = serializers.SerializerMethodField()
+    is_sold = serializers.BooleanField(default=True, read_only=True)
+    archived = serializers.BooleanField(default=True, read_only=True)
+
+    class Meta:
+        model = ArchivedGoods
+        fields = [
+            "id", "name", "price", "description", "category", "condition",
+            "location", "region_code", "contact", "image", "seller", "is_sold", "sold_at",
+            "created_at", "likes_count", "favorites_count", "comments_count", "archived"
+        ]
+        read_only_fields = fields
+
+    def get_image(self, obj):
+        if not obj.image:
+            return None
+        url = default_storage.url(obj.image)
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
+
+class ArchivedMessageSerializer(TimedModelSerializer):
+    goods = serializers.IntegerField(source='goods_id', read_only=True)
+    sender = UserSimpleSerializer(read_only=True)
+    receiver = UserSimpleSerializer(read_only=True)
+    archived = serializers.BooleanField(default=True, read_only=True)
+
+    class Meta:
+        model = ArchivedMessage
+        fields = ['id', 'goods', 'goods_name', 'sender', 'receiver', 'content', 'is_read', 'created_at', 'archived']
+        read_only_fields = fields
+
+
+def merge_serialized(hot_objects, hot_data, archived_objects, archived_data, field):
+    """合并热表和归档表的序列化结果（两边都已按 field 降序）"""
+    fallback = timezone.now().replace(year=1)
+    merged = merge_by(
+        lambda pair: getattr(pair[0], field) or fallback,
+        list(zip(hot_objects, hot_data)), list(zip(archived_objects, archived_data)),
+    )
+    return [data for _, data in merged]
@@ -0,0 +1,71 @@
+# api/streaming.py
+"""
+列表接口的流式 JSON 响应
+
+普通写法（serializer.data + Response）会同时持有：全部模型实例、每行一份的 serializer 字段对象、
+serializer.data 的字典列表和渲染后的整个响应体，大列表时 worker 的 RSS 会冲高且不会还给操作系统。
+
+这里改为：
+- 查询集用 .iterator(chunk_size=MEMORY['STREAM_BATCH_SIZE']) 分块读取，不缓存结果
+- 每种序列化器只创建一个实例，逐行调用 to_representation（字段对象只构造一次）
+- 每积累 STREAM_BATCH_SIZE 条编码为一个 JSON 片段输出，内存占用与列表长度无关
+
+输出格式与 Response 渲染的 JSON 一致（DRF 的 JSONEncoder，紧凑、不转义中文），
+数量等依赖列表长度的键放在列表之后输出。
+列表开始输出后发生的异常无法再返回错误状态码，响应会被截断（服务器日志中有记录）。
+"""
+import json
+
+from django.http import StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+
+from api.memory import get_memory_setting
+
+
+class StreamedList:
+    """JSON 数组：rows 逐项经 serialize 转换后输出，输出完成后 count 为实际数量"""
+
+    def __init__(self, rows, serialize):
+        self.rows = rows
+        self.serialize = serialize
+        self.count = 0
+
+
+def iter_json_object(fields, batch_size=None):
+    """
+    fields: [(键, 值), ...]；值可以是普通数据、StreamedList，
+    或无参可调用对象（输出到该键时才求值，如 lambda: goods.count）
+    """
+    batch_size = batch_size or get_memory_setting('STREAM_BATCH_SIZE')
+    encoder = JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+    separator = '{'
+    for key, value in fields:
+        prefix = separator + json.dumps(key, ensure_ascii=False) + ':'
+        separator = ','
+        if not isinstance(value, StreamedList):
+            yield prefix + encoder.encode(value() if callable(value) else value)
+            continue
+
+        chunk = [prefix + '[']
+        item_separator = ''
+        for row in value.rows:
+            chunk.append(item_separator + encoder.encode(value.serialize(row)))
+            item_separator = ','
+            value.count += 1
+            if len(chunk) >= batch_size:
+                yield ''.join(chunk)
+                chunk = []
+        chunk.append(']')
+        yield ''.join(chunk)
+    yield '}' if separator == ',' else '{}'
+
+
+def streaming_json_response(fields, status=200, batch_size=None):
+    return StreamingHttpResponse(
+        iter_json_object(fields, batch_size), status=status, content_type='application/json'
+    )
+
+
+def iter_queryset(queryset, batch_size=None):
+    """分块读取，不填充查询集缓存"""
+    return queryset.iterator(chunk_size=batch_size or get_memory_setting('STREAM_BATCH_SIZE'))
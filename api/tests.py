@@ -0,0 +1,411 @@
+import io
+import json
+import threading
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from api.middleware import ConcurrencyLimitMiddleware
+from api.querylog import QueryBudgetExceeded
+from api.throttling import LocalMemoryBucketBackend
+from goods.archive import archive_messages_batch
+from goods.models import ArchivedMessage, Favorite, Goods, Message
+
+BUDGET_SETTINGS = {'ENABLED': True, 'RAISE_ON_BUDGET': True, 'N_PLUS_ONE_THRESHOLD': 1000}
+
+
+def read(response):
+    """读完响应体（流式响应的查询在输出时执行，预算在输出完毕后检查）"""
+    return b''.join(response.streaming_content) if response.streaming else response.content
+
+
+@override_settings(QUERY_INSPECTION=BUDGET_SETTINGS)
+class QueryBudgetTests(TestCase):
+    """列表/详情接口的查询数不随数据量增长，超出 @query_budget 时测试失败"""
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command('seed_marketplace', users=10, goods=60, likes=5, favorites=5, comments=5, messages=5,
+                     stdout=io.StringIO())
+        cls.user = User.objects.get(pk=Message.objects.values_list('receiver_id', flat=True).first())
+        cls.goods = Goods.objects.filter(is_sold=False).first()
+
+    def setUp(self):
+        token = Token.objects.get_or_create(user=self.user)[0]
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Token {token.key}'
+
+    def test_list_and_detail_endpoints_within_budget(self):
+        paths = [
+            '/api/goods/', '/api/goods/?facets=1&category=books', '/api/goods/?lat=39.9&lng=116.4&radius=50',
+            f'/api/goods/{self.goods.id}/', '/api/goods/facets/', '/api/goods/trending/',
+            f'/api/goods/{self.goods.id}/similar/', '/api/feed/',
+            '/api/user-goods/my-goods/', '/api/user-goods/my-purchases/',
+            f'/api/goods/{self.goods.id}/comments/', f'/api/goods/{self.goods.id}/messages/',
+            '/api/user/favorites/', '/api/user/messages/', '/api/user/messages/received/',
+        ]
+        for path in paths:
+            with self.subTest(path=path):
+                response = self.client.get(path)
+                read(response)
+                self.assertEqual(response.status_code, 200)
+
+    def test_long_conversation_within_budget(self):
+        goods = Goods.objects.filter(seller__isnull=False).exclude(seller=self.user).first()
+        Message.objects.bulk_create([
+            Message(goods=goods, sender=self.user, receiver=goods.seller, content=f'第 {i} 条')
+            for i in range(20)
+        ])
+        response = self.client.get(f'/api/goods/{goods.id}/messages/')
+        self.assertEqual(response.status_code, 200)
+        self.assertGreaterEqual(response.json()['count'], 20)
+
+    def test_exceeding_budget_fails(self):
+        from api.views.goods import good_detail
+
+        with mock.patch.object(good_detail, 'query_budget', 1):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get(f'/api/goods/{self.goods.id}/')
+
+    def test_exceeding_budget_fails_for_streamed_response(self):
+        from api.views.messages import user_messages
+
+        with mock.patch.object(user_messages, 'query_budget', 1):
+            response = self.client.get('/api/user/messages/')
+            with self.assertRaises(QueryBudgetExceeded):
+                read(response)
+
+
+class GoodsMessageTests(TestCase):
+
+    def test_message_to_goods_without_seller_is_rejected(self):
+        user = User.objects.create_user('buyer')
+        goods = Goods.objects.create(name='书', price=10, description='d', seller=None)
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Token {Token.objects.create(user=user).key}'
+
+        response = self.client.post(f'/api/goods/{goods.id}/messages/', {'content': '还在吗'})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.json()['success'])
+        self.assertFalse(Message.objects.exists())
+
+
+class ExportTests(TestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser('root', 'root@example.com', 'pw')
+        self.seller, self.buyer = User.objects.create_user('seller'), User.objects.create_user('buyer')
+        self.goods = Goods.objects.create(name='书', price=10, description='d', seller=self.seller)
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Token {Token.objects.create(user=self.admin).key}'
+
+    def export(self, path):
+        response = self.client.get(path)
+        self.assertEqual(response.status_code, 200)
+        return [json.loads(line) for line in read(response).decode().splitlines()]
+
+    def test_messages_export_includes_archived_messages(self):
+        old, new = Message.objects.bulk_create([
+            Message(goods=self.goods, sender=self.buyer, receiver=self.seller, content=content)
+            for content in ('旧留言', '新留言')
+        ])
+        archive_messages_batch([old.id])
+        self.assertTrue(ArchivedMessage.objects.filter(id=old.id).exists())
+
+        rows = self.export(f'/api/export/messages/?fmt=jsonl&user={self.buyer.id}')
+        self.assertEqual([(row['id'], row['content'], row['goods_name']) for row in rows],
+                         [(old.id, '旧留言', '书'), (new.id, '新留言', '书')])
+
+    def test_invalid_filter_is_rejected(self):
+        response = self.client.get('/api/export/messages/?user=abc')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.json()['success'])
+
+
+@override_settings(PERF_METRICS={'ENABLED': True, 'SERVER_TIMING': True})
+class PerformanceMetricsTests(TestCase):
+    """序列化耗时单独记录（serialize_duration_seconds），流式响应在输出时计入"""
+
+    def setUp(self):
+        from api.metrics import registry
+
+        self.registry = registry
+        self.registry.reset()
+        self.user = User.objects.create_user('buyer')
+        seller = User.objects.create_user('seller')
+        self.goods = Goods.objects.create(name='书', price=10, description='d', seller=seller)
+        Message.objects.create(goods=self.goods, sender=self.user, receiver=seller, content='在吗')
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Token {Token.objects.create(user=self.user).key}'
+
+    def test_serialization_time_is_recorded(self):
+        response = self.client.get(f'/api/goods/{self.goods.id}/')
+        self.assertIn('serialize;dur=', response['Server-Timing'])
+
+        response = self.client.get('/api/user/messages/')
+        read(response)
+        summary = self.registry.summary('serialize_duration_seconds')
+        self.assertEqual(summary[('good-detail', 'GET')]['count'], 1)
+        self.assertEqual(summary[('user-messages', 'GET')]['count'], 1)
+
+
+@override_settings(QUERY_INSPECTION={'ENABLED': False})  # 模拟并发写入的额外查询不计入预算
+class GoodsConditionalUpdateTests(TestCase):
+    """商品更新的乐观并发控制：If-Match / version 与当前版本不一致时不覆盖"""
+
+    def setUp(self):
+        self.seller = User.objects.create_user('seller')
+        self.goods = Goods.objects.create(name='书', price=10, description='d', seller=self.seller)
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Token {Token.objects.create(user=self.seller).key}'
+        self.url = f'/api/goods/{self.goods.id}/'
+
+    def put(self, data, **headers):
+        return self.client.put(self.url, data, content_type='application/json', headers=headers)
+
+    def test_conditional_update_succeeds(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.put({'name': '新书'}, if_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.goods.refresh_from_db()
+        self.assertEqual(self.goods.name, '新书')
+        self.assertEqual(response['ETag'], f'"{self.goods.version}"')
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_stale_if_match_is_rejected(self):
+        etag = self.client.get(self.url)['ETag']
+        self.assertEqual(self.put({'name': '第一次'}, if_match=etag).status_code, 200)
+
+        response = self.put({'name': '第二次'}, if_match=etag)
+        self.assertEqual(response.status_code, 412)
+        self.assertEqual(response.json()['goods']['name'], '第一次')
+        self.goods.refresh_from_db()
+        self.assertEqual(self.goods.name, '第一次')
+
+    def test_concurrent_write_conflict(self):
+        from api.serializers import GoodsSerializer
+
+        is_valid = GoodsSerializer.is_valid
+
+        def write_in_between(serializer, *args, **kwargs):
+            # 校验通过后、写入之前另一个请求修改了商品
+            Goods.objects.get(pk=self.goods.pk).conditional_update(self.goods.version, name='别人改的')
+            return is_valid(serializer, *args, **kwargs)
+
+        with mock.patch.object(GoodsSerializer, 'is_valid', write_in_between):
+            response = self.put({'name': '我改的'})
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['goods']['name'], '别人改的')
+        self.goods.refresh_from_db()
+        self.assertEqual(self.goods.name, '别人改的')
+
+    def test_stale_body_version_is_rejected(self):
+        response = self.put({'name': '我改的', 'version': self.goods.version - 1})
+        self.assertEqual(response.status_code, 409)
+
+
+@override_settings(FAVORITES={'MAX_IDS': 5}, WRITE_BUFFER={'ENABLED': False})
+class FavoritesPagingTests(TestCase):
+    """收藏列表：缓存的 id 超出 MAX_IDS 后按键集查询更早的收藏，总数和翻页都完整"""
+
+    def setUp(self):
+        cache.clear()
+        self.user, seller = User.objects.create_user('buyer'), User.objects.create_user('seller')
+        now = timezone.now()
+        self.goods = []
+        for i in range(12):
+            goods = Goods.objects.create(name=f'书{i}', price=10, description='d', seller=seller)
+            favorite = Favorite.objects.create(goods=goods, user=self.user)
+            # 相邻两条收藏时间相同，翻页依赖 id 区分
+            Favorite.objects.filter(pk=favorite.pk).update(created_at=now - timedelta(minutes=i // 2))
+            self.goods.append(goods)
+        Goods.objects.filter(seller=seller).update(favorites_count=1)
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Token {Token.objects.create(user=self.user).key}'
+
+    def page(self, page, page_size=4):
+        response = self.client.get(f'/api/user/favorites/?page={page}&page_size={page_size}')
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_pages_past_cached_ids(self):
+        expected = [goods.id for goods in sorted(
+            self.goods, key=lambda goods: (Favorite.objects.get(goods=goods).created_at, goods.id), reverse=True
+        )]
+        seen = []
+        for number in (1, 2, 3):
+            data = self.page(number)
+            self.assertEqual(data['count'], 12)
+            self.assertEqual(data['has_more'], number < 3)
+            seen += [item['id'] for item in data['favorites']]
+        self.assertEqual(seen, expected)
+        self.assertEqual(self.page(4)['favorites'], [])
+
+    def test_unfavorite_invalidates_cache(self):
+        self.page(1)
+        response = self.client.delete(f'/api/goods/{self.goods[0].id}/favorite/')
+        self.assertEqual(response.status_code, 200)
+        data = self.page(1, page_size=20)
+        self.assertEqual(data['count'], 11)
+        self.assertNotIn(self.goods[0].id, [item['id'] for item in data['favorites']])
+
+
+class InboxTests(TestCase):
+    """收件箱游标分页（热表 + 归档表）和未读数计数器"""
+
+    def setUp(self):
+        self.seller, self.buyer = User.objects.create_user('seller'), User.objects.create_user('buyer')
+        self.goods = Goods.objects.create(name='书', price=10, description='d', seller=self.seller)
+        self.tokens = {user: Token.objects.create(user=user).key for user in (self.seller, self.buyer)}
+
+    def login(self, user):
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Token {self.tokens[user]}'
+
+    def unread(self):
+        return self.client.get('/api/user/messages/unread-count/').json()['unread_count']
+
+    def test_unread_counter_follows_send_and_mark_read(self):
+        self.login(self.buyer)
+        for content in ('在吗', '还卖吗'):
+            response = self.client.post(f'/api/goods/{self.goods.id}/messages/', {'content': content})
+            self.assertEqual(response.status_code, 201)
+
+        self.login(self.seller)
+        self.assertEqual(self.unread(), 2)
+        message = Message.objects.filter(receiver=self.seller).first()
+        for _ in range(2):  # 重复标记不会重复减少
+            self.assertEqual(self.client.post(f'/api/messages/{message.id}/read/').status_code, 200)
+        self.assertEqual(self.unread(), 1)
+
+        self.login(self.buyer)  # 只有接收者可以标记
+        self.assertEqual(self.client.post(f'/api/messages/{message.id}/read/').status_code, 404)
+
+    def test_received_box_pages_across_archive(self):
+        now = timezone.now()
+        messages = Message.objects.bulk_create([
+            Message(goods=self.goods, sender=self.buyer, receiver=self.seller, content=str(i),
+                    created_at=now - timedelta(days=i // 2))  # 相邻两条时间相同，游标依赖 id 区分
+            for i in range(7)
+        ])
+        archive_messages_batch([message.id for message in messages[-2:]])
+        expected = [message.id for message in sorted(messages, key=lambda m: (m.created_at, m.id), reverse=True)]
+
+        self.login(self.seller)
+        seen, url = [], '/api/user/messages/received/?page_size=3'
+        while url:
+            data = self.client.get(url).json()
+            seen += [message['id'] for message in data['messages']]
+            url = data['next']
+        self.assertEqual(seen, expected)
+
+        unread = self.client.get('/api/user/messages/unread/?page_size=100').json()
+        self.assertEqual(len(unread['messages']), 5)  # 归档的留言不算未读
+        self.assertIsNone(unread['next'])
+
+
+THROTTLE_SETTINGS = {
+    'ENABLED': True,
+    'RATES': {'comment': {'rate': '1/m', 'burst': 2}},
+    'MAX_CONCURRENT_WRITES': None,
+}
+
+
+@override_settings(API_THROTTLE=THROTTLE_SETTINGS)
+class TokenBucketThrottleTests(TestCase):
+
+    def setUp(self):
+        patcher = mock.patch('api.throttling._backend', LocalMemoryBucketBackend())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.buyer, seller = User.objects.create_user('buyer'), User.objects.create_user('seller')
+        self.goods = Goods.objects.create(name='书', price=10, description='d', seller=seller)
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Token {Token.objects.create(user=self.buyer).key}'
+
+    def test_burst_then_429(self):
+        url = f'/api/goods/{self.goods.id}/comments/'
+        for rating in (5, 4):
+            self.assertEqual(self.client.post(url, {'content': '好', 'rating': rating}).status_code, 201)
+        response = self.client.post(url, {'content': '好', 'rating': 3})
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response['Retry-After']), 0)
+        self.assertEqual(self.client.get(url).status_code, 200)  # 读请求不限流
+
+    def test_bucket_refills(self):
+        backend = LocalMemoryBucketBackend()
+        self.assertEqual([backend.consume('k', 1.0, 2, now=0)[0] for _ in range(3)], [True, True, False])
+        allowed, wait = backend.consume('k', 1.0, 2, now=0.5)
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(wait, 0.5)
+        self.assertTrue(backend.consume('k', 1.0, 2, now=1.0)[0])
+
+
+class ConcurrencyLimitTests(TestCase):
+
+    @override_settings(API_THROTTLE={'MAX_CONCURRENT_WRITES': 1, 'QUEUE_TIMEOUT': 0.05})
+    def test_writes_over_limit_get_503(self):
+        entered, release = threading.Event(), threading.Event()
+
+        def view(request):
+            if request.path == '/slow/':
+                entered.set()
+                release.wait(5)
+            return HttpResponse('ok')
+
+        middleware = ConcurrencyLimitMiddleware(view)
+        factory = RequestFactory()
+        first = threading.Thread(target=middleware, args=(factory.post('/slow/'),))
+        first.start()
+        entered.wait(5)
+        try:
+            response = middleware(factory.post('/api/goods/'))
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(response['Retry-After'], '1')
+            self.assertEqual(middleware(factory.get('/api/goods/')).status_code, 200)  # 读请求不占名额
+        finally:
+            release.set()
+            first.join()
+        self.assertEqual(middleware(factory.post('/api/goods/')).status_code, 200)
+
+    def test_503_carries_cors_headers(self):
+        with mock.patch('api.middleware.threading.BoundedSemaphore') as semaphore:
+            semaphore.return_value.acquire.return_value = False
+            response = self.client.post('/api/goods/', HTTP_ORIGIN='http://localhost:3000')
+        self.assertEqual(response.status_code, 503)
+        self.assertIn('Access-Control-Allow-Origin', response)
+
+
+class NearSearchTests(TestCase):
+    """附近搜索按球面距离精确过滤，sort=distance 按距离排序，分面统计与列表一致"""
+    CENTER = (39.9042, 116.4074)  # 北京
+
+    def setUp(self):
+        cache.clear()
+        seller = User.objects.create_user('seller')
+        latitude, longitude = self.CENTER
+        # 纬度每 0.009° 约 1 km
+        self.goods = {
+            name: Goods.objects.create(name=name, price=10, description='d', seller=seller,
+                                       location='北京', latitude=latitude + offset, longitude=longitude)
+            for name, offset in (('1km', 0.009), ('5km', 0.045), ('20km', 0.18))
+        }
+        Goods.objects.create(name='上海', price=10, description='d', seller=seller, location='上海')
+
+    def near(self, path, radius):
+        latitude, longitude = self.CENTER
+        response = self.client.get(f'{path}?lat={latitude}&lng={longitude}&radius={radius}&sort=distance')
+        self.assertEqual(response.status_code, 200)
+        return json.loads(read(response))
+
+    def test_radius_and_distance_sort(self):
+        data = self.near('/api/goods/', 10)
+        self.assertEqual([item['name'] for item in data['goods']], ['1km', '5km'])
+        self.assertEqual([round(item['distance_km']) for item in data['goods']], [1, 5])
+
+        data = self.near('/api/goods/', 30)
+        self.assertEqual([item['name'] for item in data['goods']], ['1km', '5km', '20km'])
+
+    def test_facets_apply_exact_radius(self):
+        # 半径不同的请求不能共用缓存
+        self.assertEqual(self.near('/api/goods/facets/', 10)['facets']['total'], 2)
+        self.assertEqual(self.near('/api/goods/facets/', 30)['facets']['total'], 3)
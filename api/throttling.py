@@ -0,0 +1,165 @@
+# api/throttling.py
+"""
+令牌桶限流
+
+- 每个 scope（点赞、收藏、评论、留言、登录……）单独配置速率和突发容量，
+  按用户（未登录按 IP）和按 IP 各算一个桶，任一桶耗尽即返回 429
+- 后端可替换：默认进程内存（LocalMemoryBucketBackend），多进程/多机部署时
+  换成基于 Django cache 的 CacheBucketBackend（配合 Redis/Memcached 共享）
+
+配置见 settings.API_THROTTLE，视图中使用：
+
+    @throttle_classes(token_bucket('like'))
+"""
+import abc
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.throttling import BaseThrottle
+
+DEFAULTS = {
+    'ENABLED': True,
+    'BACKEND': 'api.throttling.LocalMemoryBucketBackend',
+    'CACHE_ALIAS': 'default',
+    'RATES': {},
+    'MAX_CONCURRENT_WRITES': None,
+    'QUEUE_TIMEOUT': 0.5,
+}
+
+_PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def get_throttle_setting(key):
+    return getattr(settings, 'API_THROTTLE', {}).get(key, DEFAULTS[key])
+
+
+def parse_rate(rate):
+    """'10/s'、'30/m' -> 每秒补充的令牌数"""
+    count, period = rate.split('/')
+    return int(count) / _PERIODS[period[0]]
+
+
+class LocalMemoryBucketBackend:
+    """进程内令牌桶，超过 max_keys 时淘汰最久未使用的桶"""
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()  # key -> (tokens, updated_at)
+        self._lock = threading.Lock()
+
+    def consume(self, key, refill_rate, capacity, now=None):
+        """消耗一个令牌，返回 (是否允许, 需要等待的秒数)"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * refill_rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, 0 if allowed else (1 - tokens) / refill_rate
+
+
+class CacheBucketBackend:
+    """
+    基于 Django cache 的令牌桶，多个进程共享同一个桶
+    读-改-写不是原子操作，高并发下个别请求可能多放行，对限流场景可以接受
+    """
+
+    def __init__(self):
+        self.cache = caches[get_throttle_setting('CACHE_ALIAS')]
+
+    def consume(self, key, refill_rate, capacity, now=None):
+        now = time.time() if now is None else now
+        cache_key = f'throttle:{key}'
+        tokens, updated_at = self.cache.get(cache_key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated_at) * refill_rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        # 桶填满所需时间之后记录就没有意义了
+        self.cache.set(cache_key, (tokens, now), timeout=int(capacity / refill_rate) + 1)
+        return allowed, 0 if allowed else (1 - tokens) / refill_rate
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = import_string(get_throttle_setting('BACKEND'))()
+    return _backend
+
+
+class TokenBucketThrottle(BaseThrottle, metaclass=abc.ABCMeta):
+    """令牌桶限流基类，子类指定 scope；默认只限制写请求"""
+    scope = None
+    writes_only = True
+
+    def __init__(self):
+        config = get_throttle_setting('RATES').get(self.scope)
+        self.refill_rate = parse_rate(config['rate']) if config else None
+        self.capacity = config.get('burst', 1) if config else None
+        self.retry_after = None
+
+    @abc.abstractmethod
+    def get_key(self, request):
+        """返回限流桶的标识（用户或 IP）"""
+
+    def allow_request(self, request, view):
+        if not get_throttle_setting('ENABLED') or self.refill_rate is None:
+            return True
+        if self.writes_only and request.method in SAFE_METHODS:
+            return True
+        allowed, self.retry_after = get_backend().consume(
+            f'{self.scope}:{self.get_key(request)}', self.refill_rate, self.capacity
+        )
+        return allowed
+
+    def wait(self):
+        return self.retry_after
+
+
+class UserTokenBucketThrottle(TokenBucketThrottle):
+    """按用户限流，未登录时按 IP"""
+
+    def get_key(self, request):
+        if request.user and request.user.is_authenticated:
+            return f'user:{request.user.pk}'
+        return f'ip:{self.get_ident(request)}'
+
+
+class IPTokenBucketThrottle(TokenBucketThrottle):
+    """按 IP 限流（同一 IP 下的多个账号共用一个桶）"""
+
+    def get_key(self, request):
+        return f'ip:{self.get_ident(request)}'
+
+
+_throttle_classes = {}
+
+
+def token_bucket(scope, per_user=True, per_ip=True):
+    """生成某个 scope 的限流类列表，供 @throttle_classes 使用"""
+    cache_key = (scope, per_user, per_ip)
+    if cache_key not in _throttle_classes:
+        classes = []
+        if per_user:
+            classes.append(type(f'{scope.title()}UserThrottle', (UserTokenBucketThrottle,), {'scope': scope}))
+        if per_ip:
+            classes.append(type(f'{scope.title()}IPThrottle', (IPTokenBucketThrottle,), {
+                'scope': f'{scope}_ip' if per_user else scope,
+            }))
+        _throttle_classes[cache_key] = classes
+    return _throttle_classes[cache_key]
@@ -1,36 +1,51 @@
 # api/urls.py
 from django.urls import path
-from . import views
+from .views import lazy  # 🔥 视图按模块懒加载，见 api/views/__init__.py
 
 urlpatterns = [
-    path('', views.api_root, name='api-root'),
-    path('goods/', views.goods_list, name='goods-list'),
-    path('goods/<int:id>/', views.good_detail, name='good-detail'),
-    path('auth/register/', views.user_register, name='user_register'),
-    path('test/', views.test_view, name='test-api'),
-    path('auth/login/', views.user_login, name='user_login'),
-    path('auth/csrf-token/', views.get_csrf_token, name='get_csrf_token'),
-    path('auth/logout/', views.user_logout, name='user_logout'),
-    path('auth/status/', views.check_auth_status, name='check_auth_status'),
+    path('', lazy('auth.api_root'), name='api-root'),
+    path('goods/', lazy('goods.goods_list'), name='goods-list'),
+    path('goods/<int:id>/', lazy('goods.good_detail'), name='good-detail'),
+    path('goods/facets/', lazy('goods.goods_facets'), name='goods-facets'),  # 🔥 新增：分面统计
+    path('goods/trending/', lazy('goods.goods_ranking'), name='goods-ranking'),  # 🔥 新增：热门/趋势商品
+    path('goods/<int:goods_id>/similar/', lazy('goods.goods_similar'), name='goods-similar'),  # 🔥 新增：相似商品
+    path('feed/', lazy('feed.goods_feed'), name='goods-feed'),  # 🔥 新增：个性化推荐
+    path('auth/register/', lazy('auth.user_register'), name='user_register'),
+    path('test/', lazy('auth.test_view'), name='test-api'),
+    path('auth/login/', lazy('auth.user_login'), name='user_login'),
+    path('auth/csrf-token/', lazy('auth.get_csrf_token'), name='get_csrf_token'),
+    path('auth/logout/', lazy('auth.user_logout'), name='user_logout'),
+    path('auth/status/', lazy('auth.check_auth_status'), name='check_auth_status'),
 
     # 用户商品相关路由
-    path('user-goods/<str:action>/', views.user_goods_list, name='user-goods'),
+    path('user-goods/<str:action>/', lazy('user.user_goods_list'), name='user-goods'),
+    path('user/stats/', lazy('user.seller_dashboard'), name='seller-stats'),  # 🔥 新增：卖家统计
     # 购买商品路由
-    path('goods/<int:id>/purchase/', views.purchase_good, name='purchase-good'),
+    path('goods/<int:id>/purchase/', lazy('goods.purchase_good'), name='purchase-good'),
 
     # 🔥 新增：评论相关路由
-    path('goods/<int:goods_id>/comments/', views.goods_comments, name='goods-comments'),
-    path('comments/<int:comment_id>/', views.delete_comment, name='delete-comment'),
+    path('goods/<int:goods_id>/comments/', lazy('comments.goods_comments'), name='goods-comments'),
+    path('comments/<int:comment_id>/', lazy('comments.delete_comment'), name='delete-comment'),
 
     # 🔥 新增：点赞相关路由
-    path('goods/<int:goods_id>/like/', views.goods_like, name='goods-like'),
+    path('goods/<int:goods_id>/like/', lazy('interactions.goods_like'), name='goods-like'),
 
     # 🔥 新增：收藏相关路由
-    path('goods/<int:goods_id>/favorite/', views.goods_favorite, name='goods-favorite'),
-    path('user/favorites/', views.user_favorites, name='user-favorites'),
+    path('goods/<int:goods_id>/favorite/', lazy('interactions.goods_favorite'), name='goods-favorite'),
+    path('user/favorites/', lazy('user.user_favorites'), name='user-favorites'),
 
     # 🔥 新增：留言相关路由
-    path('goods/<int:goods_id>/messages/', views.goods_messages, name='goods-messages'),
-    path('user/messages/', views.user_messages, name='user-messages'),
-    path('messages/<int:message_id>/read/', views.mark_message_read, name='mark-message-read'),
-]
\ No newline at end of file
+    path('goods/<int:goods_id>/messages/', lazy('messages.goods_messages'), name='goods-messages'),
+    path('user/messages/', lazy('messages.user_messages'), name='user-messages'),
+    # 🔥 新增：未读数，发件箱/收件箱/未读留言（sent/received/unread）
+    path('user/messages/unread-count/', lazy('messages.unread_message_count'), name='unread-message-count'),
+    path('user/messages/<str:box>/', lazy('messages.user_message_box'), name='user-message-box'),
+    path('messages/<int:message_id>/read/', lazy('messages.mark_message_read'), name='mark-message-read'),
+
+    # 🔥 新增：性能指标（Prometheus 文本格式）
+    path('metrics/', lazy('metrics.metrics'), name='metrics'),
+    path('debug/memory/', lazy('metrics.memory_stats'), name='memory-stats'),  # 🔥 新增：内存监控
+
+    # 🔥 新增：流式导出（管理员）
+    path('export/<str:name>/', lazy('exports.export_data'), name='export-data'),
+]
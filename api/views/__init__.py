@@ -0,0 +1,47 @@
+# api/views/__init__.py
+"""
+API 视图，按功能拆分为子模块（goods、auth、user、comments、interactions、messages、metrics、exports、feed）
+
+api/urls.py 通过 LazyView 引用视图：URL 配置加载时不导入视图模块，第一次请求对应接口时才导入，
+进程启动（以及管理命令、任务 worker 加载 URL 配置）时不再导入全部视图和 DRF。
+预加载的生产服务器在预热阶段统一导入（见 goods/management/commands/serve.py）。
+
+这里不要导入子模块，否则懒加载失效。
+"""
+from importlib import import_module
+
+
+class LazyView:
+    """URL 配置中的视图引用，调用（或读取视图函数的属性）时才导入所在模块"""
+
+    def __init__(self, module, name):
+        self.module_path = f'{__name__}.{module}'
+        self.name = name
+        self._view = None
+        # URLPattern.lookup_str、ResolverMatch 用到，直接给出，不触发导入
+        self.__module__ = self.module_path
+        self.__name__ = self.__qualname__ = name
+
+    def resolve(self):
+        if self._view is None:
+            self._view = getattr(import_module(self.module_path), self.name)
+        return self._view
+
+    def __call__(self, request, *args, **kwargs):
+        return self.resolve()(request, *args, **kwargs)
+
+    def __getattr__(self, attr):
+        # reverse() 填充解析器时会读取每个视图的 view_class（lookup_str），不为它导入模块
+        if attr == 'view_class' or attr.startswith('_view'):
+            raise AttributeError(attr)
+        # csrf_exempt 等属性由中间件在请求时读取，此时导入真正的视图
+        return getattr(self.resolve(), attr)
+
+    def __repr__(self):
+        return f'<LazyView {self.module_path}.{self.name}>'
+
+
+def lazy(path):
+    """lazy('goods.goods_list') -> api.views.goods 模块中的 goods_list"""
+    module, _, name = path.rpartition('.')
+    return LazyView(module, name)
@@ -0,0 +1,175 @@
+# api/views/auth.py
+"""登录、注册、登出、认证状态和辅助接口"""
+from rest_framework import status, permissions
+from rest_framework.response import Response
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
+from rest_framework.authtoken.models import Token
+from django.contrib.auth.models import User
+from django.db import IntegrityError
+from django.contrib.auth import authenticate
+from django.middleware.csrf import get_token
+from api.throttling import token_bucket
+
+
+# -------------------------- 2. 认证相关视图 --------------------------
+@api_view(['POST'])
+@permission_classes([permissions.AllowAny])
+@throttle_classes(token_bucket('login', per_user=False))
+def user_login(request):
+    """用户登录（返回Token）"""
+    try:
+        username = request.data.get('username')
+        password = request.data.get('password')
+        user = authenticate(username=username, password=password)
+
+        if user is not None:
+            token, created = Token.objects.get_or_create(user=user)
+            return Response({
+                'success': True,
+                'user': {
+                    'id': user.id,
+                    'username': user.username,
+                    'email': user.email if user.email else '',
+                    'is_staff': user.is_staff
+                },
+                'token': token.key,
+                'message': '登录成功'
+            })
+        else:
+            return Response({
+                'success': False,
+                'message': '用户名或密码错误'
+            }, status=status.HTTP_401_UNAUTHORIZED)
+
+    except Exception as e:
+        return Response({
+            'success': False,
+            'message': f'登录过程中发生错误: {str(e)}'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['POST'])
+@permission_classes([permissions.AllowAny])
+def user_register(request):
+    """用户注册（自动创建Token）"""
+    try:
+        username = request.data.get('username')
+        password = request.data.get('password')
+        email = request.data.get('email', '')
+        first_name = request.data.get('first_name', '')
+        last_name = request.data.get('last_name', '')
+
+        if not username or not password:
+            return Response({
+                'success': False,
+                'message': '用户名和密码是必填项'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        if len(username) < 3:
+            return Response({
+                'success': False,
+                'message': '用户名至少需要3个字符'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        if len(password) < 6:
+            return Response({
+                'success': False,
+                'message': '密码至少需要6个字符'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        user = User.objects.create_user(
+            username=username,
+            password=password,
+            email=email,
+            first_name=first_name,
+            last_name=last_name
+        )
+        token = Token.objects.create(user=user)
+
+        return Response({
+            'success': True,
+            'user': {
+                'id': user.id,
+                'username': user.username,
+                'email': user.email,
+                'first_name': user.first_name,
+                'last_name': user.last_name,
+                'is_staff': user.is_staff
+            },
+            'token': token.key,
+            'message': '注册成功'
+        }, status=status.HTTP_201_CREATED)
+
+    except IntegrityError:
+        return Response({
+            'success': False,
+            'message': '用户名已存在'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    except Exception as e:
+        return Response({
+            'success': False,
+            'message': f'注册过程中发生错误: {str(e)}'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def user_logout(request):
+    """用户登出（删除Token）"""
+    try:
+        request.user.auth_token.delete()
+        return Response({
+            'success': True,
+            'message': '登出成功'
+        })
+    except:
+        return Response({
+            'success': True,
+            'message': '登出成功（无有效Token）'
+        })
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def check_auth_status(request):
+    """检查用户认证状态"""
+    return Response({
+        'authenticated': True,
+        'user': {
+            'id': request.user.id,
+            'username': request.user.username,
+            'email': request.user.email if request.user.email else '',
+            'is_staff': request.user.is_staff
+        }
+    })
+
+
+# -------------------------- 3. 辅助视图 --------------------------
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def test_view(request):
+    """API测试接口"""
+    return Response({"message": "API is working!"})
+
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def get_csrf_token(request):
+    """获取CSRF Token"""
+    return Response({'csrfToken': get_token(request)})
+
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def api_root(request):
+    """API根目录"""
+    base_url = request.build_absolute_uri('/')[:-1]
+    return Response({
+        "message": "🛒 商品市场API服务",
+        "version": "1.0.0",
+        "endpoints": {
+            "商品列表": f"{base_url}/api/goods/",
+            "商品详情": f"{base_url}/api/goods/{{id}}/",
+            "用户登录": f"{base_url}/api/auth/login/",
+            "用户注册": f"{base_url}/api/auth/register/",
+        }
+    })
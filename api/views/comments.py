@@ -0,0 +1,93 @@
+# api/views/comments.py
+"""商品评论"""
+from rest_framework import status, permissions
+from rest_framework.response import Response
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
+from django.db import transaction
+from goods.models import Goods, Comment
+from goods.counters import adjust_rating, rating_summary
+from api.serializers import CommentSerializer
+from api.throttling import token_bucket
+from api.pagination import CommentCursorPagination
+from api.querylog import query_budget
+
+
+# -------------------------- 6. 评论相关接口 --------------------------
+@query_budget(10)
+@api_view(['GET', 'POST'])
+@permission_classes([permissions.IsAuthenticatedOrReadOnly])
+@throttle_classes(token_bucket('comment'))
+def goods_comments(request, goods_id):
+    """获取商品评论列表和发布评论"""
+    try:
+        goods = Goods.objects.get(id=goods_id)
+    except Goods.DoesNotExist:
+        return Response({
+            'success': False,
+            'message': '商品不存在'
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    if request.method == 'GET':
+        # 🔥 修改：游标分页 + select_related('user')；评分摘要读取 GoodsRating，不扫描评论表
+        paginator = CommentCursorPagination()
+        comments = paginator.paginate_queryset(goods.comments.select_related('user'), request)
+        serializer = CommentSerializer(comments, many=True)
+        summary = rating_summary(goods.id)
+        return Response({
+            'success': True,
+            'comments': serializer.data,
+            'count': summary['count'],
+            'summary': summary,
+            **paginator.page_links()
+        })
+
+    elif request.method == 'POST':
+        if not request.user.is_authenticated:
+            return Response({
+                'success': False,
+                'message': '请先登录'
+            }, status=status.HTTP_401_UNAUTHORIZED)
+
+        serializer = CommentSerializer(data=request.data)
+        if serializer.is_valid():
+            with transaction.atomic():
+                comment = serializer.save(goods=goods, user=request.user)
+                adjust_rating(goods.id, comment.rating, 1)
+            return Response({
+                'success': True,
+                'message': '评论发布成功',
+                'comment': serializer.data
+            }, status=status.HTTP_201_CREATED)
+
+        return Response({
+            'success': False,
+            'message': '数据验证失败',
+            'errors': serializer.errors
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(['DELETE'])
+@permission_classes([permissions.IsAuthenticated])
+def delete_comment(request, comment_id):
+    """删除评论（只能删除自己的评论）"""
+    try:
+        comment = Comment.objects.get(id=comment_id)
+    except Comment.DoesNotExist:
+        return Response({
+            'success': False,
+            'message': '评论不存在'
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    if comment.user != request.user:
+        return Response({
+            'success': False,
+            'message': '无权删除此评论'
+        }, status=status.HTTP_403_FORBIDDEN)
+
+    with transaction.atomic():
+        comment.delete()
+        adjust_rating(comment.goods_id, comment.rating, -1)
+    return Response({
+        'success': True,
+        'message': '评论删除成功'
+    })
@@ -0,0 +1,45 @@
+# api/views/exports.py
+"""流式数据导出"""
+from rest_framework import status, permissions
+from rest_framework.response import Response
+from rest_framework.decorators import api_view, permission_classes
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from api.exports import EXPORTS, FORMATS, clean_params, stream_export
+
+
+# -------------------------- 12. 数据导出接口 --------------------------
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def export_data(request, name):
+    """
+    流式导出（仅管理员）
+    name: goods - 商品, purchases - 已完成订单, messages - 留言记录
+    参数: fmt=csv|jsonl，以及各导出支持的过滤条件（seller/buyer/user/goods/category）
+    """
+    if name not in EXPORTS:
+        return Response({
+            'success': False,
+            'message': '无效的导出类型'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    fmt = request.query_params.get('fmt', 'csv')
+    if fmt not in FORMATS:
+        return Response({
+            'success': False,
+            'message': '导出格式只支持 csv 或 jsonl'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        params = clean_params(request.query_params)
+    except ValueError as e:
+        return Response({
+            'success': False,
+            'message': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    content_type = 'text/csv; charset=utf-8' if fmt == 'csv' else 'application/x-ndjson; charset=utf-8'
+    response = StreamingHttpResponse(stream_export(name, fmt, params), content_type=content_type)
+    filename = f'{name}-{timezone.now():%Y%m%d%H%M%S}.{fmt}'
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,46 @@
+# api/views/feed.py
+"""个性化推荐流"""
+from rest_framework import status, permissions
+from rest_framework.response import Response
+from rest_framework.decorators import api_view, permission_classes
+from goods.models import Goods
+from goods import feed
+from api.serializers import GoodsSerializer, with_list_annotations
+from api.querylog import query_budget
+
+
+# -------------------------- 13. 个性化推荐 --------------------------
+@query_budget(15)
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def goods_feed(request):
+    """
+    个性化推荐流（按用户分类偏好 + 发布时间排序，未登录时按发布时间）
+    参数: page=页码（从1开始）, page_size=每页数量（最多50）
+    候选列表按用户分群预先计算并缓存，见 goods/feed.py
+    """
+    try:
+        page = max(int(request.query_params.get('page', 1)), 1)
+        page_size = min(max(int(request.query_params.get('page_size', 20)), 1), 50)
+    except ValueError:
+        return Response({
+            'success': False,
+            'message': '分页参数必须是整数'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    segment = feed.user_segment(request.user)
+    candidates = feed.segment_candidates(segment)
+    page_ids = candidates[(page - 1) * page_size:page * page_size]
+
+    # 候选列表可能稍有过期，已售出的商品在这里过滤掉
+    goods_by_id = with_list_annotations(Goods.objects.filter(id__in=page_ids, is_sold=False), request).in_bulk()
+    goods = [goods_by_id[goods_id] for goods_id in page_ids if goods_id in goods_by_id]
+    serializer = GoodsSerializer(goods, many=True, context={'request': request})
+    return Response({
+        'success': True,
+        'segment': list(segment),
+        'goods': serializer.data,
+        'count': len(serializer.data),
+        'page': page,
+        'has_more': page * page_size < len(candidates)
+    })
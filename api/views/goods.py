@@ -0,0 +1,380 @@
+# api/views/goods.py
+"""商品列表/详情/分面/热门/相似商品、购买"""
+from rest_framework import status, permissions
+from rest_framework.response import Response
+from rest_framework.decorators import api_view, permission_classes
+from django.db import models
+from django.utils import timezone
+from goods.models import Goods, GoodsScore, SimilarGoods
+from goods.tasks import schedule_purge
+from goods import feed, geo
+from goods.facets import combine_filters, get_facets, invalidate_facets
+from goods.stats import invalidate_seller_stats
+from api.serializers import GoodsSerializer, VersionConflict, with_list_annotations
+from api.filters import FilterError, facet_params, parse_goods_filters, parse_near
+from api.streaming import StreamedList, iter_queryset, streaming_json_response
+from api.querylog import query_budget
+
+
+# -------------------------- 1. 商品相关视图 --------------------------
+GOODS_ORDERINGS = {
+    'newest': '-created_at',
+    'price': 'price_cents',  # 🔥 整数列 + goods_price_idx 索引
+    '-price': '-price_cents',
+}
+
+
+@query_budget(8)
+@api_view(['GET', 'POST'])
+@permission_classes([permissions.IsAuthenticatedOrReadOnly])
+def goods_list(request):
+    """商品列表（GET）+ 创建商品（POST）"""
+    if request.method == 'GET':
+        # 🔥 新增：category/condition/min_price/max_price/q/region/附近 过滤，facets=1 时附带分面统计
+        # sort=price|-price 按价格排序，sort=distance 时附近搜索结果按距离排序
+        try:
+            filters = parse_goods_filters(request.query_params)
+        except FilterError as e:
+            return Response({
+                'success': False,
+                'message': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            ordering = GOODS_ORDERINGS.get(request.query_params.get('sort'), '-created_at')
+            goods = with_list_annotations(
+                Goods.objects.filter(combine_filters(filters), is_sold=False), request
+            ).order_by(ordering)
+            near = parse_near(request.query_params)
+            # 🔥 修改：流式输出（分块读取、逐行序列化），大列表不再整体驻留内存，见 api/streaming.py
+            serializer = GoodsSerializer(context={'request': request})
+            if near is not None:
+                # 🔥 附近搜索：索引区间扫描得到候选，再按球面距离精确过滤
+                matched = geo.within_radius(goods, *near)
+                if request.query_params.get('sort') == 'distance':
+                    matched.sort(key=lambda item: item[1])
+                rows = StreamedList(matched, lambda item: {
+                    **serializer.to_representation(item[0]), 'distance_km': round(item[1], 2)
+                })
+            else:
+                rows = StreamedList(iter_queryset(goods), serializer.to_representation)
+            fields = [('success', True)]
+            if request.query_params.get('facets') in ('1', 'true'):
+                fields.append(('facets', get_facets(facet_params(request.query_params), filters)))
+            fields += [('goods', rows), ('count', lambda: rows.count)]
+            return streaming_json_response(fields)
+        except Exception as e:
+            return Response({
+                'success': False,
+                'message': '获取商品列表失败',
+                'error': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    elif request.method == 'POST':
+        try:
+            if not request.user.is_authenticated:
+                return Response({
+                    'success': False,
+                    'message': '请先登录'
+                }, status=status.HTTP_401_UNAUTHORIZED)
+
+            serializer = GoodsSerializer(data=request.data, context={'request': request})
+            if serializer.is_valid():
+                serializer.save()
+                return Response({
+                    'success': True,
+                    'message': '商品发布成功',
+                    'goods': serializer.data
+                }, status=status.HTTP_201_CREATED)
+            return Response({
+                'success': False,
+                'message': '数据验证失败',
+                'errors': serializer.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        except Exception as e:
+            return Response({
+                'success': False,
+                'message': '创建商品失败',
+                'error': str(e)
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+# 🔥 新增：分面统计（筛选侧边栏的分类/成色/价格区间数量）
+@query_budget(6)
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def goods_facets(request):
+    """
+    在售商品的分面统计，参数与商品列表的过滤参数相同
+    每个维度的数量不受该维度自身的过滤条件影响；无过滤条件时直接读缓存
+    """
+    try:
+        filters = parse_goods_filters(request.query_params)
+    except FilterError as e:
+        return Response({
+            'success': False,
+            'message': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response({
+        'success': True,
+        'facets': get_facets(facet_params(request.query_params), filters)
+    })
+
+
+@query_budget(10)
+@api_view(['GET', 'PUT', 'DELETE'])
+@permission_classes([permissions.IsAuthenticated])
+def good_detail(request, id):
+    """商品详情（GET）+ 更新商品（PUT）+ 删除商品（DELETE）"""
+    try:
+        goods = Goods.objects.get(id=id)
+    except Goods.DoesNotExist:
+        return Response({
+            'success': False,
+            'message': '商品不存在'
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    if request.method == 'GET':
+        serializer = GoodsSerializer(goods, context={'request': request})
+        data = {
+            'success': True,
+            'goods': serializer.data
+        }
+        # 🔥 新增：?include=similar 时附带相似商品
+        if 'similar' in request.query_params.get('include', '').split(','):
+            data['similar'] = _similar_goods_data(request, goods.id, limit=10)
+        return Response(data, headers={'ETag': _goods_etag(goods)})
+
+    elif request.method in ['PUT', 'DELETE']:
+        if goods.seller != request.user:
+            return Response({
+                'success': False,
+                'message': '无权操作此商品'
+            }, status=status.HTTP_403_FORBIDDEN)
+
+        if request.method == 'PUT':
+            # 🔥 新增：乐观并发控制。客户端用 If-Match: "<版本号>"（GET 返回的 ETag）或请求体中的 version
+            # 声明基于哪个版本修改；版本已变化时返回 412/409，不覆盖其他人的修改
+            expected_version = _if_match_version(request)
+            if expected_version is not None and expected_version != goods.version:
+                return _version_conflict_response(request, goods, status.HTTP_412_PRECONDITION_FAILED)
+            if expected_version is None and request.data.get('version') not in (None, ''):
+                try:
+                    expected_version = int(request.data['version'])
+                except (TypeError, ValueError):
+                    return Response({
+                        'success': False,
+                        'message': 'version 必须是整数'
+                    }, status=status.HTTP_400_BAD_REQUEST)
+                if expected_version != goods.version:
+                    return _version_conflict_response(request, goods, status.HTTP_409_CONFLICT)
+
+            serializer = GoodsSerializer(
+                goods,
+                data=request.data,
+                partial=True,
+                context={'request': request}
+            )
+            if serializer.is_valid():
+                try:
+                    serializer.save(expected_version=goods.version)
+                except VersionConflict:
+                    # 校验之后、写入之前有其他写入（例如商品刚被购买）
+                    goods = Goods.objects.filter(id=id).first()
+                    if goods is None:
+                        return Response({
+                            'success': False,
+                            'message': '商品不存在'
+                        }, status=status.HTTP_404_NOT_FOUND)
+                    return _version_conflict_response(request, goods, status.HTTP_409_CONFLICT)
+                return Response({
+                    'success': True,
+                    'message': '商品更新成功',
+                    'goods': serializer.data
+                }, headers={'ETag': _goods_etag(goods)})
+            return Response({
+                'success': False,
+                'message': '数据验证失败',
+                'errors': serializer.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        elif request.method == 'DELETE':
+            if not goods.is_sold:
+                return Response({
+                    'success': False,
+                    'message': '请先下架商品再删除'
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            # 🔥 修改：软删除只更新 deleted_at 一列，评论/点赞/收藏/留言和图片由后台任务分批清理
+            goods.soft_delete()
+            schedule_purge()
+            invalidate_seller_stats(goods.seller_id)
+            return Response({
+                'success': True,
+                'message': '商品删除成功'
+            }, status=status.HTTP_200_OK)
+
+
+def _goods_etag(goods):
+    return f'"{goods.version}"'
+
+
+def _if_match_version(request):
+    """If-Match 请求头中的版本号；没有该请求头或为 * 时返回 None，无法解析时返回 -1（不会匹配任何版本）"""
+    header = request.headers.get('If-Match', '').strip()
+    if not header or header == '*':
+        return None
+    value = header.split(',')[0].strip()
+    if value.startswith('W/'):
+        value = value[2:]
+    try:
+        return int(value.strip('"'))
+    except ValueError:
+        return -1
+
+
+def _version_conflict_response(request, goods, status_code):
+    """返回当前数据和版本号，客户端据此合并后重试"""
+    return Response({
+        'success': False,
+        'message': '商品已被修改，请刷新后重试',
+        'version': goods.version,
+        'goods': GoodsSerializer(goods, context={'request': request}).data
+    }, status=status_code, headers={'ETag': _goods_etag(goods)})
+
+
+@query_budget(4)
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def goods_ranking(request):
+    """
+    热门/趋势商品列表（读取预计算的 GoodsScore，不在请求中聚合）
+    参数: kind=trending|popular, category=分类, limit=数量（最多100）
+    """
+    kind = request.query_params.get('kind', 'trending')
+    if kind not in ('trending', 'popular'):
+        return Response({
+            'success': False,
+            'message': 'kind 只支持 trending 或 popular'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        limit = min(max(int(request.query_params.get('limit', 20)), 1), 100)
+    except ValueError:
+        limit = 20
+
+    scores = GoodsScore.objects.filter(
+        goods__is_sold=False, goods__deleted_at__isnull=True, **{f'{kind}_score__gt': 0}
+    ).order_by(f'-{kind}_score')
+    category = request.query_params.get('category')
+    if category:
+        scores = scores.filter(goods__category=category)
+
+    goods_ids = list(scores.values_list('goods_id', flat=True)[:limit])
+    goods_by_id = with_list_annotations(Goods.objects.filter(id__in=goods_ids), request).in_bulk()
+    goods = [goods_by_id[goods_id] for goods_id in goods_ids if goods_id in goods_by_id]
+    serializer = GoodsSerializer(goods, many=True, context={'request': request})
+    return Response({
+        'success': True,
+        'kind': kind,
+        'goods': serializer.data,
+        'count': len(serializer.data)
+    })
+
+
+@query_budget(5)
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def goods_similar(request, goods_id):
+    """
+    相似商品（读取预计算的 SimilarGoods，按相似度排序，排除已售出）
+    参数: limit=数量（最多50）
+    """
+    if not Goods.objects.filter(id=goods_id).exists():
+        return Response({
+            'success': False,
+            'message': '商品不存在'
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    try:
+        limit = min(max(int(request.query_params.get('limit', 10)), 1), 50)
+    except ValueError:
+        limit = 10
+
+    data = _similar_goods_data(request, goods_id, limit)
+    return Response({
+        'success': True,
+        'goods': data,
+        'count': len(data)
+    })
+
+
+def _similar_goods_data(request, goods_id, limit):
+    """读取预计算的相似商品并序列化，附带相似度"""
+    rows = list(SimilarGoods.objects.filter(
+        goods_id=goods_id, similar__is_sold=False
+    ).order_by('-score').values_list('similar_id', 'score')[:limit])
+    goods_by_id = with_list_annotations(Goods.objects.filter(id__in=[row[0] for row in rows]), request).in_bulk()
+    rows = [(goods_by_id[similar_id], score) for similar_id, score in rows if similar_id in goods_by_id]
+    data = GoodsSerializer([goods for goods, _ in rows], many=True, context={'request': request}).data
+    for item, (_, score) in zip(data, rows):
+        item['similarity'] = round(score, 4)
+    return data
+
+
+# -------------------------- 5. 购买商品接口 --------------------------
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def purchase_good(request, id):
+    """购买商品接口"""
+    try:
+        goods = Goods.objects.get(id=id)
+    except Goods.DoesNotExist:
+        return Response({
+            'success': False,
+            'message': '商品不存在'
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    try:
+        if goods.is_sold:
+            return Response({
+                'success': False,
+                'message': '该商品已售出'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        if goods.seller == request.user:
+            return Response({
+                'success': False,
+                'message': '不能购买自己的商品'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        # 🔥 修改：条件更新，只有仍未售出时才写入，并发购买只有一个成功
+        sold = Goods.objects.filter(id=goods.id, is_sold=False).update(
+            buyer=request.user, is_sold=True, sold_at=timezone.now(), updated_at=timezone.now(),
+            version=models.F('version') + 1,
+        )
+        if not sold:
+            return Response({
+                'success': False,
+                'message': '该商品已售出'
+            }, status=status.HTTP_409_CONFLICT)
+        goods.refresh_from_db()
+        invalidate_facets()
+        feed.invalidate_affinity(request.user.pk)  # 🔥 购买对推荐权重影响最大，立即生效
+        invalidate_seller_stats(goods.seller_id)  # 🔥 卖家统计缓存失效
+
+        serializer = GoodsSerializer(goods, context={'request': request})
+
+        return Response({
+            'success': True,
+            'message': '购买成功！',
+            'goods': serializer.data
+        })
+
+    except Exception as e:
+        return Response({
+            'success': False,
+            'message': f'购买失败: {str(e)}'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
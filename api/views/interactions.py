@@ -0,0 +1,145 @@
+# api/views/interactions.py
+"""点赞和收藏"""
+from rest_framework import status, permissions
+from rest_framework.response import Response
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
+from django.db import transaction
+from goods.models import Goods, Like, Favorite
+from goods.counters import adjust_counter
+from goods.write_buffer import get_buffer_setting, like_buffer, favorite_buffer
+from goods.favorites import invalidate_favorites
+from api.throttling import token_bucket
+
+
+# -------------------------- 7. 点赞相关接口 --------------------------
+@api_view(['POST', 'DELETE'])
+@permission_classes([permissions.IsAuthenticated])
+@throttle_classes(token_bucket('like'))
+def goods_like(request, goods_id):
+    """点赞/取消点赞商品"""
+    try:
+        goods = Goods.objects.get(id=goods_id)
+    except Goods.DoesNotExist:
+        return Response({
+            'success': False,
+            'message': '商品不存在'
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    # 🔥 写合并模式：只记录到内存缓冲区，由后台线程批量写入（幂等，返回 202）
+    if get_buffer_setting('ENABLED'):
+        if request.method == 'POST':
+            like_buffer.add(goods.id, request.user.id)
+            return Response({
+                'success': True,
+                'message': '点赞成功',
+                'action': 'liked',
+                'buffered': True
+            }, status=status.HTTP_202_ACCEPTED)
+        like_buffer.remove(goods.id, request.user.id)
+        return Response({
+            'success': True,
+            'message': '取消点赞成功',
+            'action': 'unliked',
+            'buffered': True
+        }, status=status.HTTP_202_ACCEPTED)
+
+    if request.method == 'POST':
+        with transaction.atomic():
+            like, created = Like.objects.get_or_create(goods=goods, user=request.user)
+            if created:
+                adjust_counter(Like, goods.id, 1)
+        if created:
+            return Response({
+                'success': True,
+                'message': '点赞成功',
+                'action': 'liked'
+            })
+        else:
+            return Response({
+                'success': False,
+                'message': '已经点过赞了'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+    elif request.method == 'DELETE':
+        with transaction.atomic():
+            deleted, _ = Like.objects.filter(goods=goods, user=request.user).delete()
+            if deleted:
+                adjust_counter(Like, goods.id, -1)
+        if deleted:
+            return Response({
+                'success': True,
+                'message': '取消点赞成功',
+                'action': 'unliked'
+            })
+        return Response({
+            'success': False,
+            'message': '尚未点赞'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+
+# -------------------------- 8. 收藏相关接口 --------------------------
+@api_view(['POST', 'DELETE'])
+@permission_classes([permissions.IsAuthenticated])
+@throttle_classes(token_bucket('favorite'))
+def goods_favorite(request, goods_id):
+    """收藏/取消收藏商品"""
+    try:
+        goods = Goods.objects.get(id=goods_id)
+    except Goods.DoesNotExist:
+        return Response({
+            'success': False,
+            'message': '商品不存在'
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    # 🔥 写合并模式：只记录到内存缓冲区，由后台线程批量写入（幂等，返回 202）
+    if get_buffer_setting('ENABLED'):
+        if request.method == 'POST':
+            favorite_buffer.add(goods.id, request.user.id)
+            return Response({
+                'success': True,
+                'message': '收藏成功',
+                'action': 'favorited',
+                'buffered': True
+            }, status=status.HTTP_202_ACCEPTED)
+        favorite_buffer.remove(goods.id, request.user.id)
+        return Response({
+            'success': True,
+            'message': '取消收藏成功',
+            'action': 'unfavorited',
+            'buffered': True
+        }, status=status.HTTP_202_ACCEPTED)
+
+    if request.method == 'POST':
+        with transaction.atomic():
+            favorite, created = Favorite.objects.get_or_create(goods=goods, user=request.user)
+            if created:
+                adjust_counter(Favorite, goods.id, 1)
+        if created:
+            invalidate_favorites(request.user.id)
+            return Response({
+                'success': True,
+                'message': '收藏成功',
+                'action': 'favorited'
+            })
+        else:
+            return Response({
+                'success': False,
+                'message': '已经收藏过了'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+    elif request.method == 'DELETE':
+        with transaction.atomic():
+            deleted, _ = Favorite.objects.filter(goods=goods, user=request.user).delete()
+            if deleted:
+                adjust_counter(Favorite, goods.id, -1)
+        if deleted:
+            invalidate_favorites(request.user.id)
+            return Response({
+                'success': True,
+                'message': '取消收藏成功',
+                'action': 'unfavorited'
+            })
+        return Response({
+            'success': False,
+            'message': '尚未收藏'
+        }, status=status.HTTP_400_BAD_REQUEST)
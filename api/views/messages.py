@@ -0,0 +1,179 @@
+# api/views/messages.py
+"""留言、发件箱/收件箱和未读数"""
+import heapq
+
+from rest_framework import status, permissions
+from rest_framework.response import Response
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
+from django.db import models, transaction
+from goods.models import Goods, Message, ArchivedMessage
+from goods.counters import adjust_unread, unread_count
+from api.serializers import MessageSerializer, ArchivedMessageSerializer
+from api.throttling import token_bucket
+from api.pagination import MergedCursorPagination
+from api.streaming import StreamedList, iter_queryset, streaming_json_response
+from api.querylog import query_budget
+
+
+# -------------------------- 9. 留言相关接口 --------------------------
+@query_budget(12)
+@api_view(['GET', 'POST'])
+@permission_classes([permissions.IsAuthenticated])
+@throttle_classes(token_bucket('message'))
+def goods_messages(request, goods_id):
+    """获取商品留言和发送留言"""
+    try:
+        goods = Goods.objects.get(id=goods_id)
+    except Goods.DoesNotExist:
+        return Response({
+            'success': False,
+            'message': '商品不存在'
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    if request.method == 'GET':
+        messages = Message.objects.filter(
+            goods=goods
+        ).filter(
+            models.Q(sender=request.user) | models.Q(receiver=request.user)
+        ).select_related('sender', 'receiver', 'goods').order_by('created_at')
+
+        serializer = MessageSerializer(messages, many=True)
+        return Response({
+            'success': True,
+            'messages': serializer.data,
+            'count': len(serializer.data)
+        })
+
+    elif request.method == 'POST':
+        serializer = MessageSerializer(data=request.data)
+        if serializer.is_valid():
+            receiver = goods.seller
+            if receiver is None:
+                return Response({
+                    'success': False,
+                    'message': '该商品没有卖家，无法留言'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            if receiver == request.user:
+                return Response({
+                    'success': False,
+                    'message': '不能给自己发送留言'
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            with transaction.atomic():
+                serializer.save(goods=goods, sender=request.user, receiver=receiver)
+                adjust_unread(receiver.id, 1)
+            return Response({
+                'success': True,
+                'message': '留言发送成功',
+                'message_data': serializer.data
+            }, status=status.HTTP_201_CREATED)
+        return Response({
+            'success': False,
+            'message': '数据验证失败',
+            'errors': serializer.errors
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+
+@query_budget(7)
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def user_messages(request):
+    """获取用户相关的所有留言（🔥 流式输出，热表和归档表分块读取后按时间归并，见 api/streaming.py）"""
+    message_serializer = MessageSerializer()
+    archived_serializer = ArchivedMessageSerializer()
+
+    def serialize(message):
+        if isinstance(message, ArchivedMessage):
+            return archived_serializer.to_representation(message)
+        return message_serializer.to_representation(message)
+
+    history = {}
+    for direction, user_filter in (('sent', {'sender': request.user}), ('received', {'receiver': request.user})):
+        messages = Message.objects.filter(**user_filter).select_related('sender', 'receiver').order_by('-created_at')
+        # 🔥 新增：同时读取归档表中的旧留言，按时间合并
+        archived = (
+            ArchivedMessage.objects.filter(**user_filter).select_related('sender', 'receiver').order_by('-created_at')
+        )
+        rows = heapq.merge(
+            iter_queryset(messages), iter_queryset(archived), key=lambda message: message.created_at, reverse=True
+        )
+        history[direction] = StreamedList(rows, serialize)
+
+    return streaming_json_response([
+        ('success', True),
+        ('sent_messages', history['sent']),
+        ('sent_count', lambda: history['sent'].count),
+        ('received_messages', history['received']),
+        ('received_count', lambda: history['received'].count),
+    ])
+
+
+MESSAGE_BOXES = {
+    'sent': lambda user: [Message.objects.filter(sender=user), ArchivedMessage.objects.filter(sender=user)],
+    'received': lambda user: [Message.objects.filter(receiver=user), ArchivedMessage.objects.filter(receiver=user)],
+    'unread': lambda user: [Message.objects.filter(receiver=user, is_read=False)],  # 归档的留言不算未读
+}
+
+
+# 🔥 新增：发件箱/收件箱/未读留言（游标分页，热表和归档表合并，每页只读取 page_size + 1 行）
+@query_budget(5)
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def user_message_box(request, box):
+    """
+    box: sent - 发出的留言, received - 收到的留言, unread - 未读留言
+    参数: cursor=上一页返回的 next, page_size=每页数量（最多100）
+    """
+    if box not in MESSAGE_BOXES:
+        return Response({
+            'success': False,
+            'message': '无效的留言类型'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    paginator = MergedCursorPagination()
+    querysets = [queryset.select_related('sender', 'receiver') for queryset in MESSAGE_BOXES[box](request.user)]
+    rows = paginator.paginate(querysets, request)
+    hot = [row for row in rows if isinstance(row, Message)]
+    archived = [row for row in rows if isinstance(row, ArchivedMessage)]
+    serialized = dict(zip(
+        [(Message, row.id) for row in hot] + [(ArchivedMessage, row.id) for row in archived],
+        list(MessageSerializer(hot, many=True).data) + list(ArchivedMessageSerializer(archived, many=True).data),
+    ))
+    messages = [serialized[type(row), row.id] for row in rows]
+    return Response({
+        'success': True,
+        'messages': messages,
+        'count': len(messages),
+        **paginator.page_links()
+    })
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def unread_message_count(request):
+    """未读留言数（读取维护好的计数，不扫描留言表）"""
+    return Response({
+        'success': True,
+        'unread_count': unread_count(request.user.id)
+    })
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def mark_message_read(request, message_id):
+    """标记留言为已读"""
+    # 🔥 修改：条件更新，只有原来未读时才减少未读数
+    with transaction.atomic():
+        updated = Message.objects.filter(id=message_id, receiver=request.user, is_read=False).update(is_read=True)
+        if updated:
+            adjust_unread(request.user.id, -1)
+    if not updated and not Message.objects.filter(id=message_id, receiver=request.user).exists():
+        return Response({
+            'success': False,
+            'message': '留言不存在或无权操作'
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    return Response({
+        'success': True,
+        'message': '标记为已读成功'
+    })
@@ -0,0 +1,70 @@
+# api/views/metrics.py
+"""性能指标和内存监控（仅限管理员或白名单地址，管理员可以用 Token 认证访问）"""
+from django.conf import settings
+from django.http import HttpResponse
+from rest_framework import permissions, status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+from api import memory
+from api.metrics import registry as metrics_registry
+
+
+class MetricsAllowedIP(permissions.BasePermission):
+    """PERF_METRICS['ALLOWED_IPS'] 中的地址（如 Prometheus 抓取端）无需登录"""
+
+    def has_permission(self, request, view):
+        return request.META.get('REMOTE_ADDR') in settings.PERF_METRICS.get('ALLOWED_IPS', [])
+
+
+# -------------------------- 11. 性能指标接口 --------------------------
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser | MetricsAllowedIP])
+def metrics(request):
+    """导出性能指标（Prometheus 文本格式）"""
+    return HttpResponse(
+        metrics_registry.render_prometheus() + memory.render_prometheus(),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
+
+
+# 🔥 新增：当前 worker 的内存情况（仅限管理员或白名单地址）
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser | MetricsAllowedIP])
+def memory_stats(request):
+    """
+    进程 RSS、各接口请求期间 RSS 峰值的增长，以及 tracemalloc 快照（MEMORY['TRACEMALLOC_FRAMES'] > 0 时）
+    参数: top=显示的分配位置数, group=lineno|filename|traceback, compare=1 与上一次快照对比
+    多进程部署时只反映处理本次请求的 worker
+    """
+    group_by = request.GET.get('group', 'lineno')
+    if group_by not in memory.SNAPSHOT_GROUPS:
+        return Response({
+            'success': False,
+            'message': 'group 只支持 lineno、filename 或 traceback'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        top = min(max(int(request.GET.get('top', memory.get_memory_setting('TOP_ALLOCATIONS'))), 1), 200)
+    except ValueError:
+        return Response({
+            'success': False,
+            'message': 'top 必须是整数'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    endpoints = [
+        {
+            'view': view,
+            'method': method,
+            'requests': data['count'],
+            'avg_peak_rss_growth': round(data['sum'] / data['count']) if data['count'] else 0,
+            'max_peak_rss_growth': data['max'],
+        }
+        for (view, method), data in metrics_registry.summary('peak_rss_growth_bytes').items()
+    ]
+    endpoints.sort(key=lambda item: -(item['max_peak_rss_growth'] or 0))
+    return Response({
+        'success': True,
+        'rss': memory.current_rss(),
+        'peak_rss': memory.peak_rss(),
+        'endpoints': endpoints,
+        'tracemalloc': memory.take_snapshot(group_by, top, compare=request.GET.get('compare') in ('1', 'true')),
+    })
@@ -0,0 +1,142 @@
+# api/views/user.py
+"""用户的商品、购买记录、卖家统计和收藏列表"""
+from rest_framework import status, permissions
+from rest_framework.response import Response
+from rest_framework.decorators import api_view, permission_classes
+from goods.models import Goods, ArchivedGoods
+from goods.favorites import favorite_page
+from goods.stats import PERIODS as STATS_PERIODS, get_stats_setting, seller_stats
+from api.serializers import GoodsSerializer, ArchivedGoodsSerializer, merge_serialized, with_list_annotations
+from api.querylog import query_budget
+
+
+# -------------------------- 4. 用户商品相关接口 --------------------------
+@query_budget(5)
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def user_goods_list(request, action):
+    """
+    获取用户相关的商品信息
+    action: 'my-goods' - 我的出售商品, 'my-purchases' - 我的购买记录
+    """
+    try:
+        if action == 'my-goods':
+            try:
+                my_goods = with_list_annotations(
+                    Goods.objects.filter(seller=request.user), request
+                ).order_by('-created_at')
+                serializer = GoodsSerializer(my_goods, many=True, context={'request': request})
+                return Response({
+                    'success': True,
+                    'goods': serializer.data,
+                    'count': len(serializer.data)
+                })
+            except Exception as e:
+                return Response({
+                    'success': False,
+                    'message': '获取我的商品失败',
+                    'error': str(e)
+                }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        elif action == 'my-purchases':
+            try:
+                purchased_goods = list(
+                    with_list_annotations(Goods.objects.filter(buyer=request.user), request).order_by('-sold_at')
+                )
+                serializer = GoodsSerializer(purchased_goods, many=True, context={'request': request})
+                # 🔥 新增：同时读取归档表中的购买记录，按售出时间合并
+                archived_goods = list(
+                    ArchivedGoods.objects.filter(buyer=request.user).select_related('seller').order_by('-sold_at')
+                )
+                archived_serializer = ArchivedGoodsSerializer(archived_goods, many=True, context={'request': request})
+                purchases = merge_serialized(
+                    purchased_goods, serializer.data, archived_goods, archived_serializer.data, 'sold_at'
+                )
+                return Response({
+                    'success': True,
+                    'purchases': purchases,
+                    'count': len(purchases)
+                })
+            except Exception as e:
+                return Response({
+                    'success': False,
+                    'message': '获取购买记录失败',
+                    'error': str(e)
+                }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        else:
+            return Response({
+                'success': False,
+                'message': '无效的操作类型'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+    except Exception as e:
+        return Response({
+            'success': False,
+            'message': f'操作失败: {str(e)}'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+# 🔥 新增：卖家统计（替代前端拉取 my-goods 全量数据后自行计数）
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def seller_dashboard(request):
+    """
+    卖家统计：在售/已售数量、销售额、点赞、收藏、平均评分、未读留言，以及销售趋势
+    参数: period=day|week|month, days=统计最近多少天（默认30）
+    """
+    period = request.query_params.get('period', 'day')
+    if period not in STATS_PERIODS:
+        return Response({
+            'success': False,
+            'message': 'period 只支持 day、week 或 month'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        days = min(max(int(request.query_params.get('days', 30)), 1), get_stats_setting('MAX_DAYS'))
+    except ValueError:
+        return Response({
+            'success': False,
+            'message': 'days 必须是整数'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response({
+        'success': True,
+        'period': period,
+        'days': days,
+        'stats': seller_stats(request.user.pk, period, days)
+    })
+
+
+# -------------------------- 10. 获取用户收藏的商品 --------------------------
+@query_budget(6)
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def user_favorites(request):
+    """
+    获取用户收藏的商品列表
+    参数: page=页码（从1开始）, page_size=每页数量（最多100）
+    🔥 修改：收藏的商品 id 列表和总数按用户缓存（见 goods/favorites.py），每页只用一条查询取商品
+    """
+    try:
+        page = max(int(request.query_params.get('page', 1)), 1)
+        page_size = min(max(int(request.query_params.get('page_size', 20)), 1), 100)
+    except ValueError:
+        return Response({
+            'success': False,
+            'message': '分页参数必须是整数'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    page_ids, count = favorite_page(request.user.id, (page - 1) * page_size, page_size)
+    goods_by_id = with_list_annotations(Goods.objects.filter(id__in=page_ids), request).in_bulk()
+    favorite_goods = [goods_by_id[goods_id] for goods_id in page_ids if goods_id in goods_by_id]
+
+    serializer = GoodsSerializer(favorite_goods, many=True, context={'request': request})
+
+    return Response({
+        'success': True,
+        'favorites': serializer.data,
+        'count': count,
+        'page': page,
+        'has_more': page * page_size < count
+    })
@@ -1,6 +1,243 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.functional import cached_property
+
 from . import models
+from .counters import refresh_counters, refresh_ratings, refresh_unread
+from .facets import invalidate_facets
+from .favorites import invalidate_favorites
+from .stats import invalidate_seller_stats
+from .tasks import schedule_purge
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    大表分页器：未过滤的列表用统计信息估算总数，避免每次打开列表页都 COUNT(*) 全表
+    带过滤条件时仍然精确计数（过滤条件都有索引）；默认管理器自带的条件（如 Goods 排除已删除）不算过滤
+    """
+    exact_count_threshold = 10000  # 估算值小于该值时直接精确计数
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, 'query', None)
+        if query is not None and self._is_unfiltered(query):
+            estimate = estimate_table_rows(self.object_list.model)
+            if estimate is not None and estimate >= self.exact_count_threshold:
+                return estimate
+        return super().count
+
+    def _is_unfiltered(self, query):
+        return not query.where or query.where == self.object_list.model._default_manager.all().query.where
+
+
+def estimate_table_rows(model):
+    """从数据库统计信息估算表行数，无法估算时返回 None"""
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE relname = %s', [table])
+            row = cursor.fetchone()
+            return row[0] if row and row[0] > 0 else None
+        if connection.vendor == 'sqlite':
+            # ANALYZE 之后 sqlite_stat1 的 stat 第一个数即表行数；没有统计信息时用最大主键近似
+            try:
+                cursor.execute('SELECT stat FROM sqlite_stat1 WHERE tbl = %s AND idx IS NULL', [table])
+                row = cursor.fetchone()
+                if row:
+                    return int(row[0].split()[0])
+            except DatabaseError:
+                pass
+            cursor.execute(f'SELECT MAX(rowid) FROM "{table}"')
+            row = cursor.fetchone()
+            return row[0] if row and row[0] else None
+    return None
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """大表通用配置：估算总数、不额外计算全表数量"""
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
+
+
+@admin.register(models.Goods)
+class GoodsAdmin(LargeTableAdmin):
+    list_display = ('id', 'name', 'display_price', 'category', 'condition', 'seller', 'buyer', 'is_sold', 'created_at')
+    list_display_links = ('id', 'name')
+    list_select_related = ('seller', 'buyer')
+    list_filter = ('is_sold', 'category', 'condition')
+    search_fields = ('name', '=seller__username')
+    autocomplete_fields = ('seller', 'buyer')
+    readonly_fields = ('created_at', 'updated_at')
+    ordering = ('-created_at',)
+    actions = ['mark_sold', 'soft_delete']
+
+    @admin.display(description='价格', ordering='price_cents')
+    def display_price(self, obj):
+        return obj.price
+
+    @admin.action(description='标记为已售出')
+    def mark_sold(self, request, queryset):
+        unsold = queryset.filter(is_sold=False)
+        seller_ids = set(unsold.values_list('seller_id', flat=True))
+        updated = unsold.update(is_sold=True, sold_at=timezone.now(), version=F('version') + 1)
+        invalidate_seller_stats(*seller_ids)
+        invalidate_facets()
+        self.message_user(request, f'已标记 {updated} 件商品为已售出', messages.SUCCESS)
+
+    @admin.action(description='删除所选商品（关联数据和图片由后台清理）')
+    def soft_delete(self, request, queryset):
+        deleted = self.delete_queryset(request, queryset)
+        self.message_user(request, f'已删除 {deleted} 件商品，关联数据和图片将由后台任务清理', messages.SUCCESS)
+
+    # 🔥 后台的删除页和"删除所选"同样只做软删除，关联数据和图片走后台清理
+    def delete_model(self, request, obj):
+        obj.soft_delete()
+        self._after_delete([obj.seller_id])
+
+    def delete_queryset(self, request, queryset):
+        seller_ids = set(queryset.values_list('seller_id', flat=True))
+        deleted = queryset.update(deleted_at=timezone.now())
+        self._after_delete(seller_ids)
+        return deleted
+
+    @staticmethod
+    def _after_delete(seller_ids):
+        schedule_purge()
+        invalidate_seller_stats(*seller_ids)
+        invalidate_facets()
+
+
+@admin.register(models.Comment)
+class CommentAdmin(LargeTableAdmin):
+    list_display = ('id', 'goods', 'user', 'rating', 'created_at')
+    list_select_related = ('goods', 'user')
+    list_filter = ('rating',)
+    search_fields = ('=user__username',)
+    autocomplete_fields = ('goods', 'user')
+    ordering = ('-created_at',)
+
+    # 🔥 后台修改/删除评论后重算相关商品的评分汇总
+    def save_model(self, request, obj, form, change):
+        old_goods_id = models.Comment.objects.filter(pk=obj.pk).values_list('goods_id', flat=True).first()
+        super().save_model(request, obj, form, change)
+        refresh_ratings({obj.goods_id, old_goods_id} - {None})
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        refresh_ratings([obj.goods_id])
+
+    def delete_queryset(self, request, queryset):
+        goods_ids = set(queryset.values_list('goods_id', flat=True))
+        super().delete_queryset(request, queryset)
+        refresh_ratings(goods_ids)
+
+
+class InteractionAdmin(LargeTableAdmin):
+    """点赞/收藏：后台修改或删除后按实际行数重算相关商品的计数器"""
+    list_display = ('id', 'goods', 'user', 'created_at')
+    list_select_related = ('goods', 'user')
+    search_fields = ('=user__username',)
+    autocomplete_fields = ('goods', 'user')
+
+    def save_model(self, request, obj, form, change):
+        old = self.model.objects.filter(pk=obj.pk).values_list('goods_id', 'user_id').first() or (None, None)
+        super().save_model(request, obj, form, change)
+        self._refresh({obj.goods_id, old[0]}, {obj.user_id, old[1]})
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        self._refresh({obj.goods_id}, {obj.user_id})
+
+    def delete_queryset(self, request, queryset):
+        keys = list(queryset.values_list('goods_id', 'user_id'))
+        super().delete_queryset(request, queryset)
+        self._refresh({goods_id for goods_id, _ in keys}, {user_id for _, user_id in keys})
+
+    def _refresh(self, goods_ids, user_ids):
+        refresh_counters(self.model, goods_ids - {None})
+        if self.model is models.Favorite:
+            invalidate_favorites(*(user_ids - {None}))
+
+
+@admin.register(models.Like)
+class LikeAdmin(InteractionAdmin):
+    pass
+
+
+@admin.register(models.Favorite)
+class FavoriteAdmin(InteractionAdmin):
+    pass
+
+
+@admin.register(models.Message)
+class MessageAdmin(LargeTableAdmin):
+    list_display = ('id', 'goods', 'sender', 'receiver', 'is_read', 'created_at')
+    list_select_related = ('goods', 'sender', 'receiver')
+    list_filter = ('is_read',)
+    search_fields = ('=sender__username', '=receiver__username')
+    autocomplete_fields = ('goods', 'sender', 'receiver')
+    ordering = ('-created_at',)
+    actions = ['mark_read']
+
+    @admin.action(description='标记为已读')
+    def mark_read(self, request, queryset):
+        with transaction.atomic():
+            unread = queryset.filter(is_read=False)
+            receiver_ids = set(unread.values_list('receiver_id', flat=True))
+            updated = unread.update(is_read=True)
+            refresh_unread(receiver_ids)
+        self.message_user(request, f'已标记 {updated} 条留言为已读', messages.SUCCESS)
+
+    # 🔥 后台修改/删除留言后重算相关接收者的未读数
+    def save_model(self, request, obj, form, change):
+        with transaction.atomic():
+            old_receiver_id = models.Message.objects.filter(pk=obj.pk).values_list('receiver_id', flat=True).first()
+            super().save_model(request, obj, form, change)
+            refresh_unread({obj.receiver_id, old_receiver_id} - {None})
+
+    def delete_model(self, request, obj):
+        with transaction.atomic():
+            super().delete_model(request, obj)
+            if not obj.is_read:
+                refresh_unread([obj.receiver_id])
+
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic():
+            receiver_ids = set(queryset.filter(is_read=False).values_list('receiver_id', flat=True))
+            super().delete_queryset(request, queryset)
+            refresh_unread(receiver_ids)
+
+
+class ArchiveAdmin(LargeTableAdmin):
+    """归档表只读"""
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(models.ArchivedGoods)
+class ArchivedGoodsAdmin(ArchiveAdmin):
+    list_display = ('id', 'name', 'display_price', 'category', 'seller', 'buyer', 'sold_at', 'archived_at')
+    list_select_related = ('seller', 'buyer')
+    list_filter = ('category',)
+    search_fields = ('name', '=seller__username')
+    ordering = ('-sold_at',)
+
+    @admin.display(description='价格', ordering='price_cents')
+    def display_price(self, obj):
+        return obj.price
 
-# Register your models here.
 
-admin.site.register(models.Goods)
\ No newline at end of file
+@admin.register(models.ArchivedMessage)
+class ArchivedMessageAdmin(ArchiveAdmin):
+    list_display = ('id', 'goods_name', 'sender', 'receiver', 'is_read', 'created_at', 'archived_at')
+    list_select_related = ('sender', 'receiver')
+    search_fields = ('=sender__username', '=receiver__username')
+    ordering = ('-created_at',)
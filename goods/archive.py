@@ -0,0 +1,162 @@
+# goods/archive.py
+"""
+数据归档和清理：把已售出较久的商品和旧留言移到归档表，清理已删除的商品，保持热表（goods_goods、goods_message）小而快
+
+- 已售商品：sold_at 早于 SOLD_GOODS_DAYS 天的商品写入 ArchivedGoods（带归档时的点赞/收藏/评论汇总），
+  该商品的留言一起写入 ArchivedMessage，然后删除热表记录（评论、点赞、收藏、热度分随之级联删除）
+- 旧留言：created_at 早于 MESSAGE_DAYS 天的留言写入 ArchivedMessage 后删除
+- 每批 BATCH_SIZE 条，一个批次一个事务；归档表保留原 id，重复执行是幂等的
+- 读路径：我的购买记录、留言记录、卖家统计会同时读取热表和归档表（见 merge_by / 各调用处）；
+  未读留言数只统计热表，归档的留言不再计入
+- 商品图片文件保留，归档记录中仍保存图片路径
+- 已删除商品：删除接口只写 deleted_at（Goods.soft_delete），PURGE_DELAY 秒后由后台任务每批 PURGE_BATCH_SIZE 件
+  硬删除（评论、点赞、收藏、留言级联删除）并删除图片文件；其中已成交（有买家）的商品改为归档，保留销售记录
+"""
+import heapq
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from goods.counters import refresh_unread
+from goods.models import ArchivedGoods, ArchivedMessage, Goods, GoodsRating, Message
+
+DEFAULTS = {
+    'SOLD_GOODS_DAYS': 90,
+    'MESSAGE_DAYS': 180,
+    'BATCH_SIZE': 1000,
+    'INTERVAL': 86400,  # 后台任务的执行间隔（秒）
+    'PURGE_DELAY': 60,  # 删除后多久开始清理（秒），期间的删除合并为一次任务
+    'PURGE_BATCH_SIZE': 200,
+}
+
+
+def get_archive_setting(key):
+    return getattr(settings, 'ARCHIVE', {}).get(key, DEFAULTS[key])
+
+
+def _archived_message(message, goods_name):
+    return ArchivedMessage(
+        id=message.id, goods_id=message.goods_id, goods_name=goods_name,
+        sender_id=message.sender_id, receiver_id=message.receiver_id,
+        content=message.content, is_read=message.is_read, created_at=message.created_at,
+    )
+
+
+def archive_goods_batch(goods_ids):
+    """归档一批已售商品及其留言，返回归档的商品数"""
+    with transaction.atomic():
+        goods_list = list(Goods.all_objects.filter(id__in=goods_ids, is_sold=True))
+        if not goods_list:
+            return 0
+        ids = [goods.id for goods in goods_list]
+        ratings = GoodsRating.objects.in_bulk(ids)
+        ArchivedGoods.objects.bulk_create([
+            ArchivedGoods(
+                id=goods.id, name=goods.name, price_cents=goods.price_cents, description=goods.description,
+                category=goods.category, condition=goods.condition, location=goods.location,
+                region_code=goods.region_code, contact=goods.contact, image=goods.image.name or '',
+                seller_id=goods.seller_id, buyer_id=goods.buyer_id, sold_at=goods.sold_at,
+                likes_count=goods.likes_count, favorites_count=goods.favorites_count,
+                comments_count=ratings[goods.id].count if goods.id in ratings else 0,
+                rating_total=ratings[goods.id].total if goods.id in ratings else 0,
+                created_at=goods.created_at,
+            )
+            for goods in goods_list
+        ], ignore_conflicts=True)
+
+        names = {goods.id: goods.name for goods in goods_list}
+        messages = list(Message.objects.filter(goods_id__in=ids))
+        ArchivedMessage.objects.bulk_create(
+            [_archived_message(message, names[message.goods_id]) for message in messages],
+            ignore_conflicts=True,
+        )
+        Goods.all_objects.filter(id__in=ids).delete()
+        refresh_unread({message.receiver_id for message in messages if not message.is_read})
+    return len(ids)
+
+
+def archive_messages_batch(message_ids):
+    """归档一批留言，返回归档数"""
+    with transaction.atomic():
+        messages = list(Message.objects.filter(id__in=message_ids).select_related('goods').only(
+            'id', 'goods_id', 'goods__name', 'sender_id', 'receiver_id', 'content', 'is_read', 'created_at',
+        ))
+        ArchivedMessage.objects.bulk_create(
+            [_archived_message(message, message.goods.name) for message in messages],
+            ignore_conflicts=True,
+        )
+        Message.objects.filter(id__in=[message.id for message in messages]).delete()
+        refresh_unread({message.receiver_id for message in messages if not message.is_read})
+    return len(messages)
+
+
+def _run_batches(queryset, archive_batch, batch_size, limit=None):
+    archived = 0
+    while limit is None or archived < limit:
+        size = batch_size if limit is None else min(batch_size, limit - archived)
+        ids = list(queryset.order_by('id').values_list('id', flat=True)[:size])
+        if not ids:
+            break
+        archived += archive_batch(ids)
+    return archived
+
+
+def sold_goods_queryset(days=None):
+    cutoff = timezone.now() - timedelta(days=days if days is not None else get_archive_setting('SOLD_GOODS_DAYS'))
+    # 卖家删除的商品只归档已成交的，下架后删除的由 purge_deleted_goods 清理
+    return Goods.all_objects.filter(
+        Q(deleted_at__isnull=True) | Q(buyer__isnull=False), is_sold=True, sold_at__lt=cutoff
+    )
+
+
+def old_messages_queryset(days=None):
+    cutoff = timezone.now() - timedelta(days=days if days is not None else get_archive_setting('MESSAGE_DAYS'))
+    return Message.objects.filter(created_at__lt=cutoff)
+
+
+def archive_sold_goods(days=None, batch_size=None, limit=None):
+    return _run_batches(sold_goods_queryset(days), archive_goods_batch,
+                        batch_size or get_archive_setting('BATCH_SIZE'), limit)
+
+
+def archive_old_messages(days=None, batch_size=None, limit=None):
+    return _run_batches(old_messages_queryset(days), archive_messages_batch,
+                        batch_size or get_archive_setting('BATCH_SIZE'), limit)
+
+
+def purge_deleted_goods(batch_size=None, limit=None):
+    """硬删除已软删除的商品及其关联数据（已成交的改为归档），返回清理的商品数"""
+    from goods.tasks import delete_files
+
+    batch_size = batch_size or get_archive_setting('PURGE_BATCH_SIZE')
+    purged = 0
+    while limit is None or purged < limit:
+        size = batch_size if limit is None else min(batch_size, limit - purged)
+        rows = list(
+            Goods.all_objects.filter(deleted_at__isnull=False)
+            .order_by('deleted_at').values_list('id', 'image', 'is_sold', 'buyer_id')[:size]
+        )
+        if not rows:
+            break
+        sold_ids = [goods_id for goods_id, _, is_sold, buyer_id in rows if is_sold and buyer_id is not None]
+        if sold_ids:
+            archive_goods_batch(sold_ids)  # 成交的商品保留销售记录（图片文件随归档记录保留）
+        rows = [(goods_id, image) for goods_id, image, _, _ in rows if goods_id not in sold_ids]
+        goods_ids = [goods_id for goods_id, _ in rows]
+        with transaction.atomic():
+            receivers = set(
+                Message.objects.filter(goods_id__in=goods_ids, is_read=False).values_list('receiver_id', flat=True)
+            )
+            Goods.all_objects.filter(id__in=goods_ids).delete()
+            refresh_unread(receivers)
+        delete_files([image for _, image in rows if image])
+        purged += len(rows) + len(sold_ids)
+    return purged
+
+
+def merge_by(key, *sorted_lists, reverse=True):
+    """合并热表和归档表中各自已排序的结果（都按 key 降序时 reverse=True）"""
+    return list(heapq.merge(*sorted_lists, key=key, reverse=reverse))
@@ -0,0 +1,102 @@
+# goods/counters.py
+"""商品点赞数/收藏数计数器、评分汇总（GoodsRating）、用户未读留言数（UnreadCounter）维护"""
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from goods.models import Goods, GoodsRating, Comment, Like, Favorite, Message, UnreadCounter
+from goods.ranking import mark_dirty
+
+COUNTER_FIELDS = {
+    Like: 'likes_count',
+    Favorite: 'favorites_count',
+}
+
+
+def adjust_counter(model, goods_id, delta):
+    """单条点赞/收藏增删后调整计数器（一条 UPDATE）"""
+    field = COUNTER_FIELDS[model]
+    Goods.objects.filter(id=goods_id).update(**{field: F(field) + delta})
+    if delta < 0:
+        mark_dirty([goods_id])
+
+
+def _count_subquery(model):
+    counts = (
+        model.objects.filter(goods_id=OuterRef('pk'))
+        .order_by()
+        .values('goods_id')
+        .annotate(c=Count('id'))
+        .values('c')
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def refresh_counters(model, goods_ids):
+    """按实际行数重算一批商品的计数器（一条 UPDATE ... SET x = (SELECT COUNT...)）"""
+    if goods_ids:
+        Goods.objects.filter(id__in=goods_ids).update(**{COUNTER_FIELDS[model]: _count_subquery(model)})
+        mark_dirty(goods_ids)
+
+
+def adjust_rating(goods_id, rating, delta):
+    """单条评论增删后调整评分汇总（delta 为 1 或 -1），没有汇总行时先创建"""
+    changes = {
+        'count': F('count') + delta,
+        'total': F('total') + delta * rating,
+        f'rating_{rating}': F(f'rating_{rating}') + delta,
+    }
+    if not GoodsRating.objects.filter(goods_id=goods_id).update(**changes):
+        GoodsRating.objects.bulk_create([GoodsRating(goods_id=goods_id)], ignore_conflicts=True)
+        GoodsRating.objects.filter(goods_id=goods_id).update(**changes)
+    if delta < 0:
+        mark_dirty([goods_id])
+
+
+def rating_summary(goods_id):
+    """{'average': 平均分, 'count': 评论数, 'distribution': {'1': 数量, ..., '5': 数量}}"""
+    rating = GoodsRating.objects.filter(goods_id=goods_id).first() or GoodsRating(goods_id=goods_id)
+    return rating.summary()
+
+
+def refresh_ratings(goods_ids):
+    """按评论表重算一批商品的评分汇总（后台批量修改评论后调用）"""
+    goods_ids = set(goods_ids)
+    rows = {goods_id: GoodsRating(goods_id=goods_id) for goods_id in goods_ids}
+    counts = (
+        Comment.objects.filter(goods_id__in=goods_ids)
+        .values('goods_id', 'rating').annotate(n=Count('id')).order_by()
+    )
+    for row in counts:
+        rating = rows[row['goods_id']]
+        rating.count += row['n']
+        rating.total += row['n'] * row['rating']
+        setattr(rating, f"rating_{row['rating']}", row['n'])
+    GoodsRating.objects.bulk_create(
+        rows.values(), update_conflicts=True, unique_fields=['goods'],
+        update_fields=['count', 'total'] + [f'rating_{score}' for score in range(1, 6)],
+    )
+    mark_dirty(goods_ids)
+
+
+def adjust_unread(user_id, delta):
+    """发送留言（+1）、标记已读（-1）后调整接收者的未读数，没有计数行时先创建"""
+    if not UnreadCounter.objects.filter(user_id=user_id).update(count=F('count') + delta):
+        UnreadCounter.objects.bulk_create([UnreadCounter(user_id=user_id)], ignore_conflicts=True)
+        UnreadCounter.objects.filter(user_id=user_id).update(count=F('count') + delta)
+
+
+def unread_count(user_id):
+    return UnreadCounter.objects.filter(user_id=user_id).values_list('count', flat=True).first() or 0
+
+
+def refresh_unread(user_ids):
+    """按留言表重算一批用户的未读数（归档、清理、批量导入留言后调用）"""
+    user_ids = set(user_ids)
+    counts = dict(
+        Message.objects.filter(receiver_id__in=user_ids, is_read=False)
+        .values('receiver_id').annotate(n=Count('id')).order_by().values_list('receiver_id', 'n')
+    )
+    UnreadCounter.objects.bulk_create(
+        [UnreadCounter(user_id=user_id, count=counts.get(user_id, 0)) for user_id in user_ids],
+        update_conflicts=True, unique_fields=['user'], update_fields=['count'],
+    )
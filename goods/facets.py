@@ -0,0 +1,123 @@
+# goods/facets.py
+"""
+商品列表的分面统计（分类、成色、价格区间的在售商品数）
+
+- 每个维度一条 GROUP BY，统计时去掉该维度自身的过滤条件（选中"图书"后其他分类仍显示数量）
+- 结果按过滤条件缓存；商品新增/修改/删除时版本号变化（goods.signals），旧缓存自然失效，
+  批量 update() 不触发信号，由调用方调用 invalidate_facets() 或等待 TTL 过期
+- 无过滤条件的首页侧边栏直接命中缓存，不访问数据库
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Case, CharField, Count, Q, Value, When
+
+from goods.models import Goods
+
+DEFAULTS = {
+    'CACHE_ALIAS': 'default',
+    'TTL': 600,
+    'FILTERED_TTL': 60,
+    'PRICE_BUCKETS': [0, 50, 100, 200, 500, 1000, 5000],  # 单位：元，区间左闭右开，最后一个区间不设上限
+}
+
+VERSION_KEY = 'facets:version'
+
+
+def get_facets_setting(key):
+    return getattr(settings, 'FACETS', {}).get(key, DEFAULTS[key])
+
+
+def _cache():
+    return caches[get_facets_setting('CACHE_ALIAS')]
+
+
+def invalidate_facets():
+    _cache().set(VERSION_KEY, time.time_ns(), None)
+
+
+def _version():
+    version = _cache().get(VERSION_KEY)
+    if version is None:
+        version = time.time_ns()
+        _cache().add(VERSION_KEY, version, None)
+    return version
+
+
+def price_buckets():
+    """[(标签, 下界, 上界或 None), ...]"""
+    edges = get_facets_setting('PRICE_BUCKETS')
+    buckets = [(f'{low}-{high}', low, high) for low, high in zip(edges, edges[1:])]
+    buckets.append((f'{edges[-1]}+', edges[-1], None))
+    return buckets
+
+
+def _price_bucket_expression():
+    whens = []
+    for label, low, high in price_buckets():
+        condition = Q(price_cents__gte=low * 100)
+        if high is not None:
+            condition &= Q(price_cents__lt=high * 100)
+        whens.append(When(condition, then=Value(label)))
+    return Case(*whens, default=Value('other'), output_field=CharField())
+
+
+def combine_filters(filters, exclude=()):
+    """合并 {参数名: Q} 形式的过滤条件，exclude 中的参数不参与"""
+    combined = Q()
+    for name, condition in filters.items():
+        if name not in exclude:
+            combined &= condition
+    return combined
+
+
+def _counts(condition, field, expression=None):
+    queryset = Goods.objects.filter(condition, is_sold=False)
+    if expression is not None:
+        queryset = queryset.annotate(**{field: expression})
+    rows = queryset.values(field).annotate(n=Count('id')).order_by()
+    return {row[field]: row['n'] for row in rows}
+
+
+def compute_facets(filters):
+    """
+    filters: {参数名: Q}（见 api.filters.parse_goods_filters）
+    返回 {'category': [...], 'condition': [...], 'price': [...], 'total': 数量}
+    """
+    category_counts = _counts(combine_filters(filters, exclude=('category',)), 'category')
+    condition_counts = _counts(combine_filters(filters, exclude=('condition',)), 'condition')
+    price_counts = _counts(combine_filters(filters, exclude=('min_price', 'max_price')), 'price_bucket',
+                           _price_bucket_expression())
+    if filters:
+        total = Goods.objects.filter(combine_filters(filters), is_sold=False).count()
+    else:
+        total = sum(category_counts.values())
+    return {
+        'category': [
+            {'value': value, 'label': label, 'count': category_counts.get(value, 0)}
+            for value, label in Goods.CATEGORY_CHOICES
+        ],
+        'condition': [
+            {'value': value, 'label': label, 'count': condition_counts.get(value, 0)}
+            for value, label in Goods.CONDITION_CHOICES
+        ],
+        'price': [
+            {'value': label, 'min': low, 'max': high, 'count': price_counts.get(label, 0)}
+            for label, low, high in price_buckets()
+        ],
+        'total': total,
+    }
+
+
+def get_facets(params, filters):
+    """带缓存的分面统计；params 为规范化后的过滤参数（api.filters.facet_params，用于生成缓存键）"""
+    normalized = '&'.join(f'{name}={params.get(name)}' for name in sorted(filters))
+    digest = hashlib.md5(normalized.encode()).hexdigest() if normalized else 'all'
+    cache_key = f'facets:{_version()}:{digest}'
+    facets = _cache().get(cache_key)
+    if facets is None:
+        facets = compute_facets(filters)
+        _cache().set(cache_key, facets, get_facets_setting('FILTERED_TTL' if filters else 'TTL'))
+    return facets
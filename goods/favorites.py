@@ -0,0 +1,70 @@
+# goods/favorites.py
+"""
+用户收藏列表
+
+- 每个用户最近收藏的 MAX_IDS 个商品 id（按收藏时间倒序）和收藏总数缓存在 Django cache 中，TTL 秒
+- 收藏/取消收藏、写合并缓冲区刷新后让对应用户的缓存失效
+- 列表接口按页从 id 列表中切片，再一条查询取出这一页的商品；
+  超出 MAX_IDS 的更早收藏从缓存的最后一条 (created_at, id) 开始按键集查询
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Q
+
+from goods.models import Favorite
+
+DEFAULTS = {
+    'CACHE_ALIAS': 'default',
+    'TTL': 600,
+    'MAX_IDS': 5000,  # 缓存的收藏 id 数上限（更早的收藏在翻页时直接查询）
+}
+
+
+def get_favorites_setting(key):
+    return getattr(settings, 'FAVORITES', {}).get(key, DEFAULTS[key])
+
+
+def _cache():
+    return caches[get_favorites_setting('CACHE_ALIAS')]
+
+
+def _key(user_id):
+    return f'favorites:user:{user_id}:v2'
+
+
+def _alive_favorites(user_id):
+    return Favorite.objects.filter(user_id=user_id, goods__deleted_at__isnull=True).order_by('-created_at', '-id')
+
+
+def _cached_favorites(user_id):
+    """{'ids': 最近收藏的商品 id, 'count': 收藏总数, 'cursor': 超出上限时最后一条的 (created_at, id)，否则 None}"""
+    data = _cache().get(_key(user_id))
+    if data is None:
+        max_ids = get_favorites_setting('MAX_IDS')
+        rows = list(_alive_favorites(user_id).values_list('goods_id', 'created_at', 'id')[:max_ids])
+        truncated = len(rows) == max_ids
+        data = {
+            'ids': [goods_id for goods_id, _, _ in rows],
+            'count': _alive_favorites(user_id).count() if truncated else len(rows),
+            'cursor': rows[-1][1:] if truncated else None,
+        }
+        _cache().set(_key(user_id), data, get_favorites_setting('TTL'))
+    return data
+
+
+def favorite_page(user_id, offset, limit):
+    """返回 (这一页收藏的商品 id, 收藏总数)"""
+    data = _cached_favorites(user_id)
+    ids = data['ids'][offset:offset + limit]
+    if len(ids) < limit and data['cursor'] is not None and offset + len(ids) < data['count']:
+        created_at, favorite_id = data['cursor']
+        older = _alive_favorites(user_id).filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=favorite_id)
+        )
+        start = max(offset - len(data['ids']), 0)
+        ids += older.values_list('goods_id', flat=True)[start:start + limit - len(ids)]
+    return ids, data['count']
+
+
+def invalidate_favorites(*user_ids):
+    _cache().delete_many([_key(user_id) for user_id in user_ids])
@@ -0,0 +1,149 @@
+# goods/feed.py
+"""
+个性化推荐流
+
+1. 用户分类亲和度：点赞、收藏、购买（Goods.buyer）按分类计数加权，缓存 AFFINITY_TTL 秒
+2. 用户分群：亲和度最高的前几个分类（有序），没有互动的用户和未登录用户属于空分群
+3. 候选列表：每个分类最新的 CANDIDATES_PER_CATEGORY 件在售商品；每个分群按
+       分数 = 分类权重 × 0.5 ^ (发布时长 / 半衰期)
+   合并排序后取前 FEED_SIZE 个 id，缓存在 Django cache 中
+
+分群数量有限（分类数的排列），候选列表可以由后台任务定期预热；
+请求时只需读缓存 + 按 id 取一页商品，与普通商品列表的开销相当。
+"""
+import itertools
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count
+
+from goods.models import Goods, Like, Favorite
+
+DEFAULTS = {
+    'CACHE_ALIAS': 'default',
+    'AFFINITY_WEIGHTS': {'like': 1.0, 'favorite': 2.0, 'purchase': 4.0},
+    'SEGMENT_WEIGHTS': [1.0, 0.6],  # 分群内各分类按名次的权重，长度即分群包含的分类数
+    'EXPLORE_WEIGHT': 0.2,  # 分群以外分类的权重
+    'HALF_LIFE_HOURS': 72,
+    'CANDIDATES_PER_CATEGORY': 200,
+    'FEED_SIZE': 300,
+    'AFFINITY_TTL': 600,
+    'CANDIDATE_TTL': 300,
+    'REFRESH_INTERVAL': 120,  # 后台预热间隔（秒），应小于 CANDIDATE_TTL
+}
+
+
+def get_feed_setting(key):
+    return getattr(settings, 'FEED', {}).get(key, DEFAULTS[key])
+
+
+def _cache():
+    return caches[get_feed_setting('CACHE_ALIAS')]
+
+
+def _categories():
+    return [value for value, _ in Goods.CATEGORY_CHOICES]
+
+
+def user_affinity(user_id):
+    """{分类: 亲和度}，缓存 AFFINITY_TTL 秒"""
+    cache_key = f'feed:affinity:{user_id}'
+    affinity = _cache().get(cache_key)
+    if affinity is not None:
+        return affinity
+
+    weights = get_feed_setting('AFFINITY_WEIGHTS')
+    affinity = {}
+    sources = (
+        (Like.objects.filter(user_id=user_id), 'goods__category', weights['like']),
+        (Favorite.objects.filter(user_id=user_id), 'goods__category', weights['favorite']),
+        (Goods.objects.filter(buyer_id=user_id), 'category', weights['purchase']),
+    )
+    for queryset, field, weight in sources:
+        for row in queryset.values(field).annotate(n=Count('id')).order_by():
+            affinity[row[field]] = affinity.get(row[field], 0) + weight * row['n']
+    _cache().set(cache_key, affinity, get_feed_setting('AFFINITY_TTL'))
+    return affinity
+
+
+def invalidate_affinity(user_id):
+    _cache().delete(f'feed:affinity:{user_id}')
+
+
+def user_segment(user):
+    """用户所属分群：亲和度最高的前几个分类组成的元组"""
+    if user is None or not user.is_authenticated:
+        return ()
+    affinity = user_affinity(user.pk)
+    ranked = sorted(affinity.items(), key=lambda item: (-item[1], item[0]))
+    return tuple(category for category, score in ranked[:len(get_feed_setting('SEGMENT_WEIGHTS'))] if score > 0)
+
+
+def _load_category(category):
+    rows = (
+        Goods.objects.filter(is_sold=False, category=category)
+        .order_by('-created_at')
+        .values_list('id', 'created_at')[:get_feed_setting('CANDIDATES_PER_CATEGORY')]
+    )
+    return [(goods_id, created_at.timestamp()) for goods_id, created_at in rows]
+
+
+def category_candidates(refresh=False):
+    """{分类: [(商品id, 发布时间戳), ...]}，一次 get_many 读取全部分类，缺失的从数据库补齐"""
+    cache = _cache()
+    keys = {category: f'feed:category:{category}' for category in _categories()}
+    cached = {} if refresh else cache.get_many(keys.values())
+    result = {}
+    missing = {}
+    for category, key in keys.items():
+        if key in cached:
+            result[category] = cached[key]
+        else:
+            result[category] = missing[key] = _load_category(category)
+    if missing:
+        cache.set_many(missing, get_feed_setting('CANDIDATE_TTL'))
+    return result
+
+
+def _rank_segment(segment, candidates, now):
+    weights = dict(zip(segment, get_feed_setting('SEGMENT_WEIGHTS')))
+    explore = get_feed_setting('EXPLORE_WEIGHT') if segment else 1.0
+    half_life = get_feed_setting('HALF_LIFE_HOURS') * 3600
+    scored = []
+    for category, items in candidates.items():
+        weight = weights.get(category, explore)
+        for goods_id, created_at in items:
+            scored.append((weight * 0.5 ** (max(now - created_at, 0) / half_life), goods_id))
+    scored.sort(reverse=True)
+    return [goods_id for _, goods_id in scored[:get_feed_setting('FEED_SIZE')]]
+
+
+def _segment_key(segment):
+    return 'feed:segment:' + (','.join(segment) or '_')
+
+
+def segment_candidates(segment):
+    """分群的候选商品 id 列表（已排序）"""
+    cache = _cache()
+    key = _segment_key(segment)
+    ids = cache.get(key)
+    if ids is None:
+        ids = _rank_segment(segment, category_candidates(), time.time())
+        cache.set(key, ids, get_feed_setting('CANDIDATE_TTL'))
+    return ids
+
+
+def warm_candidates():
+    """预热所有分类和分群的候选列表，返回分群数"""
+    candidates = category_candidates(refresh=True)
+    now = time.time()
+    categories = _categories()
+    segments = [()]
+    for size in range(1, len(get_feed_setting('SEGMENT_WEIGHTS')) + 1):
+        segments.extend(itertools.permutations(categories, size))
+    _cache().set_many(
+        {_segment_key(segment): _rank_segment(segment, candidates, now) for segment in segments},
+        get_feed_setting('CANDIDATE_TTL'),
+    )
+    return len(segments)
@@ -0,0 +1,211 @@
+# goods/geo.py
+"""
+商品位置：地区代码 + 坐标 + geohash
+
+- Goods.location 是自由文本，按内置地名表（城市名/拼音 -> 行政区划代码、中心坐标）归一化为 region_code
+- 用户可以直接提交坐标；没有坐标时使用城市中心坐标
+- 坐标编码为 geohash 并建索引。附近搜索把查询圆的外接矩形覆盖为若干 geohash 格子，
+  每个格子是一个索引区间 [前缀, 前缀 + '{')，再加经纬度矩形条件，最后按球面距离精确过滤
+  （列表在 Python 中用 within_radius 过滤并计算距离，分面统计等聚合查询用 radius_condition 在 SQL 中过滤）
+
+本模块不依赖模型，数据迁移中也可以直接使用。
+"""
+import math
+from collections import namedtuple
+
+from django.db.models import Q
+from django.db.models.functions import ASin, Cos, Power, Radians, Sin, Sqrt
+from django.db.models.lookups import LessThanOrEqual
+
+Place = namedtuple('Place', ['code', 'name', 'latitude', 'longitude'])
+
+# 行政区划代码（GB/T 2260）、名称、中心坐标、别名
+GAZETTEER = [
+    ('110000', '北京', 39.9042, 116.4074, ['beijing']),
+    ('120000', '天津', 39.3434, 117.3616, ['tianjin']),
+    ('310000', '上海', 31.2304, 121.4737, ['shanghai']),
+    ('500000', '重庆', 29.5630, 106.5516, ['chongqing']),
+    ('440100', '广州', 23.1291, 113.2644, ['guangzhou']),
+    ('440300', '深圳', 22.5431, 114.0579, ['shenzhen']),
+    ('440600', '佛山', 23.0215, 113.1214, ['foshan']),
+    ('441900', '东莞', 23.0207, 113.7518, ['dongguan']),
+    ('330100', '杭州', 30.2741, 120.1551, ['hangzhou']),
+    ('330200', '宁波', 29.8683, 121.5440, ['ningbo']),
+    ('320100', '南京', 32.0603, 118.7969, ['nanjing']),
+    ('320500', '苏州', 31.2990, 120.5853, ['suzhou']),
+    ('510100', '成都', 30.5728, 104.0668, ['chengdu']),
+    ('420100', '武汉', 30.5928, 114.3055, ['wuhan']),
+    ('610100', '西安', 34.3416, 108.9398, ["xi'an", 'xian']),
+    ('430100', '长沙', 28.2282, 112.9388, ['changsha']),
+    ('410100', '郑州', 34.7466, 113.6254, ['zhengzhou']),
+    ('370100', '济南', 36.6512, 117.1201, ['jinan']),
+    ('370200', '青岛', 36.0671, 120.3826, ['qingdao']),
+    ('340100', '合肥', 31.8206, 117.2272, ['hefei']),
+    ('350100', '福州', 26.0745, 119.2965, ['fuzhou']),
+    ('350200', '厦门', 24.4798, 118.0894, ['xiamen']),
+    ('210100', '沈阳', 41.8057, 123.4315, ['shenyang']),
+    ('210200', '大连', 38.9140, 121.6147, ['dalian']),
+    ('230100', '哈尔滨', 45.8038, 126.5350, ['harbin', 'haerbin']),
+    ('530100', '昆明', 25.0389, 102.7183, ['kunming']),
+]
+
+PLACES = {code: Place(code, name, lat, lon) for code, name, lat, lon, _ in GAZETTEER}
+_NAMES = sorted(
+    [(name, code) for code, name, _, _, _ in GAZETTEER]
+    + [(alias, code) for code, _, _, _, aliases in GAZETTEER for alias in aliases],
+    key=lambda item: -len(item[0]),
+)
+
+EARTH_RADIUS_KM = 6371.0
+GEOHASH_PRECISION = 9  # 约 5m × 5m
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+RANGE_END = '{'  # ASCII 中紧跟 'z' 之后，[前缀, 前缀 + '{') 即该前缀下的全部 geohash
+
+
+def resolve_location(text):
+    """自由文本 -> Place（找不到时返回 None），如 '北京市海淀区' -> 北京"""
+    text = (text or '').strip().lower()
+    if not text:
+        return None
+    for name, code in _NAMES:
+        if name in text:
+            return PLACES[code]
+    return None
+
+
+def resolve_region(value):
+    """查询参数中的地区：行政区划代码或城市名"""
+    if value in PLACES:
+        return PLACES[value]
+    return resolve_location(value)
+
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True  # 偶数位编码经度
+    while len(chars) < precision:
+        target, bounds = (longitude, lon_range) if even else (latitude, lat_range)
+        middle = (bounds[0] + bounds[1]) / 2
+        if target >= middle:
+            value = (value << 1) | 1
+            bounds[0] = middle
+        else:
+            value <<= 1
+            bounds[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits = 0
+            value = 0
+    return ''.join(chars)
+
+
+def cell_size(precision):
+    """geohash 格子的 (纬度跨度, 经度跨度)，单位：度"""
+    total_bits = 5 * precision
+    lon_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lon_bits
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """(最小纬度, 最大纬度, 最小经度, 最大经度)"""
+    lat_delta = math.degrees(radius_km / EARTH_RADIUS_KM)
+    cos_lat = max(math.cos(math.radians(latitude)), 1e-6)
+    lon_delta = min(math.degrees(radius_km / EARTH_RADIUS_KM / cos_lat), 180.0)
+    return (max(latitude - lat_delta, -90.0), min(latitude + lat_delta, 90.0),
+            longitude - lon_delta, longitude + lon_delta)
+
+
+def covering_prefixes(latitude, longitude, radius_km, max_cells=16):
+    """
+    覆盖查询圆外接矩形的 geohash 前缀集合
+    选择格子数不超过 max_cells 的最高精度，格子越小扫描的多余行越少
+    """
+    min_lat, max_lat, min_lon, max_lon = bounding_box(latitude, longitude, radius_km)
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        lat_step, lon_step = cell_size(precision)
+        rows = math.floor(max_lat / lat_step) - math.floor(min_lat / lat_step) + 1
+        cols = math.floor(max_lon / lon_step) - math.floor(min_lon / lon_step) + 1
+        if rows * cols <= max_cells:
+            break
+    prefixes = set()
+    lat = min_lat
+    while True:
+        lon = min_lon
+        while True:
+            prefixes.add(encode_geohash(lat, _wrap_longitude(lon), precision))
+            if lon >= max_lon:
+                break
+            lon = min(lon + lon_step, max_lon)
+        if lat >= max_lat:
+            break
+        lat = min(lat + lat_step, max_lat)
+    return sorted(prefixes)
+
+
+def near_filter(latitude, longitude, radius_km):
+    """附近搜索的查询条件：geohash 索引区间（OR）+ 经纬度矩形；结果需再用 within_radius 精确过滤"""
+    ranges = Q()
+    for prefix in covering_prefixes(latitude, longitude, radius_km):
+        ranges |= Q(geohash__gte=prefix, geohash__lt=prefix + RANGE_END)
+    min_lat, max_lat, min_lon, max_lon = bounding_box(latitude, longitude, radius_km)
+    condition = ranges & Q(latitude__gte=min_lat, latitude__lte=max_lat)
+    if min_lon >= -180.0 and max_lon <= 180.0:
+        condition &= Q(longitude__gte=min_lon, longitude__lte=max_lon)
+    return condition
+
+
+def radius_condition(latitude, longitude, radius_km):
+    """球面距离不超过 radius_km 的 SQL 条件（与 haversine_km 相同的公式），配合 near_filter 使用"""
+    lat = math.radians(latitude)
+    a = (Power(Sin((Radians('latitude') - lat) / 2), 2)
+         + math.cos(lat) * Cos(Radians('latitude')) * Power(Sin((Radians('longitude') - math.radians(longitude)) / 2), 2))
+    return Q(LessThanOrEqual(2 * EARTH_RADIUS_KM * ASin(Sqrt(a)), radius_km))
+
+
+def within_radius(goods_list, latitude, longitude, radius_km):
+    """[(商品, 距离km), ...]，只保留半径内的商品，保持输入顺序"""
+    result = []
+    for goods in goods_list:
+        if goods.latitude is None or goods.longitude is None:
+            continue
+        distance = haversine_km(latitude, longitude, goods.latitude, goods.longitude)
+        if distance <= radius_km:
+            result.append((goods, distance))
+    return result
+
+
+def _wrap_longitude(longitude):
+    return (longitude + 180.0) % 360.0 - 180.0
+
+
+def normalize(location, latitude=None, longitude=None):
+    """
+    返回 (region_code, latitude, longitude, geohash)
+    没有给出坐标时使用地名表中的城市中心坐标；都没有时坐标和 geohash 为空
+    """
+    place = resolve_location(location)
+    if (latitude is None or longitude is None) and place is not None:
+        latitude, longitude = place.latitude, place.longitude
+    geohash = encode_geohash(latitude, longitude) if latitude is not None and longitude is not None else ''
+    return (place.code if place else ''), latitude, longitude, geohash
+
+
+def apply_location(goods):
+    """按 location / 坐标填充商品的 region_code、坐标和 geohash（保存前调用）"""
+    goods.region_code, goods.latitude, goods.longitude, goods.geohash = normalize(
+        goods.location, goods.latitude, goods.longitude,
+    )
+    return goods
@@ -0,0 +1,46 @@
+# goods/management/commands/archive_data.py
+"""
+归档已售商品和旧留言（移到 ArchivedGoods / ArchivedMessage）
+
+    python manage.py archive_data                        # 按 settings.ARCHIVE 的阈值归档
+    python manage.py archive_data --goods-days 30 --message-days 90 --batch-size 500
+    python manage.py archive_data --dry-run              # 只统计待归档数量
+    python manage.py archive_data --schedule             # 交给后台任务队列定期执行
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from goods import archive
+from goods.tasks import schedule_archive
+
+
+class Command(BaseCommand):
+    help = '把已售出较久的商品和旧留言移到归档表'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--goods-days', type=int, default=None, help='售出超过多少天的商品归档')
+        parser.add_argument('--message-days', type=int, default=None, help='超过多少天的留言归档')
+        parser.add_argument('--batch-size', type=int, default=None)
+        parser.add_argument('--limit', type=int, default=None, help='本次最多归档的商品数/留言数')
+        parser.add_argument('--dry-run', action='store_true', help='只统计不归档')
+        parser.add_argument('--schedule', action='store_true', help='在任务队列中启动定期归档')
+
+    def handle(self, *args, **options):
+        if options['schedule']:
+            schedule_archive()
+            self.stdout.write(self.style.SUCCESS('已加入任务队列（需运行 run_task_workers）'))
+            return
+
+        if options['dry_run']:
+            goods = archive.sold_goods_queryset(options['goods_days']).count()
+            messages = archive.old_messages_queryset(options['message_days']).count()
+            self.stdout.write(f'待归档：商品 {goods} 件，留言 {messages} 条（不含随商品一起归档的留言）')
+            return
+
+        started = time.perf_counter()
+        goods = archive.archive_sold_goods(options['goods_days'], options['batch_size'], options['limit'])
+        messages = archive.archive_old_messages(options['message_days'], options['batch_size'], options['limit'])
+        self.stdout.write(self.style.SUCCESS(
+            f'归档完成：商品 {goods} 件，留言 {messages} 条，用时 {time.perf_counter() - started:.1f}s'
+        ))
@@ -0,0 +1,294 @@
+# goods/management/commands/bench_api.py
+"""
+对本地运行中的服务做压测，输出吞吐量和 p50/p95/p99 延迟
+
+先用 seed_marketplace 生成数据，再启动服务（如 python manage.py runserver），然后：
+
+    python manage.py bench_api --scenario browse detail --concurrency 8 --duration 20
+    python manage.py bench_api --save-baseline before-index
+    python manage.py bench_api --compare before-index
+
+热门商品按与 seed_marketplace 相同的 Zipf 分布（--skew 保持一致）抽取：商品按点赞+收藏数排名，
+第 i 名被选中的概率正比于 1 / i^skew，缓存命中率和热点行竞争与生成的数据一致。
+
+注意：like_storm / messaging / purchase_contention / flood 会写入数据，purchase_contention 会把商品标记为已售。
+"""
+import abc
+import itertools
+import json
+import math
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import F
+from rest_framework.authtoken.models import Token
+
+from goods.management.commands.seed_marketplace import zipf_weights
+from goods.models import Goods
+
+BASELINE_DIR = Path(settings.BASE_DIR) / 'benchmarks' / 'baselines'
+
+
+def percentile(sorted_values, pct):
+    """最近秩法百分位"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class Scenario(abc.ABC):
+    """压测场景：每次调用 next_request 返回 (method, path, token, body)"""
+    name = ''
+    description = ''
+
+    def __init__(self, ctx, rng):
+        self.ctx = ctx
+        self.rng = rng
+
+    def token(self):
+        return self.rng.choice(self.ctx['tokens'])
+
+    def hot_goods(self):
+        # goods_ids 按热度排名，按 Zipf 权重抽取（与 seed_marketplace 生成互动时一致）
+        return self.rng.choices(self.ctx['goods_ids'], cum_weights=self.ctx['goods_cum_weights'])[0]
+
+    @abc.abstractmethod
+    def next_request(self):
+        """返回下一个请求 (method, path, token, body)"""
+
+
+class BrowseScenario(Scenario):
+    name = 'browse'
+    description = '匿名浏览商品列表'
+
+    def next_request(self):
+        return 'GET', '/api/goods/', None, None
+
+
+class DetailScenario(Scenario):
+    name = 'detail'
+    description = '登录用户查看商品详情（热门商品倾斜）'
+
+    def next_request(self):
+        return 'GET', f'/api/goods/{self.hot_goods()}/', self.token(), None
+
+
+class LikeStormScenario(Scenario):
+    name = 'like_storm'
+    description = '大量用户对少数热门商品点赞/取消点赞'
+
+    def next_request(self):
+        goods_id = self.rng.choice(self.ctx['goods_ids'][:5])
+        method = 'POST' if self.rng.random() < 0.6 else 'DELETE'
+        return method, f'/api/goods/{goods_id}/like/', self.token(), None
+
+
+class MessagingScenario(Scenario):
+    name = 'messaging'
+    description = '发送留言并查看留言列表'
+
+    def next_request(self):
+        if self.rng.random() < 0.5:
+            body = {'content': '压测留言：还在吗？'}
+            return 'POST', f'/api/goods/{self.hot_goods()}/messages/', self.token(), body
+        return 'GET', '/api/user/messages/', self.token(), None
+
+
+class PurchaseContentionScenario(Scenario):
+    name = 'purchase_contention'
+    description = '大量用户同时抢购少数商品（每件只应成功一次）'
+
+    def next_request(self):
+        goods_id = self.rng.choice(self.ctx['contention_ids'])
+        return 'POST', f'/api/goods/{goods_id}/purchase/', self.token(), None
+
+
+class FloodScenario(Scenario):
+    name = 'flood'
+    description = '单个客户端用同一个账号疯狂点赞/取消点赞（验证限流和准入控制）'
+
+    def next_request(self):
+        method = 'POST' if self.rng.random() < 0.5 else 'DELETE'
+        return method, f'/api/goods/{self.ctx["goods_ids"][0]}/like/', self.ctx['tokens'][0], None
+
+
+SCENARIOS = {cls.name: cls for cls in (
+    BrowseScenario, DetailScenario, LikeStormScenario, MessagingScenario, PurchaseContentionScenario,
+    FloodScenario,
+)}
+
+
+class Command(BaseCommand):
+    help = '对本地服务执行压测场景，输出吞吐量和延迟分位数，可保存/对比基线'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+        parser.add_argument('--scenario', nargs='+', choices=sorted(SCENARIOS), default=['browse', 'detail'])
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--duration', type=float, default=10.0, help='每个场景持续秒数')
+        parser.add_argument('--warmup', type=float, default=2.0, help='预热秒数（不计入统计）')
+        parser.add_argument('--timeout', type=float, default=10.0)
+        parser.add_argument('--prefix', default='bench_user_', help='压测用户名前缀（与 seed_marketplace 一致）')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--skew', type=float, default=1.1, help='热门商品的 Zipf 倾斜系数（与 seed_marketplace 一致）')
+        parser.add_argument('--save-baseline', metavar='NAME')
+        parser.add_argument('--compare', metavar='NAME', help='与已保存的基线对比')
+
+    def handle(self, *args, **options):
+        self.base_url = options['base_url'].rstrip('/')
+        self.timeout = options['timeout']
+        ctx = self.build_context(options['prefix'], options['skew'])
+
+        results = {}
+        for name in options['scenario']:
+            self.stdout.write(f'== {name}: {SCENARIOS[name].description}')
+            if options['warmup'] > 0:
+                self.run_scenario(SCENARIOS[name], ctx, options['concurrency'], options['warmup'], options['seed'])
+            raw = self.run_scenario(SCENARIOS[name], ctx, options['concurrency'], options['duration'], options['seed'])
+            results[name] = self.summarize(*raw)
+            self.print_summary(results[name])
+
+        if options['compare']:
+            self.compare(results, options['compare'])
+        if options['save_baseline']:
+            self.save_baseline(results, options['save_baseline'], options)
+
+    # ---------------------------------------------------------------
+    def build_context(self, prefix, skew=1.1):
+        tokens = list(Token.objects.filter(user__username__startswith=prefix).values_list('key', flat=True))
+        if not tokens:
+            raise CommandError(f'没有找到以 {prefix} 开头的压测用户，请先运行 seed_marketplace')
+        # 按热度排名（seed_marketplace 按 Zipf 权重生成点赞/收藏，计数的排名即热度排名）
+        goods_ids = list(
+            Goods.objects.filter(is_sold=False)
+            .order_by((F('likes_count') + F('favorites_count')).desc(), 'id')
+            .values_list('id', flat=True)[:10000]
+        )
+        if not goods_ids:
+            raise CommandError('没有在售商品，请先运行 seed_marketplace')
+        return {
+            'tokens': tokens,
+            'goods_ids': goods_ids,
+            'goods_cum_weights': list(itertools.accumulate(zipf_weights(len(goods_ids), skew))),
+            'contention_ids': sorted(goods_ids)[-20:],
+        }
+
+    def request(self, method, path, token, body):
+        data = json.dumps(body).encode() if body is not None else None
+        req = urllib.request.Request(self.base_url + path, data=data, method=method)
+        req.add_header('Accept', 'application/json')
+        if data is not None:
+            req.add_header('Content-Type', 'application/json')
+        if token:
+            req.add_header('Authorization', f'Token {token}')
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                resp.read()
+                return resp.status
+        except urllib.error.HTTPError as e:
+            e.read()
+            return e.code
+        except (urllib.error.URLError, TimeoutError, ConnectionError):
+            return 0
+
+    def run_scenario(self, scenario_cls, ctx, concurrency, duration, seed):
+        latencies = []
+        statuses = Counter()
+        lock = threading.Lock()
+        started = time.perf_counter()
+        deadline = started + duration
+
+        def worker(worker_id):
+            scenario = scenario_cls(ctx, random.Random(seed + worker_id))
+            local_latencies = []
+            local_statuses = Counter()
+            while time.perf_counter() < deadline:
+                method, path, token, body = scenario.next_request()
+                start = time.perf_counter()
+                code = self.request(method, path, token, body)
+                local_latencies.append(time.perf_counter() - start)
+                local_statuses[code] += 1
+            with lock:
+                latencies.extend(local_latencies)
+                statuses.update(local_statuses)
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # 用实际耗时计算吞吐，最后一批请求可能在截止时间之后才返回
+        return latencies, statuses, time.perf_counter() - started
+
+    @staticmethod
+    def summarize(latencies, statuses, elapsed):
+        values = sorted(latencies)
+        total = len(values)
+        errors = sum(count for code, count in statuses.items() if code == 0 or code >= 500)
+        return {
+            'requests': total,
+            'errors': errors,
+            'throughput_rps': round(total / elapsed, 2) if elapsed else 0,
+            'p50_ms': round(percentile(values, 50) * 1000, 2),
+            'p95_ms': round(percentile(values, 95) * 1000, 2),
+            'p99_ms': round(percentile(values, 99) * 1000, 2),
+            'max_ms': round(values[-1] * 1000, 2) if values else 0,
+            'statuses': {str(code): count for code, count in sorted(statuses.items())},
+        }
+
+    def print_summary(self, summary):
+        self.stdout.write(
+            f"  请求 {summary['requests']}  错误 {summary['errors']}  "
+            f"吞吐 {summary['throughput_rps']} req/s  "
+            f"p50 {summary['p50_ms']}ms  p95 {summary['p95_ms']}ms  p99 {summary['p99_ms']}ms  "
+            f"max {summary['max_ms']}ms  状态码 {summary['statuses']}"
+        )
+
+    def save_baseline(self, results, name, options):
+        BASELINE_DIR.mkdir(parents=True, exist_ok=True)
+        path = BASELINE_DIR / f'{name}.json'
+        payload = {
+            'created_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'concurrency': options['concurrency'],
+            'duration': options['duration'],
+            'results': results,
+        }
+        path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding='utf-8')
+        self.stdout.write(self.style.SUCCESS(f'基线已保存: {path}'))
+
+    def compare(self, results, name):
+        path = BASELINE_DIR / f'{name}.json'
+        if not path.exists():
+            raise CommandError(f'基线不存在: {path}')
+        baseline = json.loads(path.read_text(encoding='utf-8'))['results']
+
+        self.stdout.write(f'== 与基线 {name} 对比（正数表示变慢/变少）')
+        for scenario, current in results.items():
+            old = baseline.get(scenario)
+            if old is None:
+                self.stdout.write(f'  {scenario}: 基线中没有该场景')
+                continue
+            parts = []
+            for key in ('p50_ms', 'p95_ms', 'p99_ms'):
+                parts.append(f'{key} {old[key]} -> {current[key]} ({_delta(old[key], current[key])})')
+            parts.append(
+                f"吞吐 {old['throughput_rps']} -> {current['throughput_rps']} "
+                f"({_delta(old['throughput_rps'], current['throughput_rps'], invert=True)})"
+            )
+            self.stdout.write(f'  {scenario}: ' + '  '.join(parts))
+
+
+def _delta(old, new, invert=False):
+    """相对变化百分比；invert=True 时数值下降记为正数（用于吞吐量）"""
+    if not old:
+        return 'n/a'
+    change = (new - old) / old * 100
+    return f'{-change if invert else change:+.1f}%'
@@ -0,0 +1,95 @@
+# goods/management/commands/bench_price.py
+"""
+对比浮点价格列和整数（分）价格列：区间筛选、排序分页、求和的耗时，以及求和误差
+
+    python manage.py bench_price --rows 1000000 --repeat 20
+
+在当前数据库连接上创建两张临时表（同一批随机价格，各自建索引），不影响业务表，连接关闭后自动删除。
+"""
+import random
+import statistics
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from goods.money import from_cents
+
+FLOAT_TABLE = 'bench_price_float'
+INT_TABLE = 'bench_price_int'
+
+
+class Command(BaseCommand):
+    help = '对比 REAL 与 INTEGER（分）价格列的查询性能和求和精度'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000000)
+        parser.add_argument('--repeat', type=int, default=20, help='每个查询执行次数')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        cents = [round(rng.lognormvariate(4, 1.2) * 100) for _ in range(options['rows'])]
+
+        started = time.perf_counter()
+        with connection.cursor() as cursor:
+            self.create_tables(cursor, cents)
+        self.stdout.write(f"已生成 {options['rows']} 行，用时 {time.perf_counter() - started:.1f}s")
+
+        low, high = 100, 200  # 元
+        queries = [
+            ('区间筛选 COUNT', f'SELECT COUNT(*) FROM {FLOAT_TABLE} WHERE price >= %s AND price < %s', [low, high],
+             f'SELECT COUNT(*) FROM {INT_TABLE} WHERE price_cents >= %s AND price_cents < %s',
+             [low * 100, high * 100]),
+            ('按价格排序分页', f'SELECT id FROM {FLOAT_TABLE} ORDER BY price LIMIT 20 OFFSET 10000', [],
+             f'SELECT id FROM {INT_TABLE} ORDER BY price_cents LIMIT 20 OFFSET 10000', []),
+            ('全表 SUM', f'SELECT SUM(price) FROM {FLOAT_TABLE}', [],
+             f'SELECT SUM(price_cents) FROM {INT_TABLE}', []),
+        ]
+        self.stdout.write(f"\n{'查询':<16}{'REAL p50(ms)':>14}{'INTEGER p50(ms)':>18}{'结果一致':>10}")
+        with connection.cursor() as cursor:
+            for label, float_sql, float_params, int_sql, int_params in queries:
+                float_ms, float_result = self.time_query(cursor, float_sql, float_params, options['repeat'])
+                int_ms, int_result = self.time_query(cursor, int_sql, int_params, options['repeat'])
+                # SUM 的差异见下方求和精度
+                same = '-' if label == '全表 SUM' else ('是' if float_result == int_result else '否')
+                self.stdout.write(f'{label:<16}{float_ms:>14.2f}{int_ms:>18.2f}{same:>10}')
+
+            cursor.execute(f'SELECT SUM(price) FROM {FLOAT_TABLE}')
+            float_sum = cursor.fetchone()[0]
+            cursor.execute(f'SELECT SUM(price_cents) FROM {INT_TABLE}')
+            int_sum = from_cents(cursor.fetchone()[0])
+            cursor.execute(f'DROP TABLE {FLOAT_TABLE}')
+            cursor.execute(f'DROP TABLE {INT_TABLE}')
+
+        exact = from_cents(sum(cents))
+        self.stdout.write('\n求和精度：')
+        self.stdout.write(f'  精确值           {exact}')
+        self.stdout.write(f'  INTEGER（分）    {int_sum}  误差 {int_sum - exact}')
+        self.stdout.write(f'  REAL             {float_sum!r}  误差 {Decimal(repr(float_sum)) - exact}')
+
+    @staticmethod
+    def create_tables(cursor, cents, chunk=50000):
+        cursor.execute(f'DROP TABLE IF EXISTS {FLOAT_TABLE}')
+        cursor.execute(f'DROP TABLE IF EXISTS {INT_TABLE}')
+        cursor.execute(f'CREATE TEMPORARY TABLE {FLOAT_TABLE} (id INTEGER PRIMARY KEY, price REAL NOT NULL)')
+        cursor.execute(f'CREATE TEMPORARY TABLE {INT_TABLE} (id INTEGER PRIMARY KEY, price_cents BIGINT NOT NULL)')
+        for start in range(0, len(cents), chunk):
+            batch = list(enumerate(cents[start:start + chunk], start=start + 1))
+            cursor.executemany(f'INSERT INTO {FLOAT_TABLE} (id, price) VALUES (%s, %s)',
+                               [(row_id, value / 100) for row_id, value in batch])
+            cursor.executemany(f'INSERT INTO {INT_TABLE} (id, price_cents) VALUES (%s, %s)', batch)
+        cursor.execute(f'CREATE INDEX {FLOAT_TABLE}_idx ON {FLOAT_TABLE} (price)')
+        cursor.execute(f'CREATE INDEX {INT_TABLE}_idx ON {INT_TABLE} (price_cents)')
+
+    @staticmethod
+    def time_query(cursor, sql, params, repeat):
+        timings = []
+        result = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            cursor.execute(sql, params)
+            result = cursor.fetchall()
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings), result
@@ -0,0 +1,45 @@
+# goods/management/commands/export_data.py
+"""
+流式导出数据到文件或标准输出
+
+    python manage.py export_data goods --format csv --output goods.csv
+    python manage.py export_data purchases --format jsonl
+    python manage.py export_data messages --user 12 --output messages-12.jsonl --format jsonl
+"""
+import sys
+
+from django.core.management.base import BaseCommand
+
+from api.exports import DEFAULT_CHUNK_SIZE, EXPORTS, FORMATS, stream_export
+
+
+class Command(BaseCommand):
+    help = '流式导出商品、已完成订单或留言记录（CSV/JSONL，内存占用恒定）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('name', choices=sorted(EXPORTS))
+        parser.add_argument('--format', choices=FORMATS, default='csv')
+        parser.add_argument('--output', help='输出文件路径，默认标准输出')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument('--seller', type=int, help='按卖家id过滤（goods/purchases）')
+        parser.add_argument('--buyer', type=int, help='按买家id过滤（purchases）')
+        parser.add_argument('--user', type=int, help='按发送或接收用户id过滤（messages）')
+        parser.add_argument('--goods', type=int, help='按商品id过滤（messages）')
+        parser.add_argument('--category', help='按分类过滤（goods）')
+
+    def handle(self, *args, **options):
+        params = {key: options[key] for key in ('seller', 'buyer', 'user', 'goods', 'category') if options[key]}
+        chunks = stream_export(options['name'], options['format'], params, options['chunk_size'])
+
+        if options['output']:
+            rows = 0
+            with open(options['output'], 'w', encoding='utf-8', newline='') as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                    rows += 1
+            if options['format'] == 'csv':
+                rows -= 1  # 表头
+            self.stderr.write(self.style.SUCCESS(f'已导出 {rows} 行到 {options["output"]}'))
+        else:
+            for chunk in chunks:
+                sys.stdout.write(chunk)
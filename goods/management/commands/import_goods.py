@@ -0,0 +1,210 @@
+# goods/management/commands/import_goods.py
+"""
+批量导入商品（CSV / JSONL）
+
+    python manage.py import_goods goods.csv --batch-size 5000
+    python manage.py import_goods goods.jsonl --format jsonl --image-root /data/images
+
+字段：name, price（元）或 price_cents（分）, description, category, condition, location, contact, seller（用户名）, image（可选图片路径）
+文件逐行流式读取，每批一次 bulk_create 并包在一个事务里；卖家用户名按批查询并缓存在内存中。
+--copy-images 复制到存储中的图片在该批写入失败（事务回滚）时删除，不留下孤立文件。
+"""
+import csv
+import io
+import json
+import os
+import time
+from datetime import datetime
+
+from django.contrib.auth.models import User
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from goods.facets import invalidate_facets
+from goods.geo import apply_location
+from goods.models import Goods
+from goods.money import to_cents
+
+CATEGORIES = {c for c, _ in Goods.CATEGORY_CHOICES}
+CONDITIONS = {c for c, _ in Goods.CONDITION_CHOICES}
+
+
+class RowError(Exception):
+    """单行数据无效"""
+
+
+class Command(BaseCommand):
+    help = '从 CSV/JSONL 批量导入商品（bulk_create 分批事务写入）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='导入文件路径，- 表示标准输入')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help='默认按扩展名判断')
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--default-seller', help='行内没有 seller 时使用的用户名')
+        parser.add_argument('--image-root', help='相对图片路径的根目录（默认 MEDIA_ROOT）')
+        parser.add_argument('--copy-images', action='store_true',
+                            help='把 MEDIA_ROOT 之外的图片复制到存储中（否则跳过这些图片）')
+        parser.add_argument('--dry-run', action='store_true', help='只校验不写入')
+
+    def handle(self, *args, **options):
+        fmt = options['format'] or ('jsonl' if options['path'].endswith(('.jsonl', '.ndjson')) else 'csv')
+        self.batch_size = options['batch_size']
+        self.default_seller = options['default_seller']
+        self.image_root = options['image_root']
+        self.copy_images = options['copy_images']
+        self.dry_run = options['dry_run']
+        self.seller_cache = {}  # 用户名 -> 用户id（None 表示不存在）
+
+        self.imported = 0
+        self.skipped = 0
+        self.started = time.perf_counter()
+
+        with self.open_source(options['path']) as source:
+            rows = self.read_csv(source) if fmt == 'csv' else self.read_jsonl(source)
+            batch = []
+            for line_no, row in rows:
+                batch.append((line_no, row))
+                if len(batch) >= self.batch_size:
+                    self.flush(batch)
+                    batch = []
+            if batch:
+                self.flush(batch)
+        if self.imported and not self.dry_run:
+            invalidate_facets()  # bulk_create 不触发信号
+
+        elapsed = time.perf_counter() - self.started
+        rate = self.imported / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'导入完成：{self.imported} 条，跳过 {self.skipped} 条，用时 {elapsed:.1f}s，{rate:.0f} 行/秒'
+            + ('（dry-run，未写入）' if self.dry_run else '')
+        ))
+
+    # ---------------------------------------------------------------
+    def open_source(self, path):
+        if path == '-':
+            return io.TextIOWrapper(os.fdopen(os.dup(0), 'rb'), encoding='utf-8-sig')
+        if not os.path.exists(path):
+            raise CommandError(f'文件不存在: {path}')
+        return open(path, encoding='utf-8-sig', newline='')
+
+    @staticmethod
+    def read_csv(source):
+        for line_no, row in enumerate(csv.DictReader(source), start=2):
+            yield line_no, row
+
+    def read_jsonl(self, source):
+        for line_no, line in enumerate(source, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                self.skip(line_no, f'JSON 解析失败: {e}')
+                continue
+            if not isinstance(row, dict):
+                self.skip(line_no, f'每行必须是 JSON 对象，实际为 {type(row).__name__}')
+                continue
+            yield line_no, row
+
+    def skip(self, line_no, reason):
+        self.skipped += 1
+        self.stderr.write(f'第 {line_no} 行已跳过：{reason}')
+
+    def resolve_sellers(self, usernames):
+        """一次查询补齐缓存中没有的卖家"""
+        missing = {name for name in usernames if name and name not in self.seller_cache}
+        if not missing:
+            return
+        found = dict(User.objects.filter(username__in=missing).values_list('username', 'id'))
+        for name in missing:
+            self.seller_cache[name] = found.get(name)
+
+    def resolve_image(self, path):
+        """返回存储中的图片名；MEDIA_ROOT 内的文件直接引用，其他文件按需复制"""
+        if not path:
+            return None
+        root = self.image_root or default_storage.location
+        full_path = path if os.path.isabs(path) else os.path.join(root, path)
+        if not os.path.isfile(full_path):
+            raise RowError(f'图片不存在: {full_path}')
+
+        media_root = os.path.abspath(default_storage.location)
+        full_path = os.path.abspath(full_path)
+        if full_path.startswith(media_root + os.sep):
+            return os.path.relpath(full_path, media_root).replace(os.sep, '/')
+        if not self.copy_images:
+            raise RowError(f'图片不在 MEDIA_ROOT 内（可使用 --copy-images）: {full_path}')
+        if self.dry_run:
+            return os.path.basename(full_path)
+
+        upload_to = datetime.now().strftime(Goods._meta.get_field('image').upload_to)
+        with open(full_path, 'rb') as f:
+            name = default_storage.save(upload_to + os.path.basename(full_path), File(f))
+        self.copied.append(name)
+        return name
+
+    def build(self, row):
+        name = (row.get('name') or '').strip()
+        if not name:
+            raise RowError('缺少 name')
+        try:
+            if row.get('price_cents') not in (None, ''):
+                price_cents = int(row['price_cents'])
+            else:
+                price_cents = to_cents(row.get('price'))
+        except (TypeError, ValueError):
+            raise RowError(f'价格无效: {row.get("price", row.get("price_cents"))!r}')
+        if price_cents < 0:
+            raise RowError('价格不能为负数')
+
+        category = row.get('category') or 'other'
+        condition = row.get('condition') or 'good'
+        if category not in CATEGORIES:
+            raise RowError(f'分类无效: {category}')
+        if condition not in CONDITIONS:
+            raise RowError(f'商品状态无效: {condition}')
+
+        username = row.get('seller') or self.default_seller
+        seller_id = self.seller_cache.get(username) if username else None
+        if username and seller_id is None:
+            raise RowError(f'卖家不存在: {username}')
+
+        return apply_location(Goods(
+            name=name[:100],
+            price_cents=price_cents,
+            description=row.get('description') or '',
+            category=category,
+            condition=condition,
+            location=(row.get('location') or '')[:100],
+            contact=(row.get('contact') or '未提供')[:50],
+            image=self.resolve_image(row.get('image')),
+            seller_id=seller_id,
+        ))  # bulk_create 不触发 pre_save，这里直接归一化位置
+
+    def flush(self, batch):
+        self.resolve_sellers({row.get('seller') or self.default_seller for _, row in batch})
+
+        objects = []
+        self.copied = []  # 本批复制到存储中的图片
+        for line_no, row in batch:
+            try:
+                objects.append(self.build(row))
+            except RowError as e:
+                self.skip(line_no, str(e))
+
+        if objects and not self.dry_run:
+            try:
+                with transaction.atomic():
+                    Goods.objects.bulk_create(objects, batch_size=self.batch_size)
+            except BaseException:
+                # 事务已回滚：删除本批复制的图片，避免留下没有商品引用的文件
+                for name in self.copied:
+                    default_storage.delete(name)
+                raise
+        self.imported += len(objects)
+
+        elapsed = time.perf_counter() - self.started
+        self.stdout.write(f'已导入 {self.imported} 条（{self.imported / elapsed:.0f} 行/秒）')
@@ -0,0 +1,163 @@
+# goods/management/commands/import_profile.py
+"""
+进程启动的导入耗时分析（python -X importtime），输出按累计耗时排序的导入树、各顶层包的耗时和进程常驻内存（RSS）
+
+    python manage.py import_profile                          # 默认 urls 阶段
+    python manage.py import_profile --stage wsgi --min-ms 5 --depth 3
+    python manage.py import_profile --env DJANGOTS_ADMIN=0   # 不加载 admin 对比
+    python manage.py import_profile --summary                # 各阶段汇总对比
+
+阶段（在新的子进程中执行，每个阶段包含前面的阶段）：
+    setup  django.setup()：加载 settings、INSTALLED_APPS 和模型
+    wsgi   加载 WSGI 应用和中间件（worker 启动后、处理请求前的状态）
+    urls   加载 URL 配置（第一个请求到来时）
+    views  导入全部视图模块（serve 预热后的状态）
+"""
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+
+STAGES = ['setup', 'wsgi', 'urls', 'views']
+
+CHILD_SCRIPT = '''
+import json, resource, sys, time
+started = time.perf_counter()
+stage = sys.argv[1]
+import django
+django.setup()
+if stage != "setup":
+    from django.core.wsgi import get_wsgi_application
+    get_wsgi_application()
+if stage in ("urls", "views"):
+    from django.urls import URLResolver, get_resolver
+    patterns = list(get_resolver().url_patterns)
+    while patterns:
+        pattern = patterns.pop()
+        if isinstance(pattern, URLResolver):
+            patterns.extend(pattern.url_patterns)
+        elif stage == "views" and hasattr(pattern.callback, "resolve"):
+            pattern.callback.resolve()
+elapsed_ms = (time.perf_counter() - started) * 1000
+try:
+    # 当前常驻内存；ru_maxrss 在 fork + exec 后保留父进程（manage.py）的峰值，不能用
+    with open("/proc/self/status") as status:
+        rss_kb = int(next(line for line in status if line.startswith("VmRSS:")).split()[1])
+except OSError:
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({"elapsed_ms": elapsed_ms, "rss_kb": rss_kb, "modules": len(sys.modules)}))
+'''
+
+
+class ImportNode:
+    __slots__ = ('name', 'self_us', 'cumulative_us', 'children')
+
+    def __init__(self, name, self_us, cumulative_us):
+        self.name = name
+        self.self_us = self_us
+        self.cumulative_us = cumulative_us
+        self.children = []
+
+
+def parse_importtime(lines):
+    """
+    解析 -X importtime 输出，返回根节点列表
+    输出是后序的：子模块先于父模块打印，名称前每层缩进两个空格
+    """
+    pending = defaultdict(list)  # 层级 -> 还没有挂到父节点上的节点
+    for line in lines:
+        if not line.startswith('import time:'):
+            continue
+        try:
+            self_us, cumulative_us, name = line[len('import time:'):].split('|')
+            node = ImportNode(name.strip(), int(self_us), int(cumulative_us))
+        except ValueError:
+            continue  # 表头
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        node.children = pending.pop(depth + 1, [])
+        pending[depth].append(node)
+    return pending[0]
+
+
+def iter_nodes(nodes):
+    for node in nodes:
+        yield node
+        yield from iter_nodes(node.children)
+
+
+def profile_stage(stage, env):
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', CHILD_SCRIPT, stage],
+        env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise CommandError(f'{stage} 阶段执行失败:\n{result.stderr[-3000:]}')
+    stats = json.loads(result.stdout.strip().splitlines()[-1])
+    return parse_importtime(result.stderr.splitlines()), stats
+
+
+class Command(BaseCommand):
+    help = '分析进程启动的导入耗时（-X importtime）和常驻内存'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--stage', choices=STAGES, default='urls')
+        parser.add_argument('--min-ms', type=float, default=2.0, help='导入树中只显示累计耗时不低于该值的模块')
+        parser.add_argument('--depth', type=int, default=4, help='导入树显示的最大层数')
+        parser.add_argument('--top', type=int, default=15, help='按自身耗时排序显示的模块数')
+        parser.add_argument('--env', action='append', default=[], metavar='KEY=VALUE', help='子进程的环境变量')
+        parser.add_argument('--summary', action='store_true', help='只输出各阶段的汇总')
+
+    def handle(self, *args, **options):
+        env = os.environ.copy()
+        for item in options['env']:
+            key, sep, value = item.partition('=')
+            if not sep:
+                raise CommandError(f'--env 格式应为 KEY=VALUE: {item}')
+            env[key] = value
+
+        if options['summary']:
+            self.stdout.write(f"{'阶段':<8}{'导入耗时(ms)':>14}{'总耗时(ms)':>12}{'模块数':>8}{'RSS(MB)':>14}")
+            for stage in STAGES:
+                roots, stats = profile_stage(stage, env)
+                total_ms = sum(node.cumulative_us for node in roots) / 1000
+                self.stdout.write(
+                    f"{stage:<8}{total_ms:>14.1f}{stats['elapsed_ms']:>12.1f}{stats['modules']:>8}"
+                    f"{stats['rss_kb'] / 1024:>14.1f}"
+                )
+            return
+
+        roots, stats = profile_stage(options['stage'], env)
+        nodes = list(iter_nodes(roots))
+        total_ms = sum(node.cumulative_us for node in roots) / 1000
+        self.stdout.write(
+            f"阶段 {options['stage']}：导入 {len(nodes)} 个模块，导入耗时 {total_ms:.1f} ms，"
+            f"django.setup() 起总耗时 {stats['elapsed_ms']:.1f} ms，RSS {stats['rss_kb'] / 1024:.1f} MB"
+        )
+
+        self.stdout.write(f"\n导入树（累计 >= {options['min_ms']} ms，最多 {options['depth']} 层）：")
+        self.stdout.write(f"{'累计(ms)':>10}{'自身(ms)':>10}  模块")
+        self.write_tree(roots, options['min_ms'] * 1000, options['depth'], 0)
+
+        packages = defaultdict(int)
+        for node in nodes:
+            packages[node.name.split('.')[0]] += node.self_us
+        self.stdout.write('\n各顶层包自身耗时合计：')
+        for package, self_us in sorted(packages.items(), key=lambda item: -item[1])[:options['top']]:
+            self.stdout.write(f'{self_us / 1000:>10.1f}  {package}')
+
+        self.stdout.write('\n自身耗时最多的模块：')
+        for node in sorted(nodes, key=lambda node: -node.self_us)[:options['top']]:
+            self.stdout.write(f'{node.self_us / 1000:>10.1f}  {node.name}')
+
+    def write_tree(self, nodes, min_us, max_depth, depth):
+        if depth >= max_depth:
+            return
+        for node in sorted(nodes, key=lambda node: -node.cumulative_us):
+            if node.cumulative_us < min_us:
+                continue
+            indent = '  ' * depth
+            self.stdout.write(f'{node.cumulative_us / 1000:>10.1f}{node.self_us / 1000:>10.1f}  {indent}{node.name}')
+            self.write_tree(node.children, min_us, max_depth, depth + 1)
@@ -0,0 +1,106 @@
+# goods/management/commands/memory_profile.py
+"""
+测量各接口处理一个请求时的内存开销（在当前进程内用测试客户端请求，不需要启动服务）
+
+    python manage.py memory_profile
+    python manage.py memory_profile /api/goods/ /api/user/messages/ --user alice --repeat 3
+    python manage.py memory_profile /api/goods/ --top 10      # 同时输出请求后仍被引用的内存最多的代码行
+
+每个接口：gc 后重置 tracemalloc 峰值，发起请求并读完响应体（包括流式响应），记录
+- 分配峰值：请求期间 Python 分配的内存峰值（tracemalloc），反映单个请求的内存开销
+- RSS 增长：请求前后进程常驻内存的变化；分配器会保留释放的内存，峰值一旦撑大通常不会还给操作系统
+- 响应大小、耗时（开启 tracemalloc 后耗时明显变长，只作相对比较）
+"""
+import gc
+import time
+import tracemalloc
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.test import Client
+from rest_framework.authtoken.models import Token
+
+from api.memory import current_rss
+from goods.models import Message
+
+DEFAULT_PATHS = ['/api/goods/', '/api/user/messages/', '/api/feed/', '/api/user/favorites/', '/api/goods/facets/']
+
+MB = 1024 * 1024
+
+
+class Command(BaseCommand):
+    help = '测量各接口处理请求时的内存峰值（tracemalloc）和 RSS 增长'
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*', default=DEFAULT_PATHS)
+        parser.add_argument('--user', help='以该用户身份请求（默认取收到留言最多的用户）')
+        parser.add_argument('--repeat', type=int, default=2, help='每个接口请求次数')
+        parser.add_argument('--top', type=int, default=0, help='输出请求后仍被引用的内存最多的代码行')
+
+    def handle(self, *args, **options):
+        headers = {}
+        user = self.get_user(options['user'])
+        if user is not None:
+            headers['HTTP_AUTHORIZATION'] = f'Token {Token.objects.get_or_create(user=user)[0].key}'
+            self.stdout.write(f'用户: {user.username}')
+        host = next((host for host in settings.ALLOWED_HOSTS if host and '*' not in host and not host.startswith('.')),
+                    'localhost')
+        client = Client(HTTP_HOST=host)
+
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        try:
+            self.stdout.write(
+                f"{'接口':<32}{'状态':>6}{'响应(KB)':>10}{'耗时(ms)':>10}{'分配峰值(MB)':>14}{'RSS增长(MB)':>13}"
+            )
+            for path in options['paths']:
+                for _ in range(options['repeat']):
+                    self.measure(client, path, headers, options['top'])
+        finally:
+            if started_tracing:
+                tracemalloc.stop()
+        self.stdout.write(f'\n进程 RSS: {(current_rss() or 0) / MB:.1f} MB')
+
+    @staticmethod
+    def get_user(username):
+        if username:
+            try:
+                return User.objects.get(username=username)
+            except User.DoesNotExist:
+                raise CommandError(f'用户不存在: {username}')
+        top = Message.objects.values('receiver_id').annotate(n=Count('id')).order_by('-n').first()
+        if top is not None:
+            return User.objects.get(pk=top['receiver_id'])
+        return User.objects.order_by('id').first()
+
+    def measure(self, client, path, headers, top):
+        gc.collect()
+        before = tracemalloc.take_snapshot() if top else None
+        rss_before = current_rss() or 0
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+
+        started = time.perf_counter()
+        response = client.get(path, **headers)
+        if response.streaming:
+            size = sum(len(chunk) for chunk in response.streaming_content)  # 不在这里保留完整响应体
+        else:
+            size = len(response.content)
+        response.close()
+        elapsed = (time.perf_counter() - started) * 1000
+
+        _, peak = tracemalloc.get_traced_memory()
+        rss_growth = (current_rss() or 0) - rss_before
+        self.stdout.write(
+            f'{path:<32}{response.status_code:>6}{size / 1024:>10.1f}{elapsed:>10.1f}'
+            f'{(peak - baseline) / MB:>14.2f}{rss_growth / MB:>13.2f}'
+        )
+        del response
+
+        if top:
+            gc.collect()
+            for stat in tracemalloc.take_snapshot().compare_to(before, 'lineno')[:top]:
+                self.stdout.write(f'    {stat.size_diff / 1024:>+10.1f} KB  {stat.traceback}')
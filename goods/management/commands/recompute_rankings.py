@@ -0,0 +1,42 @@
+# goods/management/commands/recompute_rankings.py
+"""
+重算商品热度（趋势分/热门分）
+
+    python manage.py recompute_rankings                 # 全量重算
+    python manage.py recompute_rankings --incremental   # 只重算上次之后有变化的商品
+    python manage.py recompute_rankings --schedule      # 交给后台任务队列定期增量重算
+"""
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from goods import ranking
+from goods.tasks import schedule_rankings_refresh
+
+
+class Command(BaseCommand):
+    help = '重算商品热度分，供热门/趋势列表使用'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--incremental', action='store_true', help='只重算上次计算后有新互动的商品')
+        parser.add_argument('--batch-size', type=int, default=None)
+        parser.add_argument('--schedule', action='store_true', help='在任务队列中启动定期重算')
+
+    def handle(self, *args, **options):
+        if options['schedule']:
+            schedule_rankings_refresh()
+            self.stdout.write(self.style.SUCCESS('已加入任务队列（需运行 run_task_workers）'))
+            return
+
+        started = time.perf_counter()
+        last_run = ranking.last_computed_at()
+        if options['incremental'] and last_run is not None:
+            count = ranking.recompute_incremental(last_run - timedelta(minutes=1), options['batch_size'])
+            mode = '增量'
+        else:
+            count = ranking.recompute_all(options['batch_size'])
+            mode = '全量'
+        self.stdout.write(self.style.SUCCESS(
+            f'{mode}重算完成：{count} 件商品，用时 {time.perf_counter() - started:.2f}s'
+        ))
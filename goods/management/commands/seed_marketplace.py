@@ -0,0 +1,192 @@
+# goods/management/commands/seed_marketplace.py
+"""
+生成压测数据：用户、商品、点赞、收藏、评论、留言
+
+热度按 Zipf 分布倾斜（少数商品/卖家占大部分互动），随机种子固定时结果可复现。
+所有压测用户名以 --prefix 开头，密码统一，Token 直接写入，供 bench_api 使用。
+"""
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from goods.counters import refresh_counters, refresh_ratings, refresh_unread
+from goods.geo import apply_location, resolve_location
+from goods.models import Goods, Comment, Like, Favorite, Message
+
+BENCH_PASSWORD = 'bench123456'
+
+COMMENT_TEXTS = ['成色很好', '价格实惠', '卖家回复很快', '和描述一致', '物流有点慢', '还不错']
+MESSAGE_TEXTS = ['还在吗？', '可以便宜点吗？', '能当面交易吗？', '请问有发票吗？', '什么时候可以发货？']
+LOCATIONS = ['北京', '上海', '广州', '深圳', '杭州', '成都', '武汉', '南京', '西安', '']
+
+
+def zipf_weights(n, skew):
+    """第 i 名的权重为 1 / i^skew"""
+    return [1.0 / (rank ** skew) for rank in range(1, n + 1)]
+
+
+class Command(BaseCommand):
+    help = '生成压测数据（用户、商品、点赞、收藏、评论、留言），热度按 Zipf 分布倾斜'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--goods', type=int, default=5000)
+        parser.add_argument('--likes', type=int, default=50000)
+        parser.add_argument('--favorites', type=int, default=20000)
+        parser.add_argument('--comments', type=int, default=10000)
+        parser.add_argument('--messages', type=int, default=10000)
+        parser.add_argument('--sold-ratio', type=float, default=0.1, help='已售商品比例')
+        parser.add_argument('--skew', type=float, default=1.1, help='Zipf 倾斜系数，越大越集中')
+        parser.add_argument('--days', type=int, default=90, help='互动时间分布在最近多少天内')
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--prefix', default='bench_user_', help='压测用户名前缀')
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.days = options['days']
+        started = time.perf_counter()
+
+        user_ids = self.seed_users(options['users'], options['prefix'])
+        goods_ids, seller_of = self.seed_goods(options['goods'], user_ids, options['skew'], options['sold_ratio'])
+
+        # 商品热度权重：按 id 打乱后再分配 Zipf 权重，避免热度和发布时间相关
+        hot_order = goods_ids[:]
+        self.rng.shuffle(hot_order)
+        goods_weights = zipf_weights(len(hot_order), options['skew'])
+        user_weights = zipf_weights(len(user_ids), options['skew'] / 2)
+
+        self.seed_pairs(Like, 'likes', options['likes'], hot_order, goods_weights, user_ids, user_weights)
+        self.seed_pairs(Favorite, 'favorites', options['favorites'], hot_order, goods_weights, user_ids, user_weights)
+        self.seed_comments(options['comments'], hot_order, goods_weights, user_ids, user_weights)
+        self.seed_messages(options['messages'], hot_order, goods_weights, user_ids, user_weights, seller_of)
+
+        self.stdout.write(self.style.SUCCESS(f'数据生成完成，用时 {time.perf_counter() - started:.1f}s'))
+
+    # ---------------------------------------------------------------
+    def random_time(self):
+        return timezone.now() - timedelta(seconds=self.rng.uniform(0, self.days * 86400))
+
+    def bulk_insert(self, model, objects, **kwargs):
+        for start in range(0, len(objects), self.batch_size):
+            with transaction.atomic():
+                model.objects.bulk_create(objects[start:start + self.batch_size], **kwargs)
+
+    def sample(self, population, weights, k):
+        if not population or k <= 0:
+            return []
+        return self.rng.choices(population, weights=weights, k=k)
+
+    def seed_users(self, count, prefix):
+        existing = User.objects.filter(username__startswith=prefix).count()
+        password = make_password(BENCH_PASSWORD)  # 只哈希一次
+        users = [
+            User(username=f'{prefix}{i}', email=f'{prefix}{i}@example.com', password=password)
+            for i in range(existing, count)
+        ]
+        self.bulk_insert(User, users)
+
+        user_ids = list(User.objects.filter(username__startswith=prefix).order_by('id').values_list('id', flat=True))
+        with_token = set(Token.objects.filter(user_id__in=user_ids).values_list('user_id', flat=True))
+        self.bulk_insert(Token, [
+            Token(key=Token.generate_key(), user_id=user_id)
+            for user_id in user_ids if user_id not in with_token
+        ])
+        self.stdout.write(f'用户: {len(user_ids)}（新建 {len(users)}）')
+        return user_ids
+
+    def seed_goods(self, count, user_ids, skew, sold_ratio):
+        seller_weights = zipf_weights(len(user_ids), skew)
+        categories = [c for c, _ in Goods.CATEGORY_CHOICES]
+        conditions = [c for c, _ in Goods.CONDITION_CHOICES]
+        sellers = self.sample(user_ids, seller_weights, count)
+
+        goods = []
+        for i, seller_id in enumerate(sellers):
+            sold = self.rng.random() < sold_ratio
+            buyer_id = self.rng.choice(user_ids) if sold else None
+            if buyer_id == seller_id:
+                sold, buyer_id = False, None
+            location = self.rng.choice(LOCATIONS)
+            place = resolve_location(location)
+            goods.append(apply_location(Goods(
+                name=f'压测商品 {i}',
+                price_cents=round(self.rng.lognormvariate(4, 1.2) * 100),
+                description='由 seed_marketplace 生成的压测数据',
+                category=self.sample(categories, zipf_weights(len(categories), 0.8), 1)[0],
+                condition=self.rng.choice(conditions),
+                location=location,
+                # 城市中心附近随机分布（约 ±10km），供附近搜索压测
+                latitude=place.latitude + self.rng.gauss(0, 0.05) if place else None,
+                longitude=place.longitude + self.rng.gauss(0, 0.05) if place else None,
+                contact='13800000000',
+                seller_id=seller_id,
+                buyer_id=buyer_id,
+                is_sold=sold,
+                sold_at=self.random_time() if sold else None,
+            )))
+        self.bulk_insert(Goods, goods)
+
+        rows = Goods.objects.filter(seller_id__in=user_ids).values_list('id', 'seller_id')
+        seller_of = dict(rows)
+        self.stdout.write(f'商品: {len(seller_of)}（新建 {count}）')
+        return list(seller_of), seller_of
+
+    def seed_pairs(self, model, label, count, goods_ids, goods_weights, user_ids, user_weights):
+        """点赞/收藏：(goods, user) 唯一，重复的组合直接丢弃"""
+        pairs = set(zip(
+            self.sample(goods_ids, goods_weights, count),
+            self.sample(user_ids, user_weights, count),
+        ))
+        self.bulk_insert(model, [
+            model(goods_id=goods_id, user_id=user_id, created_at=self.random_time())
+            for goods_id, user_id in pairs
+        ], ignore_conflicts=True)
+        for start in range(0, len(goods_ids), self.batch_size):
+            refresh_counters(model, goods_ids[start:start + self.batch_size])
+        self.stdout.write(f'{label}: {len(pairs)}')
+
+    def seed_comments(self, count, goods_ids, goods_weights, user_ids, user_weights):
+        targets = self.sample(goods_ids, goods_weights, count)
+        authors = self.sample(user_ids, user_weights, count)
+        self.bulk_insert(Comment, [
+            Comment(
+                goods_id=goods_id,
+                user_id=user_id,
+                content=self.rng.choice(COMMENT_TEXTS),
+                rating=self.sample([5, 4, 3, 2, 1], [5, 3, 1.5, 0.7, 0.5], 1)[0],
+                created_at=self.random_time(),
+            )
+            for goods_id, user_id in zip(targets, authors)
+        ])
+        commented = sorted(set(targets))
+        for start in range(0, len(commented), self.batch_size):
+            refresh_ratings(commented[start:start + self.batch_size])
+        self.stdout.write(f'comments: {count}')
+
+    def seed_messages(self, count, goods_ids, goods_weights, user_ids, user_weights, seller_of):
+        targets = self.sample(goods_ids, goods_weights, count)
+        senders = self.sample(user_ids, user_weights, count)
+        messages = [
+            Message(
+                goods_id=goods_id,
+                sender_id=sender_id,
+                receiver_id=seller_of[goods_id],
+                content=self.rng.choice(MESSAGE_TEXTS),
+                is_read=self.rng.random() < 0.6,
+                created_at=self.random_time(),
+            )
+            for goods_id, sender_id in zip(targets, senders)
+            if sender_id != seller_of[goods_id]
+        ]
+        self.bulk_insert(Message, messages)
+        refresh_unread({message.receiver_id for message in messages})
+        self.stdout.write(f'messages: {len(messages)}')
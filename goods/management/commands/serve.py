@@ -0,0 +1,231 @@
+# goods/management/commands/serve.py
+"""
+预派生多进程 WSGI 服务器（实现见 DjangoTs/prefork.py，只依赖标准库），用于开发、压测和预热效果对比
+
+基于 wsgiref，没有 keep-alive 和完善的请求限制，不要直接暴露在公网；
+生产环境使用 gunicorn（gunicorn -c DjangoTs/gunicorn.conf.py DjangoTs.wsgi），参数同样读取 settings.SERVER
+
+    python manage.py serve                                  # 按 settings.SERVER 配置启动
+    python manage.py serve --bind 0.0.0.0:8000 --workers 4 --threads 8 --max-requests 2000
+    python manage.py serve --max-worker-rss 300             # worker 常驻内存超过 300 MB 时重启
+    python manage.py serve --no-preload --no-warmup         # 每个 worker 各自冷启动
+    python manage.py serve --benchmark                      # 对比冷启动与预热后的首个请求耗时
+
+    kill -HUP <主进程>    平滑重载 worker（重新预热）
+    kill -TERM <主进程>   处理完进行中的请求后退出
+
+预热（fork 之前在主进程执行，worker 继承）：
+1. 加载 WSGI 应用和中间件
+2. 加载 URL 配置并导入所有视图模块（api/urls.py 中的视图是懒加载的）
+3. 构造各序列化器的字段
+4. 填充进程内缓存（推荐候选列表、分面统计）
+5. 对 WARMUP_PATHS 各发一次内部请求（渲染器、认证、数据库连接等首次使用的代码路径）
+"""
+import io
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import URLPattern, URLResolver, get_resolver
+
+from DjangoTs.prefork import Arbiter
+from api.views import LazyView
+
+DEFAULTS = {
+    'BIND': '127.0.0.1:8000',
+    'WORKERS': 2,
+    'THREADS': 4,
+    'MAX_REQUESTS': 1000,
+    'MAX_REQUESTS_JITTER': 100,
+    'MAX_WORKER_RSS_MB': 0,
+    'GRACEFUL_TIMEOUT': 30,
+    'REQUEST_TIMEOUT': 30,
+    'KEEPALIVE': 5,
+    'PRELOAD': True,
+    'WARMUP': True,
+    'WARMUP_PATHS': ['/api/', '/api/goods/facets/', '/api/goods/trending/', '/api/feed/'],
+}
+
+
+def get_server_setting(key):
+    return getattr(settings, 'SERVER', {}).get(key, DEFAULTS[key])
+
+
+def load_application():
+    from django.core.wsgi import get_wsgi_application
+
+    return get_wsgi_application()
+
+
+def _iter_patterns(patterns):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from _iter_patterns(pattern.url_patterns)
+        elif isinstance(pattern, URLPattern):
+            yield pattern
+
+
+def warm_up(application):
+    """预热：导入视图、构造序列化器、填充缓存、内部请求，返回 {步骤: 耗时ms}"""
+    timings = {}
+
+    started = time.perf_counter()
+    resolver = get_resolver()
+    resolver.reverse_dict  # noqa: B018 触发 URL 解析器的填充
+    for pattern in _iter_patterns(resolver.url_patterns):
+        if isinstance(pattern.callback, LazyView):
+            pattern.callback.resolve()  # 导入懒加载的视图模块
+    timings['urls'] = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    from api import serializers
+    from rest_framework.serializers import Serializer
+
+    for value in vars(serializers).values():
+        if isinstance(value, type) and issubclass(value, Serializer) and value.__module__ == serializers.__name__:
+            value().fields  # noqa: B018
+    timings['serializers'] = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    from goods import feed
+    from goods.facets import get_facets
+
+    feed.warm_candidates()
+    get_facets({}, {})
+    timings['caches'] = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    host = next((host for host in settings.ALLOWED_HOSTS if host and '*' not in host and not host.startswith('.')),
+                'localhost')
+    for path in get_server_setting('WARMUP_PATHS'):
+        path, _, query = path.partition('?')
+        environ = {
+            'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': query, 'SCRIPT_NAME': '',
+            'SERVER_NAME': host, 'SERVER_PORT': '80', 'HTTP_HOST': host, 'REMOTE_ADDR': '127.0.0.1',
+            'SERVER_PROTOCOL': 'HTTP/1.1', 'wsgi.input': io.BytesIO(), 'wsgi.errors': sys.stderr,
+            'wsgi.url_scheme': 'http', 'wsgi.version': (1, 0), 'wsgi.multithread': True,
+            'wsgi.multiprocess': True, 'wsgi.run_once': False,
+        }
+        response = application(environ, lambda status, headers, exc_info=None: None)
+        for _ in response:
+            pass
+        if hasattr(response, 'close'):
+            response.close()
+    timings['requests'] = (time.perf_counter() - started) * 1000
+    return timings
+
+
+def parse_bind(value):
+    host, _, port = value.rpartition(':')
+    try:
+        return host or '127.0.0.1', int(port)
+    except ValueError:
+        raise CommandError(f'无效的监听地址: {value}（格式 host:port）')
+
+
+class Command(BaseCommand):
+    help = '启动预派生多进程 WSGI 服务器（开发/压测用；预加载、worker 回收、平滑重载、预热）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--bind', default=None, help='监听地址 host:port')
+        parser.add_argument('--workers', type=int, default=None)
+        parser.add_argument('--threads', type=int, default=None, help='每个 worker 的线程数')
+        parser.add_argument('--max-requests', type=int, default=None, help='worker 处理多少请求后重启，0 不重启')
+        parser.add_argument('--max-requests-jitter', type=int, default=None)
+        parser.add_argument('--max-worker-rss', type=int, default=None, help='worker 常驻内存上限（MB），超过后重启，0 不限制')
+        parser.add_argument('--graceful-timeout', type=int, default=None)
+        parser.add_argument('--no-preload', action='store_true', help='不在主进程预加载应用')
+        parser.add_argument('--no-warmup', action='store_true', help='不预热')
+        parser.add_argument('--access-log', action='store_true')
+        parser.add_argument('--benchmark', action='store_true', help='对比冷启动和预热后的首个请求耗时')
+        parser.add_argument('--runs', type=int, default=3, help='--benchmark 每种模式启动次数')
+
+    def handle(self, *args, **options):
+        if options['benchmark']:
+            return self.benchmark(options['runs'])
+
+        def option(name, key):
+            return options[name] if options[name] is not None else get_server_setting(key)
+
+        warmup_enabled = get_server_setting('WARMUP') and not options['no_warmup']
+        arbiter = Arbiter(
+            load_application,
+            bind=parse_bind(option('bind', 'BIND')),
+            workers=option('workers', 'WORKERS'),
+            threads=option('threads', 'THREADS'),
+            max_requests=option('max_requests', 'MAX_REQUESTS'),
+            max_requests_jitter=option('max_requests_jitter', 'MAX_REQUESTS_JITTER'),
+            max_rss=option('max_worker_rss', 'MAX_WORKER_RSS_MB') * 1024 * 1024,
+            graceful_timeout=option('graceful_timeout', 'GRACEFUL_TIMEOUT'),
+            request_timeout=get_server_setting('REQUEST_TIMEOUT'),
+            preload=get_server_setting('PRELOAD') and not options['no_preload'],
+            warm_up=self.logged_warm_up if warmup_enabled else None,
+            access_log=options['access_log'],
+            stdout=self.stdout,
+        )
+        arbiter.run()
+
+    def logged_warm_up(self, application):
+        timings = warm_up(application)
+        self.stdout.write('预热: ' + '，'.join(f'{step} {ms:.0f} ms' for step, ms in timings.items()))
+
+    # ---------------------------------------------------------------- 基准测试
+    def benchmark(self, runs):
+        """
+        分别以 冷启动（不预加载、不预热）和 预加载 + 预热 两种模式启动单 worker 服务，
+        测量：启动到端口可连接的时间、启动后第一个请求的耗时、之后同一请求的稳定耗时
+        """
+        paths = get_server_setting('WARMUP_PATHS')
+        modes = [('冷启动', ['--no-preload', '--no-warmup']), ('预加载+预热', [])]
+        results = {}
+        for label, flags in modes:
+            for _ in range(runs):
+                result = self.measure_once(flags, paths)
+                for key, value in result.items():
+                    results.setdefault((label, key), []).append(value)
+
+        self.stdout.write(f"\n{'模式':<12}{'指标':<28}{'中位数(ms)':>12}")
+        for label, _ in modes:
+            for key in ['ready'] + [f'first {path}' for path in paths] + [f'warm {path}' for path in paths]:
+                self.stdout.write(f'{label:<12}{key:<28}{statistics.median(results[label, key]):>12.1f}')
+
+    def measure_once(self, flags, paths):
+        with socket.socket() as probe:
+            probe.bind(('127.0.0.1', 0))
+            port = probe.getsockname()[1]
+        manage = Path(settings.BASE_DIR) / 'manage.py'
+        command = [sys.executable, str(manage), 'serve', '--bind', f'127.0.0.1:{port}', '--workers', '1',
+                   '--max-requests', '0', *flags]
+        started = time.perf_counter()
+        process = subprocess.Popen(command, env=os.environ.copy(), stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        try:
+            result = {'ready': self.wait_ready(port, started, process)}
+            for phase in ('first', 'warm'):
+                for path in paths:
+                    request_started = time.perf_counter()
+                    with urllib.request.urlopen(f'http://127.0.0.1:{port}{path}', timeout=60) as response:
+                        response.read()
+                    result[f'{phase} {path}'] = (time.perf_counter() - request_started) * 1000
+            return result
+        finally:
+            process.terminate()
+            process.wait(timeout=60)
+
+    @staticmethod
+    def wait_ready(port, started, process):
+        """启动到端口可连接的耗时（预加载模式下主进程预热完成后才监听）"""
+        while True:
+            if process.poll() is not None:
+                raise CommandError('服务启动失败: ' + process.stderr.read().decode(errors='replace')[-2000:])
+            try:
+                with socket.create_connection(('127.0.0.1', port), timeout=0.1):
+                    return (time.perf_counter() - started) * 1000
+            except OSError:
+                time.sleep(0.01)
@@ -0,0 +1,35 @@
+# goods/management/commands/warm_feed.py
+"""
+预热个性化推荐流的候选列表
+
+    python manage.py warm_feed              # 立即预热一次
+    python manage.py warm_feed --schedule   # 交给后台任务队列定期预热
+
+预热写入 FEED['CACHE_ALIAS'] 对应的缓存，需要是 web 进程共享的缓存（Redis/Memcached）才有意义；
+使用进程内存缓存时，各 web 进程在缓存过期后的第一个请求中自行计算。
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from goods import feed
+from goods.tasks import schedule_feed_refresh
+
+
+class Command(BaseCommand):
+    help = '预热推荐流各分类、各用户分群的候选列表'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--schedule', action='store_true', help='在任务队列中启动定期预热')
+
+    def handle(self, *args, **options):
+        if options['schedule']:
+            schedule_feed_refresh()
+            self.stdout.write(self.style.SUCCESS('已加入任务队列（需运行 run_task_workers）'))
+            return
+
+        started = time.perf_counter()
+        segments = feed.warm_candidates()
+        self.stdout.write(self.style.SUCCESS(
+            f'预热完成：{segments} 个分群，用时 {time.perf_counter() - started:.2f}s'
+        ))
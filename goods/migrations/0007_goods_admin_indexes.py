@@ -0,0 +1,37 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:24
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("goods", "0006_comment_message_favorite_like"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="goods",
+            index=models.Index(
+                fields=["is_sold", "-created_at"], name="goods_sold_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="goods",
+            index=models.Index(
+                fields=["category", "is_sold"], name="goods_category_sold_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="goods",
+            index=models.Index(fields=["condition"], name="goods_condition_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="message",
+            index=models.Index(
+                fields=["receiver", "is_read"], name="message_receiver_read_idx"
+            ),
+        ),
+    ]
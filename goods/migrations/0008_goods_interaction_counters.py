@@ -0,0 +1,53 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:27
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+BATCH_SIZE = 5000
+
+
+def count_subquery(model):
+    counts = (
+        model.objects.filter(goods_id=OuterRef("pk"))
+        .order_by()
+        .values("goods_id")
+        .annotate(c=Count("id"))
+        .values("c")
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def backfill_counters(apps, schema_editor):
+    """按 id 区间分批回填计数器，避免一次更新锁住整张表"""
+    Goods = apps.get_model("goods", "Goods")
+    Like = apps.get_model("goods", "Like")
+    Favorite = apps.get_model("goods", "Favorite")
+
+    max_id = Goods.objects.order_by("-id").values_list("id", flat=True).first() or 0
+    for start in range(0, max_id + 1, BATCH_SIZE):
+        Goods.objects.filter(id__gte=start, id__lt=start + BATCH_SIZE).update(
+            likes_count=count_subquery(Like),
+            favorites_count=count_subquery(Favorite),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("goods", "0007_goods_admin_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="goods",
+            name="favorites_count",
+            field=models.PositiveIntegerField(default=0, verbose_name="收藏数"),
+        ),
+        migrations.AddField(
+            model_name="goods",
+            name="likes_count",
+            field=models.PositiveIntegerField(default=0, verbose_name="点赞数"),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:28
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("goods", "0008_goods_interaction_counters"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="GoodsScore",
+            fields=[
+                (
+                    "goods",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="score",
+                        serialize=False,
+                        to="goods.goods",
+                    ),
+                ),
+                (
+                    "trending_score",
+                    models.FloatField(
+                        default=0, verbose_name="趋势分（近期互动，随时间衰减）"
+                    ),
+                ),
+                (
+                    "popular_score",
+                    models.FloatField(default=0, verbose_name="热门分（累计互动）"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="计算时间"),
+                ),
+            ],
+            options={
+                "verbose_name": "商品热度",
+                "verbose_name_plural": "商品热度",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(fields=["created_at"], name="comment_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="favorite",
+            index=models.Index(fields=["created_at"], name="favorite_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="like",
+            index=models.Index(fields=["created_at"], name="like_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="goodsscore",
+            index=models.Index(fields=["-trending_score"], name="score_trending_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="goodsscore",
+            index=models.Index(fields=["-popular_score"], name="score_popular_idx"),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("goods", "0009_goods_score"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SimilarGoods",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("score", models.FloatField(verbose_name="相似度")),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="计算时间"),
+                ),
+                (
+                    "goods",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="similar_items",
+                        to="goods.goods",
+                    ),
+                ),
+                (
+                    "similar",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="goods.goods",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "相似商品",
+                "verbose_name_plural": "相似商品",
+                "indexes": [
+                    models.Index(
+                        fields=["goods", "-score"], name="similar_goods_score_idx"
+                    )
+                ],
+                "unique_together": {("goods", "similar")},
+            },
+        ),
+    ]
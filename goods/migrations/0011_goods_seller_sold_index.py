@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:35
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("goods", "0010_similar_goods"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="goods",
+            index=models.Index(
+                fields=["seller", "is_sold", "sold_at"], name="goods_seller_sold_idx"
+            ),
+        ),
+    ]
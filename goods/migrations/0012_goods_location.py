@@ -0,0 +1,76 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:38
+
+from django.conf import settings
+from django.db import migrations, models
+
+from goods.geo import normalize
+
+BATCH_SIZE = 2000
+
+
+def normalize_locations(apps, schema_editor):
+    """按 id 分批把已有商品的 location 归一化为地区代码、坐标和 geohash"""
+    Goods = apps.get_model("goods", "Goods")
+    last_id = 0
+    while True:
+        batch = list(
+            Goods.objects.filter(id__gt=last_id)
+            .order_by("id")
+            .only("id", "location", "latitude", "longitude")[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        for goods in batch:
+            goods.region_code, goods.latitude, goods.longitude, goods.geohash = (
+                normalize(goods.location, goods.latitude, goods.longitude)
+            )
+        Goods.objects.bulk_update(
+            batch, ["region_code", "latitude", "longitude", "geohash"]
+        )
+        last_id = batch[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("goods", "0011_goods_seller_sold_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="goods",
+            name="geohash",
+            field=models.CharField(
+                blank=True, default="", max_length=12, verbose_name="geohash"
+            ),
+        ),
+        migrations.AddField(
+            model_name="goods",
+            name="latitude",
+            field=models.FloatField(blank=True, null=True, verbose_name="纬度"),
+        ),
+        migrations.AddField(
+            model_name="goods",
+            name="longitude",
+            field=models.FloatField(blank=True, null=True, verbose_name="经度"),
+        ),
+        migrations.AddField(
+            model_name="goods",
+            name="region_code",
+            field=models.CharField(
+                blank=True, default="", max_length=12, verbose_name="地区代码"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="goods",
+            index=models.Index(fields=["geohash"], name="goods_geohash_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="goods",
+            index=models.Index(
+                fields=["region_code", "is_sold"], name="goods_region_sold_idx"
+            ),
+        ),
+        migrations.RunPython(normalize_locations, migrations.RunPython.noop),
+    ]
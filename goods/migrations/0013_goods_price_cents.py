@@ -0,0 +1,81 @@
+from django.db import migrations, models
+
+from goods.money import from_cents, to_cents
+
+BATCH_SIZE = 5000
+
+
+def convert_prices(apps, schema_editor):
+    """按 id 分批把浮点价格换算为分；float 先转 str 再四舍五入，0.285 -> 29 而不是 28"""
+    Goods = apps.get_model("goods", "Goods")
+    last_id = 0
+    while True:
+        batch = list(
+            Goods.objects.filter(id__gt=last_id)
+            .order_by("id")
+            .only("id", "price")[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        for goods in batch:
+            goods.price_cents = to_cents(goods.price if goods.price is not None else 0)
+        Goods.objects.bulk_update(batch, ["price_cents"])
+        last_id = batch[-1].id
+
+
+def restore_prices(apps, schema_editor):
+    Goods = apps.get_model("goods", "Goods")
+    last_id = 0
+    while True:
+        batch = list(
+            Goods.objects.filter(id__gt=last_id)
+            .order_by("id")
+            .only("id", "price_cents")[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        for goods in batch:
+            goods.price = float(from_cents(goods.price_cents))
+        Goods.objects.bulk_update(batch, ["price"])
+        last_id = batch[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("goods", "0012_goods_location"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="goods",
+            name="price_cents",
+            field=models.BigIntegerField(null=True, verbose_name="价格（分）"),
+        ),
+        migrations.AlterField(
+            model_name="goods",
+            name="price",
+            field=models.FloatField(null=True, verbose_name="价格"),
+        ),
+        migrations.RunPython(convert_prices, restore_prices),
+        migrations.RemoveField(
+            model_name="goods",
+            name="price",
+        ),
+        migrations.AlterField(
+            model_name="goods",
+            name="price_cents",
+            field=models.BigIntegerField(verbose_name="价格（分）"),
+        ),
+        migrations.AddIndex(
+            model_name="goods",
+            index=models.Index(fields=["price_cents"], name="goods_price_idx"),
+        ),
+        migrations.AddConstraint(
+            model_name="goods",
+            constraint=models.CheckConstraint(
+                condition=models.Q(("price_cents__gte", 0)),
+                name="goods_price_non_negative",
+            ),
+        ),
+    ]
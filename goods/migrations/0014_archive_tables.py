@@ -0,0 +1,177 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:42
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("goods", "0013_goods_price_cents"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedGoods",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("name", models.CharField(max_length=100, verbose_name="商品名称")),
+                ("price_cents", models.BigIntegerField(verbose_name="价格（分）")),
+                ("description", models.TextField(verbose_name="商品描述")),
+                (
+                    "category",
+                    models.CharField(
+                        choices=[
+                            ("electronics", "电子产品"),
+                            ("clothing", "服装鞋帽"),
+                            ("books", "图书文具"),
+                            ("sports", "运动户外"),
+                            ("beauty", "美妆个护"),
+                            ("home", "家居日用"),
+                            ("other", "其他"),
+                        ],
+                        max_length=20,
+                        verbose_name="商品分类",
+                    ),
+                ),
+                (
+                    "condition",
+                    models.CharField(
+                        choices=[
+                            ("new", "全新"),
+                            ("like_new", "几乎全新"),
+                            ("good", "良好"),
+                            ("fair", "一般"),
+                            ("needs_repair", "需维修"),
+                        ],
+                        max_length=20,
+                        verbose_name="商品状态",
+                    ),
+                ),
+                (
+                    "location",
+                    models.CharField(
+                        blank=True, default="", max_length=100, verbose_name="所在位置"
+                    ),
+                ),
+                (
+                    "region_code",
+                    models.CharField(
+                        blank=True, default="", max_length=12, verbose_name="地区代码"
+                    ),
+                ),
+                ("contact", models.CharField(max_length=50, verbose_name="联系方式")),
+                (
+                    "image",
+                    models.CharField(
+                        blank=True, default="", max_length=100, verbose_name="商品图片"
+                    ),
+                ),
+                ("sold_at", models.DateTimeField(null=True, verbose_name="售出时间")),
+                (
+                    "likes_count",
+                    models.PositiveIntegerField(default=0, verbose_name="点赞数"),
+                ),
+                (
+                    "favorites_count",
+                    models.PositiveIntegerField(default=0, verbose_name="收藏数"),
+                ),
+                (
+                    "comments_count",
+                    models.PositiveIntegerField(default=0, verbose_name="评论数"),
+                ),
+                (
+                    "rating_total",
+                    models.PositiveIntegerField(default=0, verbose_name="评分总和"),
+                ),
+                ("created_at", models.DateTimeField(verbose_name="创建时间")),
+                (
+                    "archived_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="归档时间"),
+                ),
+                (
+                    "buyer",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="购买者",
+                    ),
+                ),
+                (
+                    "seller",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="卖家",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "已归档商品",
+                "verbose_name_plural": "已归档商品",
+                "indexes": [
+                    models.Index(
+                        fields=["buyer", "-sold_at"], name="archived_goods_buyer_idx"
+                    ),
+                    models.Index(
+                        fields=["seller", "sold_at"], name="archived_goods_seller_idx"
+                    ),
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="ArchivedMessage",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("goods_id", models.BigIntegerField(verbose_name="商品ID")),
+                (
+                    "goods_name",
+                    models.CharField(
+                        blank=True, default="", max_length=100, verbose_name="商品名称"
+                    ),
+                ),
+                ("content", models.TextField(max_length=500, verbose_name="留言内容")),
+                ("is_read", models.BooleanField(default=False, verbose_name="已读")),
+                ("created_at", models.DateTimeField()),
+                (
+                    "archived_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="归档时间"),
+                ),
+                (
+                    "receiver",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "sender",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "已归档留言",
+                "verbose_name_plural": "已归档留言",
+                "indexes": [
+                    models.Index(
+                        fields=["sender", "-created_at"], name="archived_msg_sender_idx"
+                    ),
+                    models.Index(
+                        fields=["receiver", "-created_at"],
+                        name="archived_msg_receiver_idx",
+                    ),
+                ],
+            },
+        ),
+    ]
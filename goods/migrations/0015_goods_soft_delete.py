@@ -0,0 +1,44 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:47
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("goods", "0014_archive_tables"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="goods",
+            name="deleted_at",
+            field=models.DateTimeField(blank=True, null=True, verbose_name="删除时间"),
+        ),
+        migrations.AddIndex(
+            model_name="goods",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", True), ("is_sold", False)),
+                fields=["-created_at"],
+                name="goods_on_sale_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="goods",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", True)),
+                fields=["seller", "-created_at"],
+                name="goods_seller_alive_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="goods",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", False)),
+                fields=["deleted_at"],
+                name="goods_deleted_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("goods", "0015_goods_soft_delete"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="goods",
+            name="version",
+            field=models.PositiveIntegerField(default=1, verbose_name="版本号"),
+        ),
+    ]
@@ -0,0 +1,103 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:50
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+BATCH_SIZE = 5000
+
+
+def backfill_ratings(apps, schema_editor):
+    """按商品 id 分批汇总已有评论，写入 GoodsRating"""
+    Comment = apps.get_model("goods", "Comment")
+    GoodsRating = apps.get_model("goods", "GoodsRating")
+    last_id = 0
+    while True:
+        goods_ids = list(
+            Comment.objects.filter(goods_id__gt=last_id)
+            .order_by("goods_id")
+            .values_list("goods_id", flat=True)
+            .distinct()[:BATCH_SIZE]
+        )
+        if not goods_ids:
+            break
+        ratings = {goods_id: GoodsRating(goods_id=goods_id) for goods_id in goods_ids}
+        rows = (
+            Comment.objects.filter(goods_id__in=goods_ids)
+            .values("goods_id", "rating")
+            .annotate(n=Count("id"))
+            .order_by()
+        )
+        for row in rows:
+            rating = ratings[row["goods_id"]]
+            rating.count += row["n"]
+            rating.total += row["n"] * row["rating"]
+            setattr(rating, f"rating_{row['rating']}", row["n"])
+        GoodsRating.objects.bulk_create(ratings.values())
+        last_id = goods_ids[-1]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("goods", "0016_goods_version"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="GoodsRating",
+            fields=[
+                (
+                    "goods",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="rating",
+                        serialize=False,
+                        to="goods.goods",
+                    ),
+                ),
+                (
+                    "count",
+                    models.PositiveIntegerField(default=0, verbose_name="评论数"),
+                ),
+                (
+                    "total",
+                    models.PositiveIntegerField(default=0, verbose_name="评分总和"),
+                ),
+                (
+                    "rating_1",
+                    models.PositiveIntegerField(default=0, verbose_name="1 分"),
+                ),
+                (
+                    "rating_2",
+                    models.PositiveIntegerField(default=0, verbose_name="2 分"),
+                ),
+                (
+                    "rating_3",
+                    models.PositiveIntegerField(default=0, verbose_name="3 分"),
+                ),
+                (
+                    "rating_4",
+                    models.PositiveIntegerField(default=0, verbose_name="4 分"),
+                ),
+                (
+                    "rating_5",
+                    models.PositiveIntegerField(default=0, verbose_name="5 分"),
+                ),
+            ],
+            options={
+                "verbose_name": "商品评分汇总",
+                "verbose_name_plural": "商品评分汇总",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                fields=["goods", "-created_at", "-id"], name="comment_goods_created_idx"
+            ),
+        ),
+        migrations.RunPython(backfill_ratings, migrations.RunPython.noop),
+    ]
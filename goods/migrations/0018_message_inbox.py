@@ -0,0 +1,107 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:53
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+BATCH_SIZE = 5000
+
+
+def backfill_unread(apps, schema_editor):
+    """按接收者 id 分批统计未读留言，写入 UnreadCounter"""
+    Message = apps.get_model("goods", "Message")
+    UnreadCounter = apps.get_model("goods", "UnreadCounter")
+    last_id = 0
+    while True:
+        rows = list(
+            Message.objects.filter(is_read=False, receiver_id__gt=last_id)
+            .values("receiver_id")
+            .annotate(n=Count("id"))
+            .order_by("receiver_id")[:BATCH_SIZE]
+        )
+        if not rows:
+            break
+        UnreadCounter.objects.bulk_create(
+            [UnreadCounter(user_id=row["receiver_id"], count=row["n"]) for row in rows]
+        )
+        last_id = rows[-1]["receiver_id"]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("goods", "0017_goods_rating"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UnreadCounter",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="unread_counter",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "count",
+                    models.PositiveIntegerField(default=0, verbose_name="未读留言数"),
+                ),
+            ],
+            options={
+                "verbose_name": "未读留言数",
+                "verbose_name_plural": "未读留言数",
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name="archivedmessage",
+            name="archived_msg_sender_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="archivedmessage",
+            name="archived_msg_receiver_idx",
+        ),
+        migrations.AddIndex(
+            model_name="archivedmessage",
+            index=models.Index(
+                fields=["sender", "-created_at", "-id"], name="archived_msg_sender_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="archivedmessage",
+            index=models.Index(
+                fields=["receiver", "-created_at", "-id"],
+                name="archived_msg_receiver_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="message",
+            index=models.Index(
+                fields=["sender", "-created_at", "-id"],
+                name="message_sender_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="message",
+            index=models.Index(
+                fields=["receiver", "-created_at", "-id"],
+                name="message_receiver_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="message",
+            index=models.Index(
+                condition=models.Q(("is_read", False)),
+                fields=["receiver", "-created_at", "-id"],
+                name="message_unread_idx",
+            ),
+        ),
+        migrations.RunPython(backfill_unread, migrations.RunPython.noop),
+    ]
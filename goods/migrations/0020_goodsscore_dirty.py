@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-19 19:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("goods", "0019_favorite_user_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="goodsscore",
+            name="dirty",
+            field=models.BooleanField(
+                default=False, verbose_name="待重算（取消点赞/收藏、删除评论后置位）"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="goodsscore",
+            index=models.Index(
+                condition=models.Q(("dirty", True)),
+                fields=["goods"],
+                name="score_dirty_idx",
+            ),
+        ),
+    ]
@@ -4,11 +4,20 @@ from django.contrib.auth.models import User
 from django.core.validators import FileExtensionValidator
 from django.utils import timezone
 
+from .money import from_cents, to_cents
+
+
+# 🔥 新增：默认管理器排除已删除（待后台清理）的商品
+class AliveGoodsManager(models.Manager):
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
 
 class Goods(models.Model):
     # 基础信息
     name = models.CharField(max_length=100, verbose_name="商品名称")
-    price = models.FloatField(verbose_name="价格")
+    # 🔥 修改：价格以"分"为单位存整数（原 FloatField 比较和求和有误差），price 属性读写 Decimal 元
+    price_cents = models.BigIntegerField(verbose_name="价格（分）")
     description = models.TextField(verbose_name="商品描述")
 
     # 分类信息
@@ -45,6 +54,11 @@ class Goods(models.Model):
 
     # 位置和联系方式
     location = models.CharField(max_length=100, blank=True, default='', verbose_name="所在位置")
+    # 🔥 新增：归一化后的位置（保存时由 goods.geo 根据 location / 坐标自动填充）
+    region_code = models.CharField(max_length=12, blank=True, default='', verbose_name="地区代码")
+    latitude = models.FloatField(null=True, blank=True, verbose_name="纬度")
+    longitude = models.FloatField(null=True, blank=True, verbose_name="经度")
+    geohash = models.CharField(max_length=12, blank=True, default='', verbose_name="geohash")
     contact = models.CharField(max_length=50, default='未提供', verbose_name="联系方式")
 
     # 图片字段
@@ -82,13 +96,62 @@ class Goods(models.Model):
     is_sold = models.BooleanField(default=False, verbose_name="是否已售出")
     sold_at = models.DateTimeField(null=True, blank=True, verbose_name="售出时间")
 
+    # 🔥 新增：点赞数/收藏数计数器（写入点赞、收藏时同步维护，避免每次 COUNT）
+    likes_count = models.PositiveIntegerField(default=0, verbose_name="点赞数")
+    favorites_count = models.PositiveIntegerField(default=0, verbose_name="收藏数")
+
     # 时间信息
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="创建时间")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="更新时间")
+    # 🔥 新增：软删除时间。删除接口只写这一列，评论/点赞/收藏/留言和图片由后台任务分批清理
+    deleted_at = models.DateTimeField(null=True, blank=True, verbose_name="删除时间")
+    # 🔥 新增：版本号（乐观并发控制），编辑、购买、标记售出时 +1，点赞/收藏计数器变化不影响
+    version = models.PositiveIntegerField(default=1, verbose_name="版本号")
+
+    objects = AliveGoodsManager()  # 只包含未删除的商品
+    all_objects = models.Manager()  # 包含已删除的商品（后台清理、数据迁移使用）
+
+    LOCATION_FIELDS = ('location', 'latitude', 'longitude')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # 🔥 新增：记录读取时的位置字段，保存时据此判断是否只修改了 location（见 goods.signals）
+        instance._loaded_location = {
+            name: value for name, value in zip(field_names, values) if name in cls.LOCATION_FIELDS
+        }
+        return instance
+
+    @property
+    def price(self):
+        """价格（元，Decimal）"""
+        return from_cents(self.price_cents)
+
+    @price.setter
+    def price(self, value):
+        self.price_cents = to_cents(value)
 
     def __str__(self):
         return f"{self.name} - ¥{self.price}"
 
+    def soft_delete(self):
+        """标记为已删除（只更新 deleted_at 一列），之后由 goods.archive.purge_deleted_goods 清理"""
+        self.deleted_at = timezone.now()
+        Goods.all_objects.filter(pk=self.pk).update(deleted_at=self.deleted_at)
+
+    def conditional_update(self, expected_version, **changes):
+        """
+        只写入 changes 中的列，并且仅当数据库中的版本号仍为 expected_version 时成功（版本号 +1）
+        返回是否成功；失败说明期间有其他写入，实例不变
+        """
+        changes['version'] = expected_version + 1
+        changes['updated_at'] = timezone.now()
+        if not Goods.objects.filter(pk=self.pk, version=expected_version).update(**changes):
+            return False
+        for field, value in changes.items():
+            setattr(self, field, value)
+        return True
+
     # 获取图片URL的方法
     def get_image_url(self):
         """返回图片的完整URL"""
@@ -100,6 +163,32 @@ class Goods(models.Model):
         verbose_name = "商品"
         verbose_name_plural = "商品"
         ordering = ['-created_at']
+        indexes = [
+            # 🔥 新增：商品列表（is_sold=False 按时间倒序）和后台筛选使用的索引
+            models.Index(fields=['is_sold', '-created_at'], name='goods_sold_created_idx'),
+            # 🔥 部分索引只包含在售且未删除的商品（默认管理器的查询都带 deleted_at IS NULL），
+            # 已售出和已删除的商品不进入首页列表的索引
+            models.Index(
+                fields=['-created_at'], name='goods_on_sale_idx',
+                condition=models.Q(is_sold=False, deleted_at__isnull=True),
+            ),
+            models.Index(
+                fields=['seller', '-created_at'], name='goods_seller_alive_idx',
+                condition=models.Q(deleted_at__isnull=True),
+            ),  # 🔥 我的商品
+            models.Index(
+                fields=['deleted_at'], name='goods_deleted_idx', condition=models.Q(deleted_at__isnull=False),
+            ),  # 🔥 后台清理只扫描已删除的商品
+            models.Index(fields=['category', 'is_sold'], name='goods_category_sold_idx'),
+            models.Index(fields=['condition'], name='goods_condition_idx'),
+            models.Index(fields=['seller', 'is_sold', 'sold_at'], name='goods_seller_sold_idx'),  # 🔥 卖家统计
+            models.Index(fields=['geohash'], name='goods_geohash_idx'),  # 🔥 附近搜索（每个格子一个索引区间）
+            models.Index(fields=['region_code', 'is_sold'], name='goods_region_sold_idx'),
+            models.Index(fields=['price_cents'], name='goods_price_idx'),  # 🔥 价格区间筛选和排序
+        ]
+        constraints = [
+            models.CheckConstraint(condition=models.Q(price_cents__gte=0), name='goods_price_non_negative'),
+        ]
 
 
 # 🔥 新增：评论模型
@@ -116,11 +205,45 @@ class Comment(models.Model):
         ordering = ['-created_at']
         verbose_name = '商品评论'
         verbose_name_plural = verbose_name
+        indexes = [
+            models.Index(fields=['created_at'], name='comment_created_idx'),  # 🔥 热度统计按时间窗口扫描
+            models.Index(fields=['goods', '-created_at', '-id'], name='comment_goods_created_idx'),  # 🔥 评论分页
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.goods.name}"
 
 
+# 🔥 新增：商品评分汇总（评论增删时用 F() 原子更新，读取评分摘要不扫描评论表）
+class GoodsRating(models.Model):
+    goods = models.OneToOneField(Goods, on_delete=models.CASCADE, primary_key=True, related_name='rating')
+    count = models.PositiveIntegerField(default=0, verbose_name='评论数')
+    total = models.PositiveIntegerField(default=0, verbose_name='评分总和')
+    rating_1 = models.PositiveIntegerField(default=0, verbose_name='1 分')
+    rating_2 = models.PositiveIntegerField(default=0, verbose_name='2 分')
+    rating_3 = models.PositiveIntegerField(default=0, verbose_name='3 分')
+    rating_4 = models.PositiveIntegerField(default=0, verbose_name='4 分')
+    rating_5 = models.PositiveIntegerField(default=0, verbose_name='5 分')
+
+    class Meta:
+        verbose_name = '商品评分汇总'
+        verbose_name_plural = verbose_name
+
+    @property
+    def average(self):
+        return round(self.total / self.count, 2) if self.count else None
+
+    def summary(self):
+        return {
+            'average': self.average,
+            'count': self.count,
+            'distribution': {str(score): getattr(self, f'rating_{score}') for score in range(1, 6)},
+        }
+
+    def __str__(self):
+        return f"{self.goods_id} - {self.average}"
+
+
 # 🔥 新增：点赞模型
 class Like(models.Model):
     """商品点赞模型"""
@@ -132,6 +255,9 @@ class Like(models.Model):
         unique_together = ('goods', 'user')  # 防止重复点赞
         verbose_name = '商品点赞'
         verbose_name_plural = verbose_name
+        indexes = [
+            models.Index(fields=['created_at'], name='like_created_idx'),  # 🔥 热度统计按时间窗口扫描
+        ]
 
     def __str__(self):
         return f"{self.user.username} 喜欢 {self.goods.name}"
@@ -148,6 +274,11 @@ class Favorite(models.Model):
         unique_together = ('goods', 'user')  # 防止重复收藏
         verbose_name = '商品收藏'
         verbose_name_plural = verbose_name
+        indexes = [
+            models.Index(fields=['created_at'], name='favorite_created_idx'),  # 🔥 热度统计按时间窗口扫描
+            # 🔥 用户收藏列表按收藏时间倒序读取（超出缓存上限的部分按键集查询）
+            models.Index(fields=['user', '-created_at', '-id'], name='favorite_user_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} 收藏 {self.goods.name}"
@@ -167,6 +298,134 @@ class Message(models.Model):
         ordering = ['-created_at']
         verbose_name = '用户留言'
         verbose_name_plural = verbose_name
+        indexes = [
+            # 🔥 新增：未读留言查询和后台筛选
+            models.Index(fields=['receiver', 'is_read'], name='message_receiver_read_idx'),
+            # 🔥 收件箱/发件箱游标分页
+            models.Index(fields=['sender', '-created_at', '-id'], name='message_sender_created_idx'),
+            models.Index(fields=['receiver', '-created_at', '-id'], name='message_receiver_created_idx'),
+            models.Index(
+                fields=['receiver', '-created_at', '-id'], name='message_unread_idx',
+                condition=models.Q(is_read=False),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.sender.username} -> {self.receiver.username}"
+
+
+# 🔥 新增：用户未读留言数（发送留言、标记已读时用 F() 更新，读取时不再 COUNT）
+class UnreadCounter(models.Model):
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='unread_counter')
+    count = models.PositiveIntegerField(default=0, verbose_name='未读留言数')
+
+    class Meta:
+        verbose_name = '未读留言数'
+        verbose_name_plural = verbose_name
+
+    def __str__(self):
+        return f"{self.user_id}: {self.count}"
+
+
+# 🔥 新增：商品热度分（预计算，见 goods/ranking.py）
+class GoodsScore(models.Model):
+    """商品热度排行分数，由定时任务重算，热门/趋势列表直接按索引读取"""
+    goods = models.OneToOneField(Goods, on_delete=models.CASCADE, primary_key=True, related_name='score')
+    trending_score = models.FloatField(default=0, verbose_name='趋势分（近期互动，随时间衰减）')
+    popular_score = models.FloatField(default=0, verbose_name='热门分（累计互动）')
+    dirty = models.BooleanField(default=False, verbose_name='待重算（取消点赞/收藏、删除评论后置位）')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='计算时间')
+
+    class Meta:
+        verbose_name = '商品热度'
+        verbose_name_plural = verbose_name
+        indexes = [
+            models.Index(fields=['-trending_score'], name='score_trending_idx'),
+            models.Index(fields=['-popular_score'], name='score_popular_idx'),
+            models.Index(fields=['goods'], name='score_dirty_idx', condition=models.Q(dirty=True)),
+        ]
+
+    def __str__(self):
+        return f"{self.goods_id}: {self.trending_score:.2f} / {self.popular_score:.2f}"
+
+
+# 🔥 新增：相似商品（预计算，见 goods/similarity.py）
+class SimilarGoods(models.Model):
+    """基于共同点赞/收藏的商品相似度（物品协同过滤），每个商品保留前 K 个"""
+    goods = models.ForeignKey(Goods, on_delete=models.CASCADE, related_name='similar_items')
+    similar = models.ForeignKey(Goods, on_delete=models.CASCADE, related_name='+')
+    score = models.FloatField(verbose_name='相似度')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='计算时间')
+
+    class Meta:
+        verbose_name = '相似商品'
+        verbose_name_plural = verbose_name
+        unique_together = ('goods', 'similar')
+        indexes = [
+            models.Index(fields=['goods', '-score'], name='similar_goods_score_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.goods_id} ~ {self.similar_id}: {self.score:.3f}"
+
+
+# 🔥 新增：归档表（见 goods/archive.py）。已售出较久的商品和旧留言从热表移到这里，
+# 热表只保留活跃数据；归档表保留原 id，不与热表建立外键
+class ArchivedGoods(models.Model):
+    """已归档的已售商品（商品快照 + 归档时的互动汇总）"""
+    id = models.BigIntegerField(primary_key=True)
+    name = models.CharField(max_length=100, verbose_name="商品名称")
+    price_cents = models.BigIntegerField(verbose_name="价格（分）")
+    description = models.TextField(verbose_name="商品描述")
+    category = models.CharField(max_length=20, choices=Goods.CATEGORY_CHOICES, verbose_name="商品分类")
+    condition = models.CharField(max_length=20, choices=Goods.CONDITION_CHOICES, verbose_name="商品状态")
+    location = models.CharField(max_length=100, blank=True, default='', verbose_name="所在位置")
+    region_code = models.CharField(max_length=12, blank=True, default='', verbose_name="地区代码")
+    contact = models.CharField(max_length=50, verbose_name="联系方式")
+    image = models.CharField(max_length=100, blank=True, default='', verbose_name="商品图片")
+    seller = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='+', verbose_name="卖家")
+    buyer = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='+', verbose_name="购买者")
+    sold_at = models.DateTimeField(null=True, verbose_name="售出时间")
+    likes_count = models.PositiveIntegerField(default=0, verbose_name="点赞数")
+    favorites_count = models.PositiveIntegerField(default=0, verbose_name="收藏数")
+    comments_count = models.PositiveIntegerField(default=0, verbose_name="评论数")
+    rating_total = models.PositiveIntegerField(default=0, verbose_name="评分总和")
+    created_at = models.DateTimeField(verbose_name="创建时间")
+    archived_at = models.DateTimeField(auto_now_add=True, verbose_name="归档时间")
+
+    price = Goods.price
+
+    class Meta:
+        verbose_name = "已归档商品"
+        verbose_name_plural = verbose_name
+        indexes = [
+            models.Index(fields=['buyer', '-sold_at'], name='archived_goods_buyer_idx'),
+            models.Index(fields=['seller', 'sold_at'], name='archived_goods_seller_idx'),
+        ]
+
+    def __str__(self):
+        return f"[归档] {self.name} - ¥{self.price}"
+
+
+class ArchivedMessage(models.Model):
+    """已归档的留言；商品可能已经归档，只保存商品 id 和名称快照"""
+    id = models.BigIntegerField(primary_key=True)
+    goods_id = models.BigIntegerField(verbose_name="商品ID")
+    goods_name = models.CharField(max_length=100, blank=True, default='', verbose_name="商品名称")
+    sender = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    receiver = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    content = models.TextField(max_length=500, verbose_name='留言内容')
+    is_read = models.BooleanField(default=False, verbose_name='已读')
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True, verbose_name="归档时间")
+
+    class Meta:
+        verbose_name = '已归档留言'
+        verbose_name_plural = verbose_name
+        indexes = [
+            models.Index(fields=['sender', '-created_at', '-id'], name='archived_msg_sender_idx'),
+            models.Index(fields=['receiver', '-created_at', '-id'], name='archived_msg_receiver_idx'),
+        ]
 
     def __str__(self):
-        return f"{self.sender.username} -> {self.receiver.username}"
\ No newline at end of file
+        return f"[归档] {self.sender_id} -> {self.receiver_id}"
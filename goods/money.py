@@ -0,0 +1,29 @@
+# goods/money.py
+"""
+金额换算：数据库中以"分"为单位存整数（精确比较、求和、建索引），
+接口和业务代码使用保留两位小数的 Decimal（元）。不依赖模型，数据迁移中也可以使用。
+"""
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+CENT = Decimal('0.01')
+
+
+def to_cents(value):
+    """元（Decimal / str / int / float）-> 分（int），四舍五入到分；无法解析时抛出 ValueError"""
+    if value is None or value == '':
+        raise ValueError('金额不能为空')
+    try:
+        # float 先转成 str，避免 Decimal(0.1) 得到二进制近似值
+        amount = Decimal(str(value)) if not isinstance(value, Decimal) else value
+        if not amount.is_finite():
+            raise ValueError(f'无效的金额: {value!r}')
+        return int(amount.quantize(CENT, rounding=ROUND_HALF_UP) * 100)
+    except InvalidOperation:
+        raise ValueError(f'无效的金额: {value!r}')
+
+
+def from_cents(cents):
+    """分（int）-> 元（Decimal，两位小数）"""
+    if cents is None:
+        return None
+    return (Decimal(cents) / 100).quantize(CENT)
@@ -0,0 +1,175 @@
+# goods/ranking.py
+"""
+商品热度计算
+
+趋势分：按时间窗口统计近期点赞、收藏、评论，越近的窗口权重越大（分段近似指数衰减），
+评论再按评分加减分：
+    trending = Σ 类型权重 × Σ 窗口内新增数 × 窗口衰减系数 + 评分权重 × Σ(评分 - 3)
+热门分：累计点赞、收藏、评论数加权 + 平均评分加成
+
+每批商品只需要 3 条 GROUP BY 查询 + 1 条 upsert，结果写入 GoodsScore；
+列表接口只读 GoodsScore 的排序索引，不在请求中做聚合。
+
+取消点赞/收藏、删除评论不会产生新的互动行，由计数器维护函数（goods/counters.py）
+调用 mark_dirty 标记，增量重算时一并处理。
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Avg, Count, Q, Sum
+from django.utils import timezone
+
+from goods.models import Goods, GoodsScore, Like, Favorite, Comment
+
+DEFAULTS = {
+    # (窗口天数, 衰减系数)：1天内的互动权重1.0，1~7天0.5，7~30天0.15，更早不计入趋势分
+    'WINDOWS': [(1, 1.0), (7, 0.5), (30, 0.15)],
+    'WEIGHTS': {'like': 1.0, 'favorite': 3.0, 'comment': 2.0},
+    'RATING_WEIGHT': 0.5,
+    'BATCH_SIZE': 2000,
+    'REFRESH_INTERVAL': 300,  # 定时任务的重算间隔（秒）
+}
+
+
+def get_ranking_setting(key):
+    return getattr(settings, 'RANKING', {}).get(key, DEFAULTS[key])
+
+
+def _window_counts(model, goods_ids, now):
+    """返回 {goods_id: [窗口1数量, 窗口2数量, ...]}（窗口是累计的：7天包含1天）"""
+    windows = get_ranking_setting('WINDOWS')
+    longest = now - timedelta(days=windows[-1][0])
+    aggregates = {
+        f'w{i}': Count('id', filter=Q(created_at__gte=now - timedelta(days=days)))
+        for i, (days, _) in enumerate(windows)
+    }
+    rows = (
+        model.objects
+        .filter(goods_id__in=goods_ids, created_at__gte=longest)
+        .values('goods_id')
+        .annotate(**aggregates)
+        .order_by()
+    )
+    return {row['goods_id']: [row[f'w{i}'] for i in range(len(windows))] for row in rows}
+
+
+def _decayed(counts):
+    """累计窗口计数 -> 衰减加权和"""
+    windows = get_ranking_setting('WINDOWS')
+    total = 0.0
+    previous = 0
+    for count, (_, factor) in zip(counts, windows):
+        total += (count - previous) * factor
+        previous = count
+    return total
+
+
+def compute_scores(goods_ids, now=None):
+    """计算一批商品的 (趋势分, 热门分)"""
+    now = now or timezone.now()
+    weights = get_ranking_setting('WEIGHTS')
+    rating_weight = get_ranking_setting('RATING_WEIGHT')
+    recent_from = now - timedelta(days=get_ranking_setting('WINDOWS')[-1][0])
+
+    likes = _window_counts(Like, goods_ids, now)
+    favorites = _window_counts(Favorite, goods_ids, now)
+    comments = {
+        row['goods_id']: row for row in
+        Comment.objects.filter(goods_id__in=goods_ids)
+        .values('goods_id')
+        .annotate(
+            total=Count('id'),
+            avg_rating=Avg('rating'),
+            **{f'w{i}': Count('id', filter=Q(created_at__gte=now - timedelta(days=days)))
+               for i, (days, _) in enumerate(get_ranking_setting('WINDOWS'))},
+            recent_rating_delta=Sum('rating', filter=Q(created_at__gte=recent_from)),
+        )
+        .order_by()
+    }
+    counters = dict(
+        (goods_id, (likes_count, favorites_count)) for goods_id, likes_count, favorites_count in
+        Goods.objects.filter(id__in=goods_ids).values_list('id', 'likes_count', 'favorites_count')
+    )
+
+    scores = {}
+    windows_count = len(get_ranking_setting('WINDOWS'))
+    for goods_id, (likes_count, favorites_count) in counters.items():
+        comment = comments.get(goods_id)
+        comment_windows = [comment[f'w{i}'] for i in range(windows_count)] if comment else []
+
+        trending = (
+            weights['like'] * _decayed(likes.get(goods_id, []))
+            + weights['favorite'] * _decayed(favorites.get(goods_id, []))
+            + weights['comment'] * _decayed(comment_windows)
+        )
+        if comment and comment['recent_rating_delta'] is not None:
+            # 近期评论的 Σ(评分 - 3)：好评加分，差评减分
+            trending += rating_weight * (comment['recent_rating_delta'] - 3 * comment_windows[-1])
+
+        popular = weights['like'] * likes_count + weights['favorite'] * favorites_count
+        if comment:
+            popular += weights['comment'] * comment['total']
+            popular += rating_weight * (comment['avg_rating'] - 3) * comment['total']
+
+        scores[goods_id] = (max(trending, 0.0), max(popular, 0.0))
+    return scores
+
+
+def save_scores(scores):
+    now = timezone.now()
+    GoodsScore.objects.bulk_create(
+        [
+            GoodsScore(
+                goods_id=goods_id, trending_score=trending, popular_score=popular, dirty=False, updated_at=now
+            )
+            for goods_id, (trending, popular) in scores.items()
+        ],
+        update_conflicts=True,
+        unique_fields=['goods'],
+        update_fields=['trending_score', 'popular_score', 'dirty', 'updated_at'],
+    )
+
+
+def mark_dirty(goods_ids):
+    """互动减少（取消点赞/收藏、删除评论）的商品标记为待重算；还没有分数行的商品不在榜单中，无需标记"""
+    if goods_ids:
+        GoodsScore.objects.filter(goods_id__in=goods_ids, dirty=False).update(dirty=True)
+
+
+def recompute_all(batch_size=None):
+    """全量重算：按 id 顺序分批，返回处理的商品数"""
+    batch_size = batch_size or get_ranking_setting('BATCH_SIZE')
+    now = timezone.now()
+    processed = 0
+    last_id = 0
+    while True:
+        ids = list(Goods.objects.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:batch_size])
+        if not ids:
+            break
+        save_scores(compute_scores(ids, now))
+        processed += len(ids)
+        last_id = ids[-1]
+    return processed
+
+
+def recompute_incremental(since, batch_size=None):
+    """
+    增量重算：只处理 since 之后有新互动的商品、被 mark_dirty 标记的商品，
+    以及趋势分仍大于 0 的商品（后者的分数会随时间衰减，需要定期更新）
+    """
+    batch_size = batch_size or get_ranking_setting('BATCH_SIZE')
+    now = timezone.now()
+    touched = set(
+        GoodsScore.objects.filter(Q(trending_score__gt=0) | Q(dirty=True)).values_list('goods_id', flat=True)
+    )
+    for model in (Like, Favorite, Comment):
+        touched.update(model.objects.filter(created_at__gte=since).values_list('goods_id', flat=True).distinct())
+
+    ids = sorted(touched)
+    for start in range(0, len(ids), batch_size):
+        save_scores(compute_scores(ids[start:start + batch_size], now))
+    return len(ids)
+
+
+def last_computed_at():
+    return GoodsScore.objects.order_by('-updated_at').values_list('updated_at', flat=True).first()
@@ -0,0 +1,25 @@
+# goods/signals.py
+"""商品保存前归一化位置，数据变化时让相关缓存失效（在 GoodsConfig.ready 中注册）"""
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from goods.facets import invalidate_facets
+from goods.geo import apply_location
+from goods.models import Goods
+
+
+@receiver(pre_save, sender=Goods)
+def normalize_location(sender, instance, **kwargs):
+    loaded = getattr(instance, '_loaded_location', None)
+    if loaded and len(loaded) == len(Goods.LOCATION_FIELDS) and instance.location != loaded['location'] \
+            and (instance.latitude, instance.longitude) == (loaded['latitude'], loaded['longitude']):
+        # 只改了 location：原坐标属于旧位置，改用新位置的城市中心坐标（与 GoodsSerializer.update 一致）
+        instance.latitude = instance.longitude = None
+    apply_location(instance)
+    instance._loaded_location = {name: getattr(instance, name) for name in Goods.LOCATION_FIELDS}
+
+
+@receiver(post_save, sender=Goods)
+@receiver(post_delete, sender=Goods)
+def goods_changed(sender, **kwargs):
+    invalidate_facets()
@@ -0,0 +1,235 @@
+# goods/similarity.py
+"""
+相似商品（物品协同过滤）
+
+把点赞、收藏看作 用户×商品 的稀疏矩阵 X（收藏权重更高），商品相似度取余弦相似度：
+    sim(i, j) = (Xᵢ · Xⱼ) / (‖Xᵢ‖ ‖Xⱼ‖)
+用 scipy.sparse 做矩阵乘法，按商品分块计算 X[:, 块]ᵀ · X，内存占用与块大小成正比，
+每个商品只保留前 K 个写入 SimilarGoods，接口按索引直接读取。
+
+增量刷新只重算有新互动的商品所在的行（矩阵仍需全量加载，但计算量和写入量只与变化量相关）；
+其他商品列表里与它们相关的分数、取消点赞/收藏带来的变化，在下一次全量构建时修正。
+依赖 numpy 和 scipy（可选依赖，未安装时构建命令会提示安装）。
+"""
+import itertools
+import resource
+import time
+import tracemalloc
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from goods.models import Like, Favorite, SimilarGoods
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:  # pragma: no cover
+    np = None
+    sparse = None
+
+DEFAULTS = {
+    'TOP_K': 20,
+    'MIN_SCORE': 0.01,
+    'LIKE_WEIGHT': 1.0,
+    'FAVORITE_WEIGHT': 2.0,
+    'BLOCK_SIZE': 2000,  # 每次计算多少个商品的相似度行
+}
+
+
+class SimilarityUnavailable(Exception):
+    """缺少 numpy / scipy"""
+
+
+def get_similarity_setting(key):
+    return getattr(settings, 'SIMILARITY', {}).get(key, DEFAULTS[key])
+
+
+def require_numpy():
+    if np is None or sparse is None:
+        raise SimilarityUnavailable('构建相似商品索引需要 numpy 和 scipy：pip install numpy scipy')
+
+
+def load_interactions(chunk_size=50000):
+    """从点赞和收藏表读取 (user_id, goods_id, 权重) 三个数组"""
+    require_numpy()
+    users, goods, weights = [], [], []
+    for model, weight in ((Like, get_similarity_setting('LIKE_WEIGHT')),
+                          (Favorite, get_similarity_setting('FAVORITE_WEIGHT'))):
+        rows = model.objects.order_by().values_list('user_id', 'goods_id').iterator(chunk_size=chunk_size)
+        pairs = np.fromiter(itertools.chain.from_iterable(rows), dtype=np.int64).reshape(-1, 2)
+        users.append(pairs[:, 0])
+        goods.append(pairs[:, 1])
+        weights.append(np.full(len(pairs), weight, dtype=np.float32))
+    return np.concatenate(users), np.concatenate(goods), np.concatenate(weights)
+
+
+def build_matrix(user_ids, goods_ids, weights):
+    """构建 用户×商品 稀疏矩阵（CSC，按列切片快），返回 (矩阵, 列号对应的商品id数组)"""
+    require_numpy()
+    goods_index, cols = np.unique(goods_ids, return_inverse=True)
+    user_index, rows = np.unique(user_ids, return_inverse=True)
+    # 同一用户既点赞又收藏时权重相加
+    matrix = sparse.csc_matrix(
+        (weights, (rows, cols)), shape=(len(user_index), len(goods_index)), dtype=np.float32
+    )
+    matrix.sum_duplicates()
+    return matrix, goods_index
+
+
+def iter_top_k(matrix, goods_index, columns=None, top_k=None, min_score=None, block_size=None):
+    """
+    逐块计算相似度，产出 (商品id, [(相似商品id, 相似度), ...])，没有相似商品时列表为空
+    columns 为需要计算的列号（None 表示全部）
+    """
+    top_k = top_k or get_similarity_setting('TOP_K')
+    min_score = get_similarity_setting('MIN_SCORE') if min_score is None else min_score
+    block_size = block_size or get_similarity_setting('BLOCK_SIZE')
+
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=0)).ravel())
+    norms[norms == 0] = 1.0
+    columns = np.arange(matrix.shape[1]) if columns is None else np.asarray(columns)
+    transposed = matrix.T.tocsr()
+
+    for start in range(0, len(columns), block_size):
+        block = columns[start:start + block_size]
+        # (块大小 × 用户) · (用户 × 商品) -> 块内每个商品与所有商品的共现权重
+        co_occurrence = (transposed[block] @ matrix).tocsr()
+        for row, col in enumerate(block):
+            begin, end = co_occurrence.indptr[row], co_occurrence.indptr[row + 1]
+            others = co_occurrence.indices[begin:end]
+            values = co_occurrence.data[begin:end]
+            keep = others != col
+            others, values = others[keep], values[keep]
+            if not len(others):
+                yield int(goods_index[col]), []
+                continue
+            scores = values / (norms[col] * norms[others])
+            if len(scores) > top_k:
+                best = np.argpartition(-scores, top_k)[:top_k]
+                others, scores = others[best], scores[best]
+            order = np.argsort(-scores)
+            items = [
+                (int(goods_index[other]), float(score))
+                for other, score in zip(others[order], scores[order]) if score >= min_score
+            ]
+            yield int(goods_index[col]), items
+
+
+def save_similarities(results):
+    """
+    替换一批商品的相似列表（同一事务内先删后插）
+    行数通常是商品数 × K，逐个构造模型实例开销太大，直接 executemany
+    """
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    quote = connection.ops.quote_name
+    sql = 'INSERT INTO {} ({}, {}, {}, {}) VALUES (%s, %s, %s, %s)'.format(
+        quote(SimilarGoods._meta.db_table), quote('goods_id'), quote('similar_id'), quote('score'), quote('updated_at'),
+    )
+    with transaction.atomic():
+        SimilarGoods.objects.filter(goods_id__in=[goods_id for goods_id, _ in results]).delete()
+        with connection.cursor() as cursor:
+            cursor.executemany(sql, [
+                (goods_id, similar_id, score, now)
+                for goods_id, items in results
+                for similar_id, score in items
+            ])
+
+
+def build(goods_ids=None, top_k=None, min_score=None, block_size=None, trace_memory=False):
+    """
+    构建（或增量刷新）相似商品索引
+    goods_ids 不为 None 时只重算这些商品的相似列表
+    返回统计信息：交互数、用户数、商品数、写入行数、耗时、进程最大 RSS；
+    trace_memory=True 时另外用 tracemalloc 统计 Python 分配峰值（明显拖慢构建，只在评估时开启）
+    """
+    require_numpy()
+    block_size = block_size or get_similarity_setting('BLOCK_SIZE')
+    build_started = timezone.now()
+    tracing = trace_memory and not tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.start()
+    started = time.perf_counter()
+
+    user_ids, interaction_goods, weights = load_interactions()
+    loaded = time.perf_counter()
+    matrix, goods_index = build_matrix(user_ids, interaction_goods, weights)
+    del user_ids, interaction_goods, weights
+
+    columns = None
+    if goods_ids is not None:
+        wanted = np.asarray(sorted(goods_ids), dtype=np.int64)
+        columns = np.flatnonzero(np.isin(goods_index, wanted))
+        # 已经没有任何互动的商品（取消了全部点赞/收藏）直接清空
+        gone = np.setdiff1d(wanted, goods_index).tolist()
+        if gone:
+            SimilarGoods.objects.filter(goods_id__in=gone).delete()
+
+    written = 0
+    batch = []
+    for goods_id, items in iter_top_k(matrix, goods_index, columns, top_k, min_score, block_size):
+        batch.append((goods_id, items))
+        written += len(items)
+        if len(batch) >= block_size:
+            save_similarities(batch)
+            batch = []
+    if batch:
+        save_similarities(batch)
+    if goods_ids is None:
+        # 全量构建：本轮没有写到的商品（已无互动）都是旧数据
+        SimilarGoods.objects.filter(updated_at__lt=build_started).delete()
+
+    stats = {
+        'interactions': int(matrix.nnz),
+        'users': int(matrix.shape[0]),
+        'items': int(matrix.shape[1]),
+        'rows_written': written,
+        'load_seconds': round(loaded - started, 2),
+        'total_seconds': round(time.perf_counter() - started, 2),
+        'max_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+    if trace_memory:
+        stats['peak_traced_mb'] = round(tracemalloc.get_traced_memory()[1] / 1024 / 1024, 1)
+    if tracing:
+        tracemalloc.stop()
+    return stats
+
+
+def touched_since(since):
+    """since 之后有新点赞/收藏的商品 id"""
+    touched = set()
+    for model in (Like, Favorite):
+        touched.update(model.objects.filter(created_at__gte=since).values_list('goods_id', flat=True).distinct())
+    return touched
+
+
+def last_built_at():
+    return SimilarGoods.objects.order_by('-updated_at').values_list('updated_at', flat=True).first()
+
+
+def benchmark_synthetic(interactions, items, users, skew=1.1, top_k=None, block_size=None, seed=42):
+    """在内存中生成 Zipf 分布的交互数据并计算相似度（不读写数据库），用于评估构建耗时和内存"""
+    require_numpy()
+    rng = np.random.default_rng(seed)
+    item_p = 1.0 / np.arange(1, items + 1) ** skew
+    user_p = 1.0 / np.arange(1, users + 1) ** (skew / 2)
+    goods_ids = rng.choice(items, size=interactions, p=item_p / item_p.sum())
+    user_ids = rng.choice(users, size=interactions, p=user_p / user_p.sum())
+    weights = np.ones(interactions, dtype=np.float32)
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    matrix, goods_index = build_matrix(user_ids, goods_ids, weights)
+    pairs = sum(len(result) for _, result in iter_top_k(matrix, goods_index, None, top_k, None, block_size))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'interactions': int(matrix.nnz),
+        'users': int(matrix.shape[0]),
+        'items': int(matrix.shape[1]),
+        'rows_written': pairs,
+        'total_seconds': round(time.perf_counter() - started, 2),
+        'peak_traced_mb': round(peak / 1024 / 1024, 1),
+        'max_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
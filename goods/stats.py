@@ -0,0 +1,142 @@
+# goods/stats.py
+"""
+卖家统计
+
+- 汇总：一条聚合查询得到在售/已售数量、销售额（按分求和，精确）、点赞/收藏总数（读计数器列），
+  一条聚合查询从评分汇总（GoodsRating）得到评论数和平均分；已归档的商品（ArchivedGoods）再各用一条聚合查询计入
+- 销售趋势：按 sold_at 截断到天/周/月 GROUP BY，热表和归档表各一条查询
+- 结果按卖家缓存 TTL 秒；发生购买时卖家的版本号变化，旧缓存自然失效
+- 未读留言数变化频繁，不缓存，直接读取维护好的计数（UnreadCounter）
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from goods.counters import unread_count
+from goods.models import ArchivedGoods, Goods, GoodsRating
+from goods.money import from_cents
+
+DEFAULTS = {
+    'CACHE_ALIAS': 'default',
+    'TTL': 300,
+    'MAX_DAYS': 366,
+}
+
+PERIODS = {
+    'day': TruncDay,
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+
+
+def get_stats_setting(key):
+    return getattr(settings, 'SELLER_STATS', {}).get(key, DEFAULTS[key])
+
+
+def _cache():
+    return caches[get_stats_setting('CACHE_ALIAS')]
+
+
+def _version(seller_id):
+    key = f'stats:seller:{seller_id}:version'
+    version = _cache().get(key)
+    if version is None:
+        version = time.time_ns()
+        _cache().add(key, version, None)
+    return version
+
+
+def invalidate_seller_stats(*seller_ids):
+    """卖家数据变化（购买、批量标记售出）后调用"""
+    _cache().set_many({f'stats:seller:{seller_id}:version': time.time_ns() for seller_id in seller_ids}, None)
+
+
+def seller_totals(seller_id):
+    # 已售商品包含卖家之后删除的成交商品（历史销量和销售额不因删除商品而改变，与清理时归档的成交商品一致），
+    # 在售数、点赞、收藏只统计未删除的商品
+    alive = Q(deleted_at__isnull=True)
+    sold = Q(is_sold=True) & (alive | Q(buyer__isnull=False))
+    totals = Goods.all_objects.filter(seller_id=seller_id).aggregate(
+        listed=Count('id', filter=alive | sold),
+        on_sale=Count('id', filter=alive & Q(is_sold=False)),
+        sold=Count('id', filter=sold),
+        revenue_cents=Sum('price_cents', filter=sold),
+        likes=Sum('likes_count', filter=alive),
+        favorites=Sum('favorites_count', filter=alive),
+    )
+    ratings = GoodsRating.objects.filter(goods__seller_id=seller_id, goods__deleted_at__isnull=True).aggregate(
+        comments=Sum('count'), rating_total=Sum('total'),
+    )
+    # 归档的已售商品（见 goods/archive.py），评论按归档时的汇总计入
+    archived = ArchivedGoods.objects.filter(seller_id=seller_id).aggregate(
+        goods=Count('id'),
+        revenue_cents=Sum('price_cents'),
+        likes=Sum('likes_count'),
+        favorites=Sum('favorites_count'),
+        comments=Sum('comments_count'),
+        rating_total=Sum('rating_total'),
+    )
+    totals['listed'] += archived['goods']
+    totals['sold'] += archived['goods']
+    totals['revenue_cents'] = (totals['revenue_cents'] or 0) + (archived['revenue_cents'] or 0)
+    totals['revenue'] = from_cents(totals['revenue_cents'])
+    totals['likes'] = (totals['likes'] or 0) + (archived['likes'] or 0)
+    totals['favorites'] = (totals['favorites'] or 0) + (archived['favorites'] or 0)
+    totals['comments'] = (ratings['comments'] or 0) + (archived['comments'] or 0)
+    rating_total = (ratings['rating_total'] or 0) + (archived['rating_total'] or 0)
+    totals['average_rating'] = round(rating_total / totals['comments'], 2) if totals['comments'] else None
+    return totals
+
+
+def sales_series(seller_id, period='day', days=30):
+    """
+    [{'period': 开始日期, 'sold': 数量, 'revenue': 销售额（元）, 'revenue_cents': 销售额（分）}, ...]
+    没有销售的区间不返回
+    """
+    since = timezone.now() - timedelta(days=days)
+    buckets = {}
+    querysets = (
+        Goods.all_objects.filter(Q(deleted_at__isnull=True) | Q(buyer__isnull=False),
+                                 seller_id=seller_id, is_sold=True, sold_at__gte=since),
+        ArchivedGoods.objects.filter(seller_id=seller_id, sold_at__gte=since),
+    )
+    for queryset in querysets:
+        rows = (
+            queryset.annotate(bucket=PERIODS[period]('sold_at'))
+            .values('bucket')
+            .annotate(sold=Count('id'), revenue_cents=Sum('price_cents'))
+            .order_by()
+        )
+        for row in rows:
+            sold, revenue_cents = buckets.get(row['bucket'], (0, 0))
+            buckets[row['bucket']] = (sold + row['sold'], revenue_cents + row['revenue_cents'])
+    return [
+        {
+            'period': bucket.date().isoformat(),
+            'sold': sold,
+            'revenue': from_cents(revenue_cents),
+            'revenue_cents': revenue_cents,
+        }
+        for bucket, (sold, revenue_cents) in sorted(buckets.items())
+    ]
+
+
+def seller_stats(seller_id, period='day', days=30):
+    """汇总 + 销售趋势（缓存） + 未读留言数（计数器）"""
+    cache_key = f'stats:seller:{seller_id}:{_version(seller_id)}:{period}:{days}'
+    data = _cache().get(cache_key)
+    if data is None:
+        data = {
+            'totals': seller_totals(seller_id),
+            'series': sales_series(seller_id, period, days),
+            'generated_at': timezone.now().isoformat(),
+        }
+        _cache().set(cache_key, data, get_stats_setting('TTL'))
+    data = dict(data)
+    data['unread_messages'] = unread_count(seller_id)
+    return data
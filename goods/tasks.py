@@ -0,0 +1,108 @@
+# goods/tasks.py
+"""商品相关的后台任务（由 taskqueue 自动发现注册）"""
+from datetime import timedelta
+
+from django.core.files.storage import default_storage
+
+from taskqueue.models import Task
+from taskqueue.registry import task
+
+
+@task(priority=Task.PRIORITY_LOW, max_attempts=5)
+def delete_files(names):
+    """删除存储中的文件（商品图片等），文件不存在时忽略"""
+    for name in names:
+        if name and default_storage.exists(name):
+            default_storage.delete(name)
+
+
+@task(priority=Task.PRIORITY_LOW)
+def refresh_rankings(reschedule=True):
+    """
+    增量重算商品热度（首次运行时全量），reschedule=True 时按 RANKING['REFRESH_INTERVAL'] 定期重复
+    """
+    from goods import ranking
+
+    last_run = ranking.last_computed_at()
+    if last_run is None:
+        ranking.recompute_all()
+    else:
+        # 写合并模式下事件时间早于实际写入时间，往前多取一分钟
+        ranking.recompute_incremental(last_run - timedelta(minutes=1))
+
+    if reschedule:
+        schedule_rankings_refresh(countdown=ranking.get_ranking_setting('REFRESH_INTERVAL'))
+
+
+def schedule_rankings_refresh(countdown=0):
+    """确保队列中只有一个待执行的热度重算任务"""
+    pending = Task.objects.filter(name=refresh_rankings.name, status=Task.STATUS_PENDING).exists()
+    if not pending:
+        refresh_rankings.enqueue(kwargs={'reschedule': True}, countdown=countdown)
+
+
+@task(priority=Task.PRIORITY_LOW, max_attempts=1)
+def refresh_similarity(full=False):
+    """刷新相似商品索引：默认只重算上次构建后有新互动的商品"""
+    from goods import similarity
+
+    last_run = similarity.last_built_at()
+    if full or last_run is None:
+        similarity.build()
+    else:
+        touched = similarity.touched_since(last_run - timedelta(minutes=1))
+        if touched:
+            similarity.build(goods_ids=touched)
+
+
+@task(priority=Task.PRIORITY_LOW)
+def refresh_feed_candidates(reschedule=True):
+    """预热推荐流的候选列表，reschedule=True 时按 FEED['REFRESH_INTERVAL'] 定期重复"""
+    from goods import feed
+
+    feed.warm_candidates()
+    if reschedule:
+        schedule_feed_refresh(countdown=feed.get_feed_setting('REFRESH_INTERVAL'))
+
+
+def schedule_feed_refresh(countdown=0):
+    """确保队列中只有一个待执行的候选列表预热任务"""
+    pending = Task.objects.filter(name=refresh_feed_candidates.name, status=Task.STATUS_PENDING).exists()
+    if not pending:
+        refresh_feed_candidates.enqueue(kwargs={'reschedule': True}, countdown=countdown)
+
+
+@task(priority=Task.PRIORITY_LOW)
+def archive_data(reschedule=True):
+    """归档已售商品和旧留言，reschedule=True 时按 ARCHIVE['INTERVAL'] 定期重复"""
+    from goods import archive
+
+    archive.archive_sold_goods()
+    archive.archive_old_messages()
+    archive.purge_deleted_goods()
+    if reschedule:
+        schedule_archive(countdown=archive.get_archive_setting('INTERVAL'))
+
+
+def schedule_archive(countdown=0):
+    """确保队列中只有一个待执行的归档任务"""
+    pending = Task.objects.filter(name=archive_data.name, status=Task.STATUS_PENDING).exists()
+    if not pending:
+        archive_data.enqueue(kwargs={'reschedule': True}, countdown=countdown)
+
+
+@task(priority=Task.PRIORITY_LOW, max_attempts=5)
+def purge_deleted_goods():
+    """分批清理已软删除的商品（评论、点赞、收藏、留言、图片）"""
+    from goods import archive
+
+    archive.purge_deleted_goods()
+
+
+def schedule_purge():
+    """删除商品后调用：队列中已有待执行的清理任务时不再重复添加，连续删除合并为一次清理"""
+    from goods import archive
+
+    pending = Task.objects.filter(name=purge_deleted_goods.name, status=Task.STATUS_PENDING).exists()
+    if not pending:
+        purge_deleted_goods.enqueue(countdown=archive.get_archive_setting('PURGE_DELAY'))
@@ -1,3 +1,341 @@
-from django.test import TestCase
+import io
+import json
+import os
+import random
+import tempfile
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.db import OperationalError
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from goods import ranking, write_buffer
+from goods.archive import purge_deleted_goods
+from goods.stats import seller_totals
+from goods.models import ArchivedGoods, Comment, Goods, GoodsScore, Like, Favorite
+from goods.write_buffer import InteractionBuffer
+from taskqueue.models import Task
+
+
+@mock.patch.object(InteractionBuffer, '_ensure_thread')  # 不启动后台线程，测试中手动 flush
+class WriteBufferTests(TransactionTestCase):
+    """点赞/收藏写合并：批量写入、失败重试、坏事件丢弃、计数器一致性"""
+
+    def setUp(self):
+        self.users = [User.objects.create_user(f'user{i}') for i in range(3)]
+        self.goods = Goods.objects.create(name='书', price=10, description='d', seller=self.users[0])
+        self.buffer = InteractionBuffer(Like)
+
+    def assertCountersConsistent(self):
+        self.goods.refresh_from_db()
+        self.assertEqual(self.goods.likes_count, Like.objects.filter(goods=self.goods).count())
+
+    def test_flush_coalesces_events(self, _):
+        self.buffer.add(self.goods.id, self.users[1].id)
+        self.buffer.remove(self.goods.id, self.users[1].id)
+        self.buffer.add(self.goods.id, self.users[1].id)  # 同一键只保留最后一次操作
+        self.buffer.add(self.goods.id, self.users[2].id)
+
+        self.assertEqual(self.buffer.flush(), (2, 0))
+        self.assertEqual(self.buffer.pending_count(), 0)
+        self.assertEqual(Like.objects.filter(goods=self.goods).count(), 2)
+        self.assertCountersConsistent()
+
+        self.buffer.remove(self.goods.id, self.users[2].id)
+        self.assertEqual(self.buffer.flush(), (0, 1))
+        self.assertCountersConsistent()
+
+    def test_failed_flush_is_retried(self, _):
+        self.buffer.add(self.goods.id, self.users[1].id)
+        self.buffer.add(self.goods.id, self.users[2].id)
+        with mock.patch.object(write_buffer, 'refresh_counters', side_effect=OperationalError('database is locked')):
+            with self.assertRaises(OperationalError):
+                self.buffer.flush()
+
+        # 事务回滚，事件放回缓冲区；期间同一键上的新事件优先
+        self.assertFalse(Like.objects.exists())
+        self.assertEqual(self.buffer.pending_count(), 2)
+        self.buffer.remove(self.goods.id, self.users[2].id)
+
+        self.assertEqual(self.buffer.flush(), (1, 1))
+        self.assertEqual(list(Like.objects.values_list('user_id', flat=True)), [self.users[1].id])
+        self.assertCountersConsistent()
+
+    def test_integrity_error_drops_only_bad_events(self, _):
+        missing_goods_id = self.goods.id + 1000  # 例如商品已被后台清理
+        self.buffer.add(self.goods.id, self.users[1].id)
+        self.buffer.add(missing_goods_id, self.users[2].id)
+
+        with self.assertLogs('goods.write_buffer', 'WARNING'):
+            self.assertEqual(self.buffer.flush(), (1, 0))
+        self.assertEqual(self.buffer.pending_count(), 0)  # 坏事件被丢弃，不会阻塞之后的刷新
+        self.assertEqual(Like.objects.filter(goods=self.goods).count(), 1)
+        self.assertCountersConsistent()
+
+    def test_pending_events_flushed_on_exit(self, _):
+        with mock.patch.object(write_buffer, 'like_buffer', self.buffer):
+            self.buffer.add(self.goods.id, self.users[1].id)
+            write_buffer._flush_on_exit()
+        self.assertEqual(self.buffer.pending_count(), 0)
+        self.assertCountersConsistent()
+
+    @override_settings(WRITE_BUFFER={'ENABLED': True})
+    def test_buffered_like_endpoint(self, _):
+        token = Token.objects.create(user=self.users[1])
+        with mock.patch('api.views.interactions.like_buffer', self.buffer):
+            response = self.client.post(
+                f'/api/goods/{self.goods.id}/like/', HTTP_AUTHORIZATION=f'Token {token.key}'
+            )
+        self.assertEqual(response.status_code, 202)
+        self.assertFalse(Like.objects.exists())  # 只记录在内存中
+        self.buffer.flush()
+        self.assertCountersConsistent()
+
+
+class InteractionAdminCounterTests(TestCase):
+    """后台删除点赞/收藏后计数器与实际行数一致"""
+
+    def setUp(self):
+        if not apps.is_installed('django.contrib.admin'):
+            self.skipTest('后台未启用（DJANGOTS_ADMIN=0）')
+        self.admin = User.objects.create_superuser('root', 'root@example.com', 'pw')
+        self.users = [User.objects.create_user(f'user{i}') for i in range(3)]
+        self.goods = Goods.objects.create(name='书', price=10, description='d', seller=self.admin)
+        for user in self.users:
+            Like.objects.create(goods=self.goods, user=user)
+            Favorite.objects.create(goods=self.goods, user=user)
+        Goods.objects.filter(pk=self.goods.pk).update(likes_count=3, favorites_count=3)
+        self.client.force_login(self.admin)
+
+    def test_bulk_delete_refreshes_counter(self):
+        ids = list(Like.objects.filter(user__in=self.users[:2]).values_list('id', flat=True))
+        response = self.client.post('/admin/goods/like/', {
+            'action': 'delete_selected', '_selected_action': ids, 'post': 'yes',
+        })
+        self.assertEqual(response.status_code, 302)
+        self.goods.refresh_from_db()
+        self.assertEqual(self.goods.likes_count, 1)
+
+    def test_single_delete_refreshes_counter(self):
+        favorite = Favorite.objects.filter(user=self.users[0]).get()
+        response = self.client.post(f'/admin/goods/favorite/{favorite.id}/delete/', {'post': 'yes'})
+        self.assertEqual(response.status_code, 302)
+        self.goods.refresh_from_db()
+        self.assertEqual(self.goods.favorites_count, 2)
+
+
+@override_settings(WRITE_BUFFER={'ENABLED': False})
+class RankingTests(TestCase):
+    """增量重算覆盖取消点赞等减少互动的商品；榜单不返回已删除商品"""
+
+    def setUp(self):
+        self.users = [User.objects.create_user(f'user{i}') for i in range(2)]
+        self.goods = [
+            Goods.objects.create(name=f'书{i}', price=10, description='d', seller=self.users[0]) for i in range(2)
+        ]
+        long_ago = timezone.now() - timedelta(days=90)  # 超出趋势窗口，趋势分为 0
+        for goods in self.goods:
+            like = Like.objects.create(goods=goods, user=self.users[1])
+            Like.objects.filter(pk=like.pk).update(created_at=long_ago)
+        Goods.objects.update(likes_count=1)
+        ranking.recompute_all()
+        token = Token.objects.create(user=self.users[1])
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Token {token.key}'
+
+    def test_unlike_is_recomputed_incrementally(self):
+        self.assertTrue(GoodsScore.objects.get(goods=self.goods[0]).popular_score > 0)
+        response = self.client.delete(f'/api/goods/{self.goods[0].id}/like/')
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(ranking.recompute_incremental(timezone.now()), 1)
+        score = GoodsScore.objects.get(goods=self.goods[0])
+        self.assertEqual(score.popular_score, 0)
+        self.assertFalse(score.dirty)
+
+    def test_ranking_skips_soft_deleted_goods(self):
+        self.goods[0].soft_delete()
+        response = self.client.get('/api/goods/trending/?kind=popular&limit=1')
+        self.assertEqual([item['id'] for item in response.json()['goods']], [self.goods[1].id])
+
+
+class SellerTotalsTests(TestCase):
+    """卖家删除已售商品后，历史销量和销售额不变"""
+
+    def setUp(self):
+        self.seller, buyer = User.objects.create_user('seller'), User.objects.create_user('buyer')
+        self.sold = Goods.objects.create(
+            name='书', price=10, description='d', seller=self.seller, buyer=buyer, is_sold=True,
+            sold_at=timezone.now(),
+        )
+        Goods.objects.create(name='笔', price=3, description='d', seller=self.seller)
+
+    def test_deleted_sold_goods_keep_revenue(self):
+        before = seller_totals(self.seller.id)
+        self.assertEqual((before['sold'], before['revenue_cents'], before['listed']), (1, 1000, 2))
+
+        self.sold.soft_delete()
+        after = seller_totals(self.seller.id)
+        self.assertEqual((after['sold'], after['revenue_cents'], after['listed'], after['on_sale']), (1, 1000, 2, 1))
+
+        self.assertEqual(purge_deleted_goods(), 1)
+        self.assertTrue(ArchivedGoods.objects.filter(id=self.sold.id).exists())
+        purged = seller_totals(self.seller.id)
+        self.assertEqual((purged['sold'], purged['revenue_cents'], purged['listed']), (1, 1000, 2))
+
+    def test_deleted_unsold_listing_is_purged(self):
+        delisted = Goods.objects.create(
+            name='桌', price=20, description='d', seller=self.seller, is_sold=True, sold_at=timezone.now(),
+        )  # 下架（没有买家）后删除
+        delisted.soft_delete()
+        self.assertEqual(seller_totals(self.seller.id)['sold'], 1)
+
+        self.assertEqual(purge_deleted_goods(), 1)
+        self.assertFalse(Goods.all_objects.filter(id=delisted.id).exists())
+        self.assertFalse(ArchivedGoods.objects.filter(id=delisted.id).exists())
+
+
+class SoftDeleteTests(TestCase):
+    """删除接口只做软删除；默认管理器隐藏已删除商品，后台任务再分批硬删除"""
+
+    def setUp(self):
+        self.seller, self.buyer = User.objects.create_user('seller'), User.objects.create_user('buyer')
+        self.goods = Goods.objects.create(
+            name='书', price=10, description='d', seller=self.seller, is_sold=True, sold_at=timezone.now(),
+        )
+        Like.objects.create(goods=self.goods, user=self.buyer)
+        Comment.objects.create(goods=self.goods, user=self.buyer, content='好', rating=5)
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Token {Token.objects.create(user=self.seller).key}'
+
+    def test_delete_is_soft_and_purged_later(self):
+        response = self.client.delete(f'/api/goods/{self.goods.id}/')
+        self.assertEqual(response.status_code, 200)
+
+        self.assertFalse(Goods.objects.filter(id=self.goods.id).exists())
+        self.assertIsNotNone(Goods.all_objects.get(id=self.goods.id).deleted_at)
+        self.assertTrue(Like.objects.filter(goods_id=self.goods.id).exists())  # 关联数据等待清理
+        self.assertEqual(self.client.get(f'/api/goods/{self.goods.id}/').status_code, 404)
+        self.assertEqual(Task.objects.filter(name='goods.tasks.purge_deleted_goods').count(), 1)
+
+        self.assertEqual(purge_deleted_goods(), 1)
+        self.assertFalse(Goods.all_objects.filter(id=self.goods.id).exists())
+        self.assertFalse(Like.objects.filter(goods_id=self.goods.id).exists())
+        self.assertFalse(Comment.objects.filter(goods_id=self.goods.id).exists())
+
+    def test_repeated_deletes_share_one_purge_task(self):
+        other = Goods.objects.create(
+            name='笔', price=3, description='d', seller=self.seller, is_sold=True, sold_at=timezone.now(),
+        )
+        for goods in (self.goods, other):
+            self.assertEqual(self.client.delete(f'/api/goods/{goods.id}/').status_code, 200)
+        self.assertEqual(Task.objects.filter(name='goods.tasks.purge_deleted_goods').count(), 1)
+        self.assertEqual(purge_deleted_goods(limit=1), 1)
+        self.assertEqual(purge_deleted_goods(), 1)
+
+    def test_unsold_goods_cannot_be_deleted(self):
+        self.goods.is_sold = False
+        self.goods.save()
+        response = self.client.delete(f'/api/goods/{self.goods.id}/')
+        self.assertEqual(response.status_code, 400)
+        self.assertIsNone(Goods.objects.get(id=self.goods.id).deleted_at)
+
+
+class LocationTests(TestCase):
+    """保存商品时按 location 填充坐标；只改 location 时丢弃旧坐标"""
+
+    def setUp(self):
+        self.goods = Goods.objects.create(
+            name='书', price=10, description='d', seller=User.objects.create_user('seller'), location='北京',
+        )
+
+    def test_location_fills_coordinates(self):
+        self.assertEqual(self.goods.region_code, '110000')
+        self.assertEqual((self.goods.latitude, self.goods.longitude), (39.9042, 116.4074))
+        self.assertTrue(self.goods.geohash)
+
+    def test_changing_location_resets_coordinates(self):
+        goods = Goods.objects.get(pk=self.goods.pk)
+        goods.location = '上海'
+        goods.save()
+        goods = Goods.objects.get(pk=self.goods.pk)
+        self.assertEqual((goods.region_code, goods.latitude, goods.longitude), ('310000', 31.2304, 121.4737))
+
+    def test_explicit_coordinates_are_kept(self):
+        goods = Goods.objects.get(pk=self.goods.pk)
+        goods.location, goods.latitude, goods.longitude = '上海', 31.0, 121.0
+        goods.save()
+        goods = Goods.objects.get(pk=self.goods.pk)
+        self.assertEqual((goods.region_code, goods.latitude, goods.longitude), ('310000', 31.0, 121.0))
+
+
+class ImportGoodsTests(TestCase):
+
+    def setUp(self):
+        User.objects.create_user('seller')
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.media_root = os.path.join(self.tmp.name, 'media')
+        media = override_settings(MEDIA_ROOT=self.media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+    def write(self, name, lines):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        return path
+
+    def test_non_object_lines_are_skipped(self):
+        path = self.write('goods.jsonl', [
+            json.dumps({'name': '书', 'price': '9.9', 'seller': 'seller'}),
+            '[1, 2]', '"书"', '42', '{broken',
+        ])
+        stderr = io.StringIO()
+        call_command('import_goods', path, stdout=io.StringIO(), stderr=stderr)
+        self.assertEqual(Goods.objects.filter(name='书').count(), 1)
+        self.assertEqual(stderr.getvalue().count('已跳过'), 4)
+
+    def test_copied_images_removed_when_batch_fails(self):
+        image = os.path.join(self.tmp.name, 'photo.jpg')
+        with open(image, 'wb') as f:
+            f.write(b'jpeg')
+        path = self.write('goods.jsonl', [json.dumps({'name': '书', 'price': 1, 'seller': 'seller', 'image': image})])
+
+        with mock.patch.object(Goods.objects, 'bulk_create', side_effect=OperationalError('database is locked')):
+            with self.assertRaises(OperationalError):
+                call_command('import_goods', path, '--copy-images', stdout=io.StringIO(), stderr=io.StringIO())
+        copied = [name for _, _, names in os.walk(self.media_root) for name in names]
+        self.assertEqual(copied, [])
+
+        call_command('import_goods', path, '--copy-images', stdout=io.StringIO(), stderr=io.StringIO())
+        self.assertTrue(default_storage.exists(Goods.objects.get(name='书').image.name))
+
+
+class BenchTargetTests(TestCase):
+    """bench_api 的热门商品按热度排名、按 seed_marketplace 的 Zipf 分布抽取"""
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command('seed_marketplace', users=20, goods=200, likes=3000, favorites=1000, comments=0, messages=0,
+                     sold_ratio=0, stdout=io.StringIO())
+
+    def test_hot_goods_follow_seeded_popularity(self):
+        from goods.management.commands.bench_api import Command, DetailScenario
+        from goods.management.commands.seed_marketplace import zipf_weights
+
+        ctx = Command().build_context('bench_user_', skew=1.1)
+        popularity = {goods.id: goods.likes_count + goods.favorites_count for goods in Goods.objects.all()}
+        ranked = [popularity[goods_id] for goods_id in ctx['goods_ids']]
+        self.assertEqual(ranked, sorted(ranked, reverse=True))
+
+        scenario = DetailScenario(ctx, random.Random(0))
+        picks = [scenario.hot_goods() for _ in range(20000)]
+        weights = zipf_weights(len(ctx['goods_ids']), 1.1)
+        expected = weights[0] / sum(weights)
+        self.assertAlmostEqual(picks.count(ctx['goods_ids'][0]) / len(picks), expected, delta=0.02)
+        self.assertGreater(len(set(picks)), 100)  # 长尾商品也会被访问到
@@ -0,0 +1,187 @@
+# goods/write_buffer.py
+"""
+点赞/收藏写合并（可选，settings.WRITE_BUFFER['ENABLED']）
+
+热门商品被集中点赞时，每次请求都是 Goods 查询 + get_or_create 单独一个事务，
+SQLite 的写锁会成为瓶颈。开启写合并后，点赞/取消点赞只记录到进程内存，
+由后台线程每隔 FLUSH_INTERVAL 秒（或积累到 MAX_BATCH 条时）批量写入：
+
+- 同一 (商品, 用户) 在一个批次内只保留最后一次操作
+- 新增：一次 bulk_create(ignore_conflicts=True)
+- 删除：按商品分组的 OR 条件，每 200 个商品一条 DELETE
+- 计数器：对涉及的商品执行一条 UPDATE，按实际行数重算
+- 收藏写入后让涉及用户的收藏列表缓存失效
+
+持久性说明：
+- 接口返回 202 时事件只在内存中，进程崩溃（kill -9、断电）会丢失最多 FLUSH_INTERVAL 秒内的事件
+- 正常退出（atexit）会先写入剩余事件
+- 写入失败（如数据库被锁）时事件会放回缓冲区，下一轮重试（同一键上更新的事件优先）
+- 批次违反约束（IntegrityError，如商品或用户已被清理）时改为逐条写入，
+  无法写入的事件记录日志后丢弃，不会让一条坏事件一直阻塞缓冲区
+- 点赞是幂等操作，重复点赞不会报错，接口也不再返回"已经点过赞了"
+"""
+import atexit
+import functools
+import logging
+import os
+import threading
+from operator import or_
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from goods.counters import refresh_counters
+from goods.favorites import invalidate_favorites
+from goods.models import Like, Favorite
+
+logger = logging.getLogger('goods.write_buffer')
+
+DEFAULTS = {
+    'ENABLED': False,
+    'FLUSH_INTERVAL': 1.0,
+    'MAX_BATCH': 500,
+}
+
+
+def get_buffer_setting(key):
+    return getattr(settings, 'WRITE_BUFFER', {}).get(key, DEFAULTS[key])
+
+
+class InteractionBuffer:
+    """某一种互动（点赞或收藏）的写缓冲区"""
+
+    def __init__(self, model):
+        self.model = model
+        self.flush_interval = get_buffer_setting('FLUSH_INTERVAL')
+        self.max_batch = get_buffer_setting('MAX_BATCH')
+        self._pending = {}  # (goods_id, user_id) -> (是否新增, 事件时间)
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def add(self, goods_id, user_id):
+        self._record(goods_id, user_id, True)
+
+    def remove(self, goods_id, user_id):
+        self._record(goods_id, user_id, False)
+
+    def pending_count(self):
+        with self._lock:
+            return len(self._pending)
+
+    def _record(self, goods_id, user_id, added):
+        self._ensure_thread()
+        with self._lock:
+            self._pending[(goods_id, user_id)] = (added, timezone.now())
+            size = len(self._pending)
+        if size >= self.max_batch:
+            self._wakeup.set()
+
+    def _ensure_thread(self):
+        # fork 之后子进程里没有父进程的线程，按 pid 判断是否需要重新启动
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name=f'{self.model.__name__}-write-buffer', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('%s 写缓冲区刷新失败，将在下一轮重试', self.model.__name__)
+            finally:
+                close_old_connections()
+
+    def flush(self):
+        """把当前缓冲区写入数据库，返回 (新增数, 删除数)"""
+        with self._lock:
+            batch, self._pending = self._pending, {}
+        if not batch:
+            return 0, 0
+
+        try:
+            written = self._write(batch)
+        except IntegrityError:
+            written = self._write_each(batch)
+        except Exception:
+            self._restore(batch)
+            raise
+        if self.model is Favorite:
+            invalidate_favorites(*{user_id for _, user_id in written})
+        return (sum(1 for added, _ in written.values() if added),
+                sum(1 for added, _ in written.values() if not added))
+
+    def _write(self, batch):
+        """在一个事务中写入一批事件"""
+        to_add = [(key, created_at) for key, (added, created_at) in batch.items() if added]
+        to_remove = [key for key, (added, _) in batch.items() if not added]
+        with transaction.atomic():
+            if to_add:
+                self.model.objects.bulk_create([
+                    self.model(goods_id=goods_id, user_id=user_id, created_at=created_at)
+                    for (goods_id, user_id), created_at in to_add
+                ], ignore_conflicts=True, batch_size=self.max_batch)
+            for removal_filter in self._removal_filters(to_remove):
+                self.model.objects.filter(removal_filter).delete()
+            refresh_counters(self.model, {goods_id for goods_id, _ in batch})
+        return batch
+
+    def _write_each(self, batch):
+        """批次中有违反约束的事件：逐条写入，丢弃出错的事件，返回写入成功的部分"""
+        written = {}
+        items = list(batch.items())
+        for index, (key, value) in enumerate(items):
+            try:
+                written.update(self._write({key: value}))
+            except IntegrityError as e:
+                logger.warning('%s 丢弃无法写入的事件 goods=%s user=%s: %s', self.model.__name__, *key, e)
+            except Exception:
+                self._restore(dict(items[index:]))
+                raise
+        return written
+
+    @staticmethod
+    def _removal_filters(keys, goods_per_statement=200):
+        """
+        按商品分组生成删除条件：(goods=1 AND user IN (...)) OR (goods=2 AND user IN (...))
+        每条语句最多 goods_per_statement 个商品，避免超出 SQLite 的表达式深度限制
+        """
+        users_by_goods = {}
+        for goods_id, user_id in keys:
+            users_by_goods.setdefault(goods_id, []).append(user_id)
+        items = list(users_by_goods.items())
+        for start in range(0, len(items), goods_per_statement):
+            yield functools.reduce(or_, (
+                Q(goods_id=goods_id, user_id__in=user_ids)
+                for goods_id, user_ids in items[start:start + goods_per_statement]
+            ))
+
+    def _restore(self, batch):
+        """写入失败时放回缓冲区；期间同一键上有更新的事件则以新事件为准"""
+        with self._lock:
+            for key, value in batch.items():
+                self._pending.setdefault(key, value)
+
+
+like_buffer = InteractionBuffer(Like)
+favorite_buffer = InteractionBuffer(Favorite)
+
+
+@atexit.register
+def _flush_on_exit():
+    for buffer in (like_buffer, favorite_buffer):
+        if buffer.pending_count():
+            try:
+                buffer.flush()
+            except Exception:
+                logger.exception('%s 退出前写入失败，丢失 %d 条事件', buffer.model.__name__, buffer.pending_count())
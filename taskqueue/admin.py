@@ -0,0 +1,22 @@
+from django.contrib import admin, messages
+from django.utils import timezone
+
+from . import models
+
+
+@admin.register(models.Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ('id', 'name', 'status', 'priority', 'attempts', 'max_attempts', 'run_at', 'finished_at')
+    list_filter = ('status', 'name')
+    search_fields = ('name',)
+    readonly_fields = ('created_at', 'locked_by', 'locked_at', 'heartbeat_at', 'finished_at', 'last_error')
+    ordering = ('-id',)
+    show_full_result_count = False
+    actions = ['retry']
+
+    @admin.action(description='重新执行')
+    def retry(self, request, queryset):
+        updated = queryset.exclude(status=models.Task.STATUS_RUNNING).update(
+            status=models.Task.STATUS_PENDING, attempts=0, run_at=timezone.now(), last_error=''
+        )
+        self.message_user(request, f'已重新排队 {updated} 个任务', messages.SUCCESS)
@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+
+class TaskQueueConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "taskqueue"
+    verbose_name = "后台任务"
+
+    def ready(self):
+        # 自动导入各应用下的 tasks.py，完成任务注册
+        autodiscover_modules('tasks')
@@ -0,0 +1,82 @@
+# taskqueue/management/commands/run_task_workers.py
+"""
+启动后台任务 worker
+
+    python manage.py run_task_workers --processes 2
+    python manage.py run_task_workers --burst          # 执行完当前队列后退出
+
+主进程负责拉起子进程，子进程异常退出或达到 --max-tasks 后自动重新拉起；
+收到 SIGTERM / SIGINT 时等待正在执行的任务完成后退出。
+"""
+import multiprocessing
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from taskqueue.worker import Worker
+
+
+def _worker_main(burst, max_tasks):
+    worker = Worker()
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    worker.run(burst=burst, max_tasks=max_tasks)
+
+
+class Command(BaseCommand):
+    help = '启动后台任务 worker 进程'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=1, help='worker 进程数')
+        parser.add_argument('--burst', action='store_true', help='队列为空时退出')
+        parser.add_argument('--max-tasks', type=int, default=None, help='每个进程执行多少个任务后重启')
+
+    def handle(self, *args, **options):
+        if options['processes'] <= 1:
+            worker = Worker()
+            signal.signal(signal.SIGTERM, worker.stop)
+            signal.signal(signal.SIGINT, worker.stop)
+            self.stdout.write(f'worker {worker.worker_id} 已启动')
+            worker.run(burst=options['burst'], max_tasks=options['max_tasks'])
+            self.stdout.write(f'worker 退出，共执行 {worker.processed} 个任务')
+            return
+
+        self.stopping = False
+        self.processes = []
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        # fork 前关闭数据库连接，避免子进程共享同一个连接
+        connections.close_all()
+        self.processes = [self.spawn(options) for _ in range(options['processes'])]
+        self.stdout.write(f'已启动 {len(self.processes)} 个 worker 进程')
+
+        while self.processes:
+            time.sleep(0.5)
+            for index, process in enumerate(self.processes):
+                if process.is_alive():
+                    continue
+                process.join()
+                if self.stopping or (options['burst'] and process.exitcode == 0):
+                    self.processes[index] = None
+                else:
+                    self.processes[index] = self.spawn(options)
+            self.processes = [p for p in self.processes if p is not None]
+
+        self.stdout.write('所有 worker 已退出')
+
+    def spawn(self, options):
+        # 子进程直接继承已初始化的 Django 环境（仅支持 POSIX fork）
+        context = multiprocessing.get_context('fork')
+        process = context.Process(target=_worker_main, args=(options['burst'], options['max_tasks']))
+        process.start()
+        return process
+
+    def stop(self, *args):
+        """通知所有子进程在当前任务完成后退出"""
+        self.stopping = True
+        for process in self.processes:
+            if process is not None and process.is_alive():
+                process.terminate()
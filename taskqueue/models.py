@@ -0,0 +1,48 @@
+# taskqueue/models.py
+from django.db import models
+from django.utils import timezone
+
+
+class Task(models.Model):
+    """后台任务（数据库队列）"""
+    # 优先级：数值越小越先执行
+    PRIORITY_HIGH = 0
+    PRIORITY_NORMAL = 50
+    PRIORITY_LOW = 100
+
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, '等待执行'),
+        (STATUS_RUNNING, '执行中'),
+        (STATUS_DONE, '已完成'),
+        (STATUS_FAILED, '失败'),
+    ]
+
+    name = models.CharField(max_length=200, verbose_name='任务名称')
+    args = models.JSONField(default=list, blank=True, verbose_name='位置参数')
+    kwargs = models.JSONField(default=dict, blank=True, verbose_name='关键字参数')
+    priority = models.SmallIntegerField(default=PRIORITY_NORMAL, verbose_name='优先级')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING, verbose_name='状态')
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name='已尝试次数')
+    max_attempts = models.PositiveSmallIntegerField(default=3, verbose_name='最大尝试次数')
+    run_at = models.DateTimeField(default=timezone.now, verbose_name='计划执行时间')
+    locked_by = models.CharField(max_length=100, blank=True, default='', verbose_name='执行进程')
+    locked_at = models.DateTimeField(null=True, blank=True, verbose_name='开始执行时间')
+    heartbeat_at = models.DateTimeField(null=True, blank=True, verbose_name='最近心跳时间')
+    last_error = models.TextField(blank=True, default='', verbose_name='最近错误')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='创建时间')
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name='结束时间')
+
+    class Meta:
+        verbose_name = '后台任务'
+        verbose_name_plural = verbose_name
+        indexes = [
+            # worker 取任务：status=pending 按优先级、执行时间排序
+            models.Index(fields=['status', 'priority', 'run_at'], name='task_fetch_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.id} ({self.status})"
@@ -0,0 +1,98 @@
+# taskqueue/registry.py
+"""
+任务注册和入队
+
+    from taskqueue.registry import task
+
+    @task(priority=Task.PRIORITY_LOW, max_attempts=5)
+    def delete_file(name):
+        ...
+
+    delete_file.delay('goods/2025/11/01/a.jpg')            # 入队
+    delete_file.enqueue(args=[...], countdown=60)          # 延迟执行
+
+任务参数必须可以 JSON 序列化。入队只是一条 INSERT，和调用方处于同一个事务中，
+事务回滚时任务也不会被执行。settings.TASK_QUEUE['ALWAYS_EAGER'] 为 True 时直接同步执行（便于开发调试）。
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from taskqueue.models import Task
+
+logger = logging.getLogger('taskqueue')
+
+_registry = {}
+
+DEFAULTS = {
+    'ALWAYS_EAGER': False,
+    'POLL_INTERVAL': 1.0,  # 没有任务时 worker 的轮询间隔（秒）
+    'BATCH_SIZE': 20,  # 每次取候选任务的数量
+    'RETRY_BACKOFF': 5,  # 重试退避基数（秒），第 n 次失败后等待 RETRY_BACKOFF * 2^(n-1)
+    'HEARTBEAT_INTERVAL': 30,  # 执行任务期间刷新心跳的间隔（秒）
+    'STALE_AFTER': 120,  # running 任务超过该秒数没有心跳视为 worker 崩溃，重新排队（或标记失败）
+}
+
+
+def get_queue_setting(key):
+    return getattr(settings, 'TASK_QUEUE', {}).get(key, DEFAULTS[key])
+
+
+class TaskNotRegistered(Exception):
+    """任务名称未注册"""
+
+
+def get_task(name):
+    try:
+        return _registry[name]
+    except KeyError:
+        raise TaskNotRegistered(name)
+
+
+def registered_tasks():
+    return dict(_registry)
+
+
+class RegisteredTask:
+    """注册后的任务，保留原函数的直接调用能力"""
+
+    def __init__(self, func, name, priority, max_attempts):
+        self.func = func
+        self.name = name
+        self.priority = priority
+        self.max_attempts = max_attempts
+        self.__doc__ = func.__doc__
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def delay(self, *args, **kwargs):
+        return self.enqueue(args=args, kwargs=kwargs)
+
+    def enqueue(self, args=(), kwargs=None, priority=None, countdown=0):
+        if get_queue_setting('ALWAYS_EAGER'):
+            self.func(*args, **(kwargs or {}))
+            return None
+        return Task.objects.create(
+            name=self.name,
+            args=list(args),
+            kwargs=kwargs or {},
+            priority=self.priority if priority is None else priority,
+            max_attempts=self.max_attempts,
+            run_at=timezone.now() + timedelta(seconds=countdown),
+        )
+
+
+def task(func=None, *, name=None, priority=Task.PRIORITY_NORMAL, max_attempts=3):
+    """注册任务的装饰器，可以直接 @task 或 @task(priority=..., max_attempts=...)"""
+    def decorator(f):
+        task_name = name or f'{f.__module__}.{f.__name__}'
+        registered = RegisteredTask(f, task_name, priority, max_attempts)
+        _registry[task_name] = registered
+        return registered
+
+    if func is not None:
+        return decorator(func)
+    return decorator
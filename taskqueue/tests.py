@@ -0,0 +1,64 @@
+import time
+from datetime import timedelta
+
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from taskqueue.models import Task
+from taskqueue.registry import task
+from taskqueue.worker import Worker
+
+
+@task(name='taskqueue.tests.sleep')
+def sleep(seconds):
+    time.sleep(seconds)
+
+
+class RequeueStaleTests(TestCase):
+    """只有心跳超时的任务才重新排队，达到最大尝试次数的标记失败"""
+
+    def running_task(self, heartbeat_age, attempts=1):
+        now = timezone.now()
+        return Task.objects.create(
+            name='taskqueue.tests.sleep', status=Task.STATUS_RUNNING, attempts=attempts, locked_by='dead:1',
+            locked_at=now - timedelta(hours=1), heartbeat_at=now - timedelta(seconds=heartbeat_age),
+        )
+
+    def test_slow_task_with_recent_heartbeat_is_not_requeued(self):
+        slow = self.running_task(heartbeat_age=5)
+        self.assertEqual(Worker().requeue_stale(), 0)
+        slow.refresh_from_db()
+        self.assertEqual(slow.status, Task.STATUS_RUNNING)
+
+    def test_dead_task_is_requeued(self):
+        dead = self.running_task(heartbeat_age=3600)
+        with self.assertLogs('taskqueue', 'WARNING'):
+            self.assertEqual(Worker().requeue_stale(), 1)
+        dead.refresh_from_db()
+        self.assertEqual((dead.status, dead.locked_by), (Task.STATUS_PENDING, ''))
+
+    def test_dead_task_out_of_attempts_is_failed(self):
+        dead = self.running_task(heartbeat_age=3600, attempts=3)
+        with self.assertLogs('taskqueue', 'WARNING'):
+            self.assertEqual(Worker().requeue_stale(), 0)
+        dead.refresh_from_db()
+        self.assertEqual(dead.status, Task.STATUS_FAILED)
+        self.assertIsNotNone(dead.finished_at)
+
+
+@override_settings(TASK_QUEUE={'HEARTBEAT_INTERVAL': 0.05, 'STALE_AFTER': 0.2})
+class HeartbeatTests(TransactionTestCase):
+
+    def test_long_running_task_keeps_heartbeat(self):
+        sleep.delay(0)
+        worker = Worker()
+        claimed = worker.claim()
+        checker = Worker('checker')
+
+        with worker.heartbeat(claimed):
+            time.sleep(0.4)  # 超过 STALE_AFTER，但心跳一直在刷新
+            self.assertEqual(checker.requeue_stale(), 0)
+
+        time.sleep(0.3)  # 心跳停止后超时
+        with self.assertLogs('taskqueue', 'WARNING'):
+            self.assertEqual(checker.requeue_stale(), 1)
@@ -0,0 +1,158 @@
+# taskqueue/worker.py
+"""
+任务执行器
+
+SQLite 不支持 SELECT ... FOR UPDATE SKIP LOCKED，这里用条件 UPDATE 抢占任务：
+先取一批候选 id，再逐个执行 UPDATE ... WHERE id=? AND status='pending'，
+影响行数为 1 才算抢到，多进程并发时不会重复执行同一个任务。
+
+执行期间由心跳线程每 HEARTBEAT_INTERVAL 秒刷新 heartbeat_at；只有心跳超过 STALE_AFTER 秒
+没有更新（worker 已崩溃或被杀掉）的任务才会被 requeue_stale 重新排队，执行慢的任务不受影响。
+"""
+import logging
+import os
+import socket
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.db import DatabaseError, close_old_connections, connection
+from django.db.models import F, Q
+from django.utils import timezone
+
+from taskqueue.models import Task
+from taskqueue.registry import get_queue_setting, get_task
+
+logger = logging.getLogger('taskqueue')
+
+
+class Worker:
+    def __init__(self, worker_id=None):
+        self.worker_id = worker_id or f'{socket.gethostname()}:{os.getpid()}'
+        self.should_stop = False
+        self.processed = 0
+
+    def stop(self, *args):
+        self.should_stop = True
+
+    def claim(self):
+        """抢占一个可执行的任务，没有则返回 None"""
+        now = timezone.now()
+        candidates = (
+            Task.objects
+            .filter(status=Task.STATUS_PENDING, run_at__lte=now)
+            .order_by('priority', 'run_at', 'id')
+            .values_list('id', flat=True)[:get_queue_setting('BATCH_SIZE')]
+        )
+        for task_id in list(candidates):
+            claimed = Task.objects.filter(id=task_id, status=Task.STATUS_PENDING).update(
+                status=Task.STATUS_RUNNING,
+                locked_by=self.worker_id,
+                locked_at=now,
+                heartbeat_at=now,
+                attempts=F('attempts') + 1,
+            )
+            if claimed:
+                return Task.objects.get(id=task_id)
+        return None
+
+    @contextmanager
+    def heartbeat(self, task):
+        """任务执行期间在后台线程中定期刷新 heartbeat_at"""
+        stopped = threading.Event()
+
+        def beat():
+            try:
+                while not stopped.wait(get_queue_setting('HEARTBEAT_INTERVAL')):
+                    try:
+                        Task.objects.filter(id=task.id, status=Task.STATUS_RUNNING, locked_by=self.worker_id).update(
+                            heartbeat_at=timezone.now()
+                        )
+                    except DatabaseError:
+                        logger.warning('任务 %s #%s 心跳写入失败，将在下一轮重试', task.name, task.id, exc_info=True)
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=beat, name=f'task-{task.id}-heartbeat', daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stopped.set()
+            thread.join()
+
+    def execute(self, task):
+        try:
+            with self.heartbeat(task):
+                get_task(task.name)(*task.args, **task.kwargs)
+        except Exception:
+            self.fail(task, traceback.format_exc())
+        else:
+            Task.objects.filter(id=task.id).update(status=Task.STATUS_DONE, finished_at=timezone.now(), last_error='')
+        self.processed += 1
+
+    def fail(self, task, error):
+        if task.attempts < task.max_attempts:
+            delay = get_queue_setting('RETRY_BACKOFF') * 2 ** (task.attempts - 1)
+            Task.objects.filter(id=task.id).update(
+                status=Task.STATUS_PENDING,
+                run_at=timezone.now() + timedelta(seconds=delay),
+                locked_by='',
+                last_error=error,
+            )
+            logger.warning('任务 %s #%s 第 %s 次执行失败，%ss 后重试', task.name, task.id, task.attempts, delay)
+        else:
+            Task.objects.filter(id=task.id).update(
+                status=Task.STATUS_FAILED, finished_at=timezone.now(), last_error=error
+            )
+            logger.error('任务 %s #%s 已失败 %s 次，不再重试\n%s', task.name, task.id, task.attempts, error)
+
+    def requeue_stale(self):
+        """
+        心跳超时（worker 已崩溃）的 running 任务重新放回队列，返回重新排队的任务数；
+        已达到最大尝试次数的不再重试，直接标记失败
+        """
+        now = timezone.now()
+        deadline = now - timedelta(seconds=get_queue_setting('STALE_AFTER'))
+        stale = Task.objects.filter(
+            Q(heartbeat_at__lt=deadline) | Q(heartbeat_at__isnull=True, locked_at__lt=deadline),
+            status=Task.STATUS_RUNNING,
+        )
+        failed = stale.filter(attempts__gte=F('max_attempts')).update(
+            status=Task.STATUS_FAILED, finished_at=now, locked_by='', last_error='worker 停止响应（心跳超时）'
+        )
+        requeued = stale.update(status=Task.STATUS_PENDING, locked_by='')
+        if failed or requeued:
+            logger.warning('心跳超时：%s 个任务重新排队，%s 个任务已达最大尝试次数，标记失败', requeued, failed)
+        return requeued
+
+    def run_once(self):
+        """执行一个任务，返回是否执行了任务"""
+        close_old_connections()
+        task = self.claim()
+        if task is None:
+            return False
+        self.execute(task)
+        return True
+
+    def run(self, burst=False, max_tasks=None):
+        """
+        持续执行任务
+        burst=True 时队列清空即退出；max_tasks 达到后退出（用于定期回收 worker 进程）
+        """
+        self.requeue_stale()
+        poll_interval = get_queue_setting('POLL_INTERVAL')
+        last_stale_check = time.monotonic()
+        while not self.should_stop:
+            if max_tasks is not None and self.processed >= max_tasks:
+                break
+            if self.run_once():
+                continue
+            if burst:
+                break
+            if time.monotonic() - last_stale_check > 60:
+                self.requeue_stale()
+                last_stale_check = time.monotonic()
+            time.sleep(poll_interval)